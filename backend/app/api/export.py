@@ -0,0 +1,111 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.services.blob_store import attach_texts
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+
+def _csv_cell(value) -> str:
+    """Flatten a field for a CSV cell: skill objects by name, scalar lists joined, the rest as JSON."""
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        if all(isinstance(item, dict) and "name" in item for item in value):
+            return "; ".join(str(item["name"]) for item in value)
+        if all(not isinstance(item, (dict, list)) for item in value):
+            return "; ".join(str(item) for item in value)
+        return json.dumps(value, default=str)
+    if isinstance(value, dict):
+        return json.dumps(value, default=str)
+    return str(value)
+
+
+async def _ndjson_rows(cursor) -> AsyncIterator[str]:
+    chunk: List[str] = []
+    async for document in cursor:
+        document["_id"] = str(document["_id"])
+        chunk.append(json.dumps(document, default=str))
+        if len(chunk) >= settings.EXPORT_BATCH_SIZE:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+async def _with_raw_text(cursor, owner_type: str) -> AsyncIterator[Dict]:
+    """Documents from cursor with raw_text attached from the blob store, one query per batch."""
+    batch: List[Dict] = []
+    async for document in cursor:
+        batch.append(document)
+        if len(batch) >= settings.EXPORT_BATCH_SIZE:
+            await attach_texts(owner_type, batch)
+            for item in batch:
+                yield item
+            batch = []
+    if batch:
+        await attach_texts(owner_type, batch)
+        for item in batch:
+            yield item
+
+
+async def _csv_rows(cursor, columns: Sequence[str]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    rows = 0
+    async for document in cursor:
+        writer.writerow([_csv_cell(document.get(column)) for column in columns])
+        rows += 1
+        if rows >= settings.EXPORT_BATCH_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_export(collection, query: Dict, projection: Dict[str, int], export_format: str, filename: str,
+                  sort: Optional[List[Tuple[str, int]]] = None,
+                  raw_text_owner: Optional[str] = None) -> StreamingResponse:
+    """
+    Stream every document matching query as NDJSON or CSV straight from a Mongo
+    cursor. Documents are fetched EXPORT_BATCH_SIZE at a time and written out
+    as they arrive, so memory use does not grow with the size of the export.
+    With raw_text_owner ("resume" or "job") each batch also gets its raw_text
+    from the blob store.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown export format '{export_format}'; expected one of {', '.join(EXPORT_FORMATS)}"
+        )
+
+    cursor = collection.find(query, projection, batch_size=settings.EXPORT_BATCH_SIZE, allow_disk_use=True)
+    if sort:
+        cursor = cursor.sort(sort)
+    columns = ["_id"] + list(projection)
+    if raw_text_owner:
+        cursor = _with_raw_text(cursor, raw_text_owner)
+        columns.append("raw_text")
+
+    if export_format == "csv":
+        body = _csv_rows(cursor, columns)
+    else:
+        body = _ndjson_rows(cursor)
+
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
@@ -0,0 +1,91 @@
+from typing import Dict, List, Optional, Sequence, Type
+
+from beanie import Document
+from bson import ObjectId
+from fastapi import HTTPException, Response, status
+
+from app.core.config import settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+# Default list projections: enough for tables and cards, none of the bulky fields
+RESUME_SUMMARY_FIELDS = (
+    "candidate_name", "email", "phone", "location", "skills",
+    "file_name", "file_type", "created_at", "updated_at"
+)
+JOB_SUMMARY_FIELDS = (
+    "title", "company", "location", "job_type", "remote", "skills",
+    "min_experience_years", "education_level", "is_active", "created_at", "updated_at"
+)
+MATCH_SUMMARY_FIELDS = (
+    "resume_id", "job_id", "candidate_name", "job_title", "company",
+    "overall_score", "match_mode", "created_at", "updated_at"
+)
+
+
+def build_projection(model: Type[Document], fields: Optional[str], summary_fields: Sequence[str]) -> Dict[str, int]:
+    """
+    Mongo projection for a list endpoint.
+
+    fields is a comma-separated list of model fields, "all" for every field,
+    or empty for the summary fields. Raw text is not a model field; list
+    endpoints attach it from the blob store on request (include_raw_text).
+    """
+    available = [name for name in model.model_fields if name not in ("id", "revision_id")]
+
+    if not fields:
+        selected = list(summary_fields)
+    elif fields.strip() == "all":
+        selected = available
+    else:
+        selected = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in selected if name not in available]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+
+    return {name: 1 for name in selected}
+
+
+async def paginate(model: Type[Document], query: Dict, projection: Dict[str, int], response: Response,
+                   limit: Optional[int] = None, cursor: Optional[str] = None,
+                   newest_first: bool = False, include_total: bool = False) -> List[Dict]:
+    """
+    One page of documents in _id order (creation order, or newest first),
+    keyset-paginated so the cost and memory of a page do not depend on how
+    deep into the collection it is.
+    The cursor for the next page is returned in the X-Next-Cursor header
+    (absent on the last page); with include_total the number of matching
+    documents is returned in X-Total-Count.
+    """
+    limit = min(max(1, limit or settings.PAGE_SIZE_DEFAULT), settings.PAGE_SIZE_MAX)
+    collection = model.get_motor_collection()
+
+    if include_total:
+        # An unfiltered count comes from collection metadata instead of a scan
+        total = await collection.count_documents(query) if query else await collection.estimated_document_count()
+        response.headers[TOTAL_COUNT_HEADER] = str(total)
+
+    if cursor:
+        if not ObjectId.is_valid(cursor):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        after = {"_id": {"$lt" if newest_first else "$gt": ObjectId(cursor)}}
+        query = {"$and": [query, after]} if query else after
+
+    # One extra document tells us whether there is a next page
+    documents = await collection.find(query, projection) \
+        .sort("_id", -1 if newest_first else 1).limit(limit + 1).to_list(length=limit + 1)
+
+    if len(documents) > limit:
+        documents = documents[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = str(documents[-1]["_id"])
+
+    for document in documents:
+        document["_id"] = str(document["_id"])
+    return documents
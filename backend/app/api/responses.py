@@ -0,0 +1,62 @@
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Type
+
+import orjson
+from beanie import Document
+from bson import ObjectId
+from fastapi import Response
+from pydantic_core import PydanticUndefined
+
+
+def _default(value: Any):
+    # orjson handles datetimes, dicts, lists and numpy values itself; this covers the BSON leftovers
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response for large lists of trusted documents, returned straight from
+    a route so FastAPI skips response validation and jsonable_encoder: raw
+    Mongo documents (ObjectIds, datetimes, numpy scores) are encoded by orjson
+    in one pass.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+def fast_response(content: Any, response: Optional[Response] = None) -> FastJSONResponse:
+    """A FastJSONResponse carrying the headers a route set on its injected response (e.g. X-Next-Cursor)."""
+    headers = dict(response.headers) if response is not None else None
+    return FastJSONResponse(content, headers=headers)
+
+
+@lru_cache(maxsize=None)
+def _field_defaults(model: Type[Document]) -> Dict[str, Any]:
+    defaults = {}
+    for name, field in model.model_fields.items():
+        if name in ("id", "revision_id"):
+            continue
+        # Factory defaults (timestamps) are left out rather than invented per response
+        if field.default is not PydanticUndefined:
+            defaults[field.alias or name] = field.default
+    return defaults
+
+
+def trusted_documents(model: Type[Document], documents: List[Dict]) -> List[Dict]:
+    """
+    Raw documents read from model's collection, shaped like the model's JSON
+    without validating them again: top-level fields a document lacks (e.g. the
+    detail a compact match leaves out) are filled with the model's defaults.
+    The defaults are shared between documents, so the result is for
+    serializing only.
+    """
+    defaults = _field_defaults(model)
+    return [{**defaults, **document} for document in documents]
@@ -0,0 +1,30 @@
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+
+from app.core.config import settings
+from app.config.database import check_query_shapes
+
+router = APIRouter()
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    # Same token as request profiling; admin endpoints are off while it is empty
+    if not settings.ADMIN_TOKEN or not x_admin_token or \
+            not hmac.compare_digest(x_admin_token.encode(), settings.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required")
+
+@router.get("/query-check", response_description="Report unindexed query shapes",
+            dependencies=[Depends(require_admin)])
+async def query_check(slow_ms: Optional[int] = None):
+    """
+    Explain the query shapes the API and worker depend on and report any that
+    scan a whole collection or sort in memory, plus collection scans slower
+    than slow_ms (default DB_SLOW_QUERY_MS) recorded by the database profiler.
+    """
+    try:
+        return await check_query_shapes(slow_ms)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error checking queries: {str(e)}"
+        )
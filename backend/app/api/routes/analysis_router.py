@@ -1,83 +1,328 @@
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, status, Body
+from typing import Dict, List, Optional
+from fastapi import APIRouter, HTTPException, Response, status, Body
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
 from app.models.resume import Resume
 from app.models.job import JobDescription
 from app.models.analysis import ResumeJobMatch
-from app.services.matching_engine import MatchingEngine
+from app.core.config import settings
+from app.core.timing import span, tag
+from app.core.resources import match_pool, run_in_pool
+from app.api.pagination import build_projection, paginate, MATCH_SUMMARY_FIELDS
+from app.api.export import stream_export
+from app.api.responses import fast_response, trusted_documents
+from app.services.matching_engine import get_matching_engine, MATCH_MODES
+from app.services.content_hash import resume_content_hash, job_content_hash
+from app.services.skill_index import skill_index, SkillQueryError
+from app.services.vector_store import get_resume_vectors
+from app.services.task_queue import task_queue
+from app.services.match_store import find_match, find_matches, upsert_match, ranked_scores, compact_storage
+from app.services.single_flight import SingleFlight
+from app.services.mongo_lock import MongoLock
 
 router = APIRouter()
-matching_engine = MatchingEngine()
+matching_engine = get_matching_engine()
+match_flights = SingleFlight("match")
+match_lock = MongoLock(
+    ttl_seconds=settings.MATCH_LOCK_TTL_SECONDS,
+    wait_seconds=settings.MATCH_LOCK_WAIT_SECONDS,
+    poll_ms=settings.MATCH_LOCK_POLL_MS,
+    enabled=settings.MATCH_LOCK_ENABLED
+)
 
 class MatchRequest(BaseModel):
     resume_id: str
     job_id: str
+    force: bool = False  # Recompute even if a valid cached match exists
+    mode: Optional[str] = None  # "lexical", "static" or "full"; defaults to MATCH_DEFAULT_MODE
+    deadline_ms: Optional[float] = None  # Latency budget for the engine; defaults to MATCH_DEFAULT_DEADLINE_MS
+
+class RematchRequest(BaseModel):
+    job_id: Optional[str] = None
+    resume_id: Optional[str] = None
+    force: bool = False  # Recompute every pair, not just the stale ones
 
 @router.post("/match", response_description="Match a resume with a job description")
 async def match_resume_to_job(match_request: MatchRequest):
     """
     Analyze and match a resume with a job description.
     Returns detailed match scores and analysis.
+    
+    Results are cached per (resume_id, job_id) and reused only while the resume
+    and job content hashes and the engine version are unchanged. Under compact
+    match storage a cached result carries the scores only; GET /analysis/{id}
+    recomputes its detail.
+    
+    mode trades accuracy for latency: "lexical" needs no models, "static" uses
+    word vectors, "full" adds the sentence transformer. With deadline_ms the
+    engine returns what it computed in time and lists skipped_components.
+    
+    Identical requests arriving while one is being computed wait for and share
+    its result instead of running the engine again.
     """
+    tag(resume_id=match_request.resume_id, job_id=match_request.job_id)
+    mode = match_request.mode or settings.MATCH_DEFAULT_MODE
+    if mode not in MATCH_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown match mode '{mode}'; expected one of {', '.join(MATCH_MODES)}"
+        )
+    deadline_ms = match_request.deadline_ms
+    if deadline_ms is None and settings.MATCH_DEFAULT_DEADLINE_MS > 0:
+        deadline_ms = settings.MATCH_DEFAULT_DEADLINE_MS
+    
+    def compute():
+        return run_match(match_request.resume_id, match_request.job_id, mode, deadline_ms, match_request.force)
+    
+    if not settings.MATCH_SINGLE_FLIGHT:
+        return await compute()
+    key = (match_request.resume_id, match_request.job_id, mode, deadline_ms, match_request.force)
+    return await match_flights.do(key, compute)
+
+async def run_match(resume_id: str, job_id: str, mode: str, deadline_ms: Optional[float],
+                    force: bool) -> ResumeJobMatch:
+    """Serve a match from the cache or compute and store it (the body of /analysis/match)."""
     # Retrieve resume and job documents
-    resume = await Resume.get(match_request.resume_id)
-    job = await JobDescription.get(match_request.job_id)
+    with span("db.fetch"):
+        resume = await Resume.get(resume_id)
+        job = await JobDescription.get(job_id)
     
     if not resume:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Resume with ID {match_request.resume_id} not found"
+            detail=f"Resume with ID {resume_id} not found"
         )
     
     if not job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Job description with ID {match_request.job_id} not found"
+            detail=f"Job description with ID {job_id} not found"
         )
     
+    # Across processes, one computes while the others wait and then find its result cached
     try:
-        # Check if match already exists
-        existing_match = await ResumeJobMatch.find_one(
-            {"resume_id": match_request.resume_id, "job_id": match_request.job_id}
-        )
-        
-        if existing_match:
-            # Update the timestamp instead of creating a new match
-            existing_match.updated_at = None  # Let Beanie update it automatically
-            await existing_match.save()
-            return existing_match
-        
-        # Perform matching
-        match_results = matching_engine.match_resume_to_job(resume.dict(), job.dict())
-        
-        # Create match document
-        match = ResumeJobMatch(**match_results)
-        
-        # Save to database
-        await match.save()
-        
-        return match
-    
+        async with match_lock.hold(f"match:{resume_id}:{job_id}"):
+            return await _cached_or_computed_match(resume.dict(), job.dict(), resume_id, job_id,
+                                                   mode, deadline_ms, force)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error analyzing match: {str(e)}"
         )
 
-@router.get("/", response_description="List all resume-job matches")
-async def list_matches():
+async def _cached_or_computed_match(resume_data: Dict, job_data: Dict, resume_id: str, job_id: str,
+                                    mode: str, deadline_ms: Optional[float], force: bool) -> ResumeJobMatch:
+    resume_hash = resume_content_hash(resume_data)
+    job_hash = job_content_hash(job_data)
+    
+    # Check if match already exists
+    existing_match = await find_match(resume_id, job_id)
+    
+    # A complete match from the same or a more accurate tier satisfies the request
+    if (existing_match and not force
+            and existing_match.get("resume_hash") == resume_hash
+            and existing_match.get("job_hash") == job_hash
+            and existing_match.get("engine_version") == matching_engine.ENGINE_VERSION
+            and MATCH_MODES.index(existing_match.get("match_mode", "full")) >= MATCH_MODES.index(mode)
+            and not existing_match.get("skipped_components")
+            and not existing_match.get("degraded")):
+        # A compact hit is answered with its stored scores; GET /analysis/{id} recomputes the detail
+        return ResumeJobMatch.model_validate(existing_match)
+    
+    # Perform matching off the event loop so concurrent requests can share encode batches
+    match_results = await run_in_pool(
+        match_pool(), matching_engine.match_resume_to_job, resume_data, job_data, mode, deadline_ms
+    )
+    match_results.update({
+        "resume_id": resume_id,
+        "job_id": job_id,
+        "resume_hash": resume_hash,
+        "job_hash": job_hash,
+        "engine_version": matching_engine.ENGINE_VERSION
+    })
+    
+    # One atomic upsert keyed on (resume_id, job_id) replaces a stale match in place
+    return with_details(await upsert_match(match_results), match_results)
+
+def with_details(stored: Dict, match_results: Dict) -> ResumeJobMatch:
+    """A stored match, with the detail a compact document leaves out taken from match_results."""
+    if not stored.get("compact"):
+        return ResumeJobMatch.model_validate(stored)
+    match = ResumeJobMatch(**{**match_results, "compact": True})
+    match.id = stored["_id"]
+    match.created_at = stored["created_at"]
+    match.updated_at = stored["updated_at"]
+    return match
+
+async def hydrate_match(stored: Dict) -> ResumeJobMatch:
+    """
+    Recompute the explanatory detail of a compact match (skill matches, category
+    details, suggestions) with the tier it was scored in. If the resume or job
+    changed since, the stored scores are refreshed too.
+    """
+    with span("db.fetch"):
+        resume = await Resume.get(stored["resume_id"])
+        job = await JobDescription.get(stored["job_id"])
+    if not resume or not job:
+        # Nothing to recompute from; the scores are all there is
+        return ResumeJobMatch.model_validate(stored)
+    
+    resume_data = resume.dict()
+    job_data = job.dict()
+    with span("match.hydrate"):
+        match_results = await run_in_pool(
+            match_pool(), matching_engine.match_resume_to_job, resume_data, job_data, stored.get("match_mode", "full")
+        )
+    match_results.update({
+        "resume_id": stored["resume_id"],
+        "job_id": stored["job_id"],
+        "resume_hash": resume_content_hash(resume_data),
+        "job_hash": job_content_hash(job_data),
+        "engine_version": matching_engine.ENGINE_VERSION
+    })
+    
+    if any(stored.get(key) != match_results[key] for key in ("resume_hash", "job_hash", "engine_version")):
+        stored = await upsert_match(match_results)
+    return with_details(stored, match_results)
+
+@router.post("/rematch", response_description="Recompute stored matches in the background",
+             status_code=status.HTTP_202_ACCEPTED)
+async def start_rematch(rematch_request: RematchRequest):
+    """
+    Queue a "rematch" task that recomputes the stored matches for a job or a resume.
+    Only pairs whose content hashes or engine version are out of date are rescored
+    unless force is set. Poll /analysis/rematch/{task_id} (or /tasks/{id}) for its result.
+    """
+    if bool(rematch_request.job_id) == bool(rematch_request.resume_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide exactly one of job_id or resume_id"
+        )
+    
+    payload = {"force": rematch_request.force}
+    if rematch_request.job_id:
+        payload["job_id"] = rematch_request.job_id
+    else:
+        payload["resume_id"] = rematch_request.resume_id
+    return await task_queue.enqueue("rematch", payload)
+
+@router.get("/rematch", response_description="List background rematch tasks")
+async def list_rematch_tasks(limit: int = 50):
+    """
+    Retrieve the most recent rematch tasks from the shared task queue.
+    """
+    return {"tasks": await task_queue.list(limit=limit, task_type="rematch")}
+
+@router.get("/rematch/{task_id}", response_description="Get a background rematch task")
+async def get_rematch_task(task_id: str):
     """
-    Retrieve a list of all resume-job matches.
+    Retrieve the status and result of a rematch task.
     """
-    matches = await ResumeJobMatch.find_all().to_list()
-    return matches
+    task = await task_queue.get(task_id)
+    if not task or task["task_type"] != "rematch":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Rematch task with ID {task_id} not found"
+        )
+    return task
+
+@router.get("/embeddings", response_description="Embedding cache statistics")
+async def get_embedding_stats(accuracy: bool = False):
+    """
+    Report memory use and hit rates of the quantized embedding caches.
+    With accuracy=true, also measure the similarity error against float32.
+    """
+    stats = matching_engine.embedding_stats()
+    if accuracy:
+        stats["accuracy"] = matching_engine.embedding_accuracy_report()
+    return stats
+
+@router.get("/similar-candidates/{job_id}", response_description="Find resumes semantically similar to a job")
+async def get_similar_candidates(job_id: str, limit: int = 10, q: Optional[str] = None):
+    """
+    Rank resumes by embedding similarity to a job using the shared vector store.
+    Resume vectors are written on upload and re-parse (and backfilled at startup).
+    An optional boolean skill query (see /resumes/search) restricts the candidate set.
+    """
+    job = await JobDescription.get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job description with ID {job_id} not found"
+        )
+    
+    candidate_ids = None
+    if q:
+        try:
+            candidate_ids = skill_index.search(q)
+        except SkillQueryError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid skill query: {str(e)}"
+            )
+    
+    job_embedding = (await matching_engine.encode_texts_async([matching_engine.job_profile_text(job.dict())]))[0]
+    return [
+        {"resume_id": resume_id, "similarity": round(score, 4)}
+        for resume_id, score in get_resume_vectors().top_k(job_embedding, limit, ids=candidate_ids)
+    ]
+
+@router.get("/", response_description="List resume-job matches")
+async def list_matches(response: Response, limit: Optional[int] = None, cursor: Optional[str] = None,
+                       fields: Optional[str] = None, newest_first: bool = False, include_total: bool = False):
+    """
+    Retrieve a page of resume-job matches.
+    Pass the X-Next-Cursor response header back as cursor for the next page.
+    newest_first lists the latest first; include_total adds an X-Total-Count header.
+    fields selects a comma-separated projection ("all" for every field, including
+    skill_matches and category_scores); by default a summary is returned.
+    """
+    projection = build_projection(ResumeJobMatch, fields, MATCH_SUMMARY_FIELDS)
+    matches = await paginate(ResumeJobMatch, {}, projection, response, limit, cursor,
+                             newest_first, include_total)
+    return fast_response(matches, response)
+
+@router.get("/export", response_description="Stream matches as NDJSON or CSV")
+async def export_matches(format: str = "ndjson", job_id: Optional[str] = None, resume_id: Optional[str] = None,
+                         min_score: Optional[float] = None, q: Optional[str] = None,
+                         fields: Optional[str] = None):
+    """
+    Stream stored matches as NDJSON or CSV, optionally filtered by job, resume,
+    a minimum overall score and a boolean skill query on the candidates (see
+    /resumes/search). Results for a job or resume come best score first.
+    fields selects the exported columns ("all" for every field); by default
+    the summary fields are exported.
+    """
+    query = {}
+    if job_id:
+        query["job_id"] = job_id
+    if resume_id:
+        query["resume_id"] = resume_id
+    if min_score is not None:
+        query["overall_score"] = {"$gte": min_score}
+    if q:
+        try:
+            candidate_ids = skill_index.search(q)
+        except SkillQueryError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid skill query: {str(e)}"
+            )
+        if resume_id:
+            candidate_ids = [rid for rid in candidate_ids if rid == resume_id]
+        query["resume_id"] = {"$in": candidate_ids}
+    
+    projection = build_projection(ResumeJobMatch, fields, MATCH_SUMMARY_FIELDS)
+    sort = [("overall_score", -1)] if job_id or resume_id else None
+    filename = f"matches-job-{job_id}" if job_id else f"matches-resume-{resume_id}" if resume_id else "matches"
+    return stream_export(ResumeJobMatch.get_motor_collection(), query, projection, format, filename, sort)
 
 @router.get("/{id}", response_description="Get a specific match by ID")
 async def get_match(id: str):
     """
     Retrieve a specific resume-job match by its ID.
+    Compact matches get their skill matches, category details and suggestions recomputed.
     """
     match = await ResumeJobMatch.get(id)
     if not match:
@@ -85,6 +330,10 @@ async def get_match(id: str):
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Match with ID {id} not found"
         )
+    if match.compact:
+        stored = match.dict()
+        stored["_id"] = stored.pop("id")
+        return await hydrate_match(stored)
     return match
 
 @router.delete("/{id}", response_description="Delete a match")
@@ -109,29 +358,55 @@ async def get_matches_by_resume(resume_id: str):
     """
     Retrieve all job matches for a specific resume.
     """
-    matches = await ResumeJobMatch.find({"resume_id": resume_id}).to_list()
-    return matches
+    matches = await find_matches({"resume_id": resume_id})
+    return fast_response(trusted_documents(ResumeJobMatch, matches))
 
 @router.get("/job/{job_id}", response_description="Get matches for a specific job")
 async def get_matches_by_job(job_id: str):
     """
     Retrieve all resume matches for a specific job.
     """
-    matches = await ResumeJobMatch.find({"job_id": job_id}).to_list()
-    return matches
+    matches = await find_matches({"job_id": job_id})
+    return fast_response(trusted_documents(ResumeJobMatch, matches))
 
 @router.get("/top-candidates/{job_id}", response_description="Get top candidate matches for a job")
-async def get_top_candidates(job_id: str, limit: int = 10):
+async def get_top_candidates(job_id: str, limit: int = 10, q: Optional[str] = None,
+                             scores_only: Optional[bool] = None):
     """
     Retrieve the top candidate matches for a specific job, sorted by match score.
+    An optional boolean skill query (see /resumes/search) restricts the candidate set.
+    With scores_only (the default under compact match storage) only resume_id,
+    job_id and overall_score are returned, straight from the index.
     """
-    matches = await ResumeJobMatch.find({"job_id": job_id}).sort("overall_score", -1).limit(limit).to_list()
-    return matches
+    query = {"job_id": job_id}
+    if q:
+        try:
+            query["resume_id"] = {"$in": skill_index.search(q)}
+        except SkillQueryError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid skill query: {str(e)}"
+            )
+    
+    if scores_only is None:
+        scores_only = compact_storage()
+    if scores_only:
+        return fast_response(await ranked_scores(query, limit))
+    
+    matches = await find_matches(query, limit, ranked=True)
+    return fast_response(trusted_documents(ResumeJobMatch, matches))
 
 @router.get("/best-matches/{resume_id}", response_description="Get best job matches for a candidate")
-async def get_best_matches(resume_id: str, limit: int = 10):
+async def get_best_matches(resume_id: str, limit: int = 10, scores_only: Optional[bool] = None):
     """
     Retrieve the best job matches for a specific resume, sorted by match score.
+    With scores_only (the default under compact match storage) only resume_id,
+    job_id and overall_score are returned, straight from the index.
     """
-    matches = await ResumeJobMatch.find({"resume_id": resume_id}).sort("overall_score", -1).limit(limit).to_list()
-    return matches 
\ No newline at end of file
+    if scores_only is None:
+        scores_only = compact_storage()
+    if scores_only:
+        return fast_response(await ranked_scores({"resume_id": resume_id}, limit))
+    
+    matches = await find_matches({"resume_id": resume_id}, limit, ranked=True)
+    return fast_response(trusted_documents(ResumeJobMatch, matches)) 
\ No newline at end of file
@@ -1,10 +1,17 @@
-from typing import List
-from fastapi import APIRouter, HTTPException, status, Body
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Response, status, Body
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
+from app.core.timing import span, tag
+from app.core.resources import parse_pool, run_in_pool
+from app.api.pagination import build_projection, paginate, JOB_SUMMARY_FIELDS
+from app.api.responses import fast_response
 from app.models.job import JobDescription, Requirement
-from app.services.job_parser import JobParser
+from app.services.job_parser import JobParser, parsed_job_fields
+from app.services.search import search_documents
+from app.services.blob_store import OWNER_JOB, put_text, get_text, attach_texts, delete_blobs
+from app.services.task_queue import task_queue
 
 router = APIRouter()
 job_parser = JobParser()
@@ -21,37 +28,25 @@ async def create_job(job_input: JobInput):
     If only the text is provided, the system will parse the job description to extract structured information.
     """
     try:
-        # Parse job description text
-        parsed_job = job_parser.parse_job(job_input.text)
+        # Parse job description text on the parse pool, off the event loop
+        parsed_job = await run_in_pool(parse_pool(), job_parser.parse_job, job_input.text)
+        
+        job_fields = parsed_job_fields(parsed_job)
         
         # Use input title and company if provided, otherwise use parsed values
-        title = job_input.title if job_input.title else parsed_job.get("title", "Untitled Position")
-        company = job_input.company if job_input.company else parsed_job.get("company", "Unknown Company")
+        if job_input.title:
+            job_fields["title"] = job_input.title
+        if job_input.company:
+            job_fields["company"] = job_input.company
         
         # Create job description document
-        job = JobDescription(
-            title=title,
-            company=company,
-            location=parsed_job.get("location"),
-            job_type=parsed_job.get("job_type"),
-            remote=parsed_job.get("remote", False),
-            description=parsed_job.get("description", ""),
-            responsibilities=parsed_job.get("responsibilities", []),
-            requirements=[
-                Requirement(**req) if isinstance(req, dict) else Requirement(description=req, category="General")
-                for req in parsed_job.get("requirements", [])
-            ],
-            preferred_qualifications=parsed_job.get("preferred_qualifications", []),
-            skills=parsed_job.get("skills", []),
-            keywords=parsed_job.get("keywords", []),
-            min_experience_years=parsed_job.get("min_experience_years"),
-            education_level=parsed_job.get("education_level"),
-            salary_range=parsed_job.get("salary_range"),
-            raw_text=job_input.text
-        )
+        job = JobDescription(**job_fields)
         
-        # Save to database
-        await job.save()
+        # Save to database; the raw text goes to the compressed blob store
+        with span("db.save"):
+            await job.save()
+        tag(job_id=job.id)
+        await put_text(OWNER_JOB, str(job.id), job_input.text)
         
         return job
     
@@ -61,13 +56,23 @@ async def create_job(job_input: JobInput):
             detail=f"Error processing job description: {str(e)}"
         )
 
-@router.get("/", response_description="List all job descriptions")
-async def list_jobs():
+@router.get("/", response_description="List job descriptions")
+async def list_jobs(response: Response, limit: Optional[int] = None, cursor: Optional[str] = None,
+                    fields: Optional[str] = None, include_raw_text: bool = False,
+                    newest_first: bool = False, include_total: bool = False):
     """
-    Retrieve a list of all job descriptions.
+    Retrieve a page of job descriptions.
+    Pass the X-Next-Cursor response header back as cursor for the next page.
+    newest_first lists the latest first; include_total adds an X-Total-Count header.
+    fields selects a comma-separated projection ("all" for every field); by default
+    a summary is returned. raw_text is only included with include_raw_text=true.
     """
-    jobs = await JobDescription.find_all().to_list()
-    return jobs
+    projection = build_projection(JobDescription, fields, JOB_SUMMARY_FIELDS)
+    jobs = await paginate(JobDescription, {}, projection, response, limit, cursor,
+                          newest_first, include_total)
+    if include_raw_text:
+        await attach_texts(OWNER_JOB, jobs)
+    return fast_response(jobs, response)
 
 @router.get("/{id}", response_description="Get a job description by ID")
 async def get_job(id: str):
@@ -82,6 +87,20 @@ async def get_job(id: str):
         )
     return job
 
+@router.get("/{id}/raw-text", response_description="Get the original text of a job description")
+async def get_job_raw_text(id: str):
+    """
+    Retrieve the original text a job description was created from.
+    Kept out of the job document itself and loaded only on request.
+    """
+    raw_text = await get_text(OWNER_JOB, id)
+    if raw_text is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Raw text for job description with ID {id} not found"
+        )
+    return {"id": id, "raw_text": raw_text}
+
 @router.delete("/{id}", response_description="Delete a job description")
 async def delete_job(id: str):
     """
@@ -96,13 +115,18 @@ async def delete_job(id: str):
     
     # Delete from database
     await job.delete()
+    await delete_blobs(OWNER_JOB, id)
     
     return JSONResponse(status_code=status.HTTP_200_OK, content={"message": "Job description deleted successfully"})
 
 @router.put("/{id}", response_description="Update a job description")
-async def update_job(id: str, job_update: dict = Body(...)):
+async def update_job(id: str, response: Response, job_update: dict = Body(...)):
     """
     Update a job description by its ID.
+    Stored matches affected by the change are recomputed in the background;
+    the X-Rematch-Task header carries the task ID to poll at /analysis/rematch/{task_id}.
+    A new raw_text is written to the blob store and re-parsed by a parse_job
+    task, whose ID is returned in the X-Parse-Task header (poll /tasks/{id}).
     """
     job = await JobDescription.get(id)
     if not job:
@@ -114,6 +138,16 @@ async def update_job(id: str, job_update: dict = Body(...)):
     # Update only the fields that are provided
     update_data = {k: v for k, v in job_update.items() if v is not None}
     
+    # The raw text lives in the blob store, not on the job document
+    raw_text = update_data.pop("raw_text", None)
+    
+    unknown = sorted(set(update_data) - set(JobDescription.model_fields))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown job description field(s): {', '.join(unknown)}"
+        )
+    
     # Handle special cases for nested objects
     if "requirements" in update_data:
         update_data["requirements"] = [
@@ -128,22 +162,30 @@ async def update_job(id: str, job_update: dict = Body(...)):
     # Save updates
     await job.save()
     
+    if raw_text is not None:
+        await put_text(OWNER_JOB, id, raw_text)
+        # Re-parse the new text in the worker; it queues its own rematch when done
+        parse_task = await task_queue.enqueue("parse_job", {"job_id": id})
+        response.headers["X-Parse-Task"] = parse_task["id"]
+    
+    # Recompute the matches whose job hash no longer agrees
+    task = await task_queue.enqueue("rematch", {"job_id": id})
+    response.headers["X-Rematch-Task"] = task["id"]
+    
     return job
 
 @router.get("/company/{name}", response_description="Search jobs by company name")
-async def search_jobs_by_company(name: str):
+async def search_jobs_by_company(name: str, limit: Optional[int] = None):
     """
-    Search for job descriptions by company name.
-    Uses a case-insensitive partial match.
+    Search for job descriptions by company name, best match first.
+    Case and accents are ignored; every word of name must start a word of the company.
     """
-    jobs = await JobDescription.find({"company": {"$regex": name, "$options": "i"}}).to_list()
-    return jobs
+    return await search_documents(JobDescription, "company_search", name, limit)
 
 @router.get("/title/{title}", response_description="Search jobs by title")
-async def search_jobs_by_title(title: str):
+async def search_jobs_by_title(title: str, limit: Optional[int] = None):
     """
-    Search for job descriptions by title.
-    Uses a case-insensitive partial match.
+    Search for job descriptions by title, best match first.
+    Case and accents are ignored; every word of title must start a word of the job title.
     """
-    jobs = await JobDescription.find({"title": {"$regex": title, "$options": "i"}}).to_list()
-    return jobs 
\ No newline at end of file
+    return await search_documents(JobDescription, "title_search", title, limit) 
\ No newline at end of file
@@ -1,14 +1,24 @@
 import os
 import shutil
-from typing import List
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Response, UploadFile, status
 from fastapi.responses import JSONResponse
 from motor.motor_asyncio import AsyncIOMotorClient
-from beanie import init_beanie
+from beanie import init_beanie, PydanticObjectId
 
 from app.core.config import settings
+from app.api.pagination import build_projection, paginate, RESUME_SUMMARY_FIELDS
+from app.api.export import stream_export
+from app.api.responses import fast_response
+from app.core.timing import span, tag
+from app.core.resources import parse_pool, run_in_pool
 from app.models.resume import Resume
-from app.services.resume_parser import ResumeParser
+from app.services.resume_parser import ResumeParser, parsed_resume_fields
+from app.services.search import search_documents
+from app.services.blob_store import OWNER_RESUME, put_text, get_text, attach_texts, delete_blobs
+from app.services.skill_index import skill_index, index_resume, SkillQueryError
+from app.services.vector_store import get_resume_vectors, store_resume_vectors
+from app.services.matching_engine import get_matching_engine
 
 router = APIRouter()
 resume_parser = ResumeParser()
@@ -19,6 +29,8 @@ async def upload_resume(file: UploadFile = File(...)):
     Upload a resume file (PDF or DOCX) and parse it.
     Returns the parsed resume data.
     """
+    tag(file_name=file.filename)
+    
     # Check file extension
     file_ext = os.path.splitext(file.filename)[1].lower()
     if file_ext not in ['.pdf', '.docx']:
@@ -33,37 +45,38 @@ async def upload_resume(file: UploadFile = File(...)):
     
     # Save the file
     file_path = os.path.join(upload_dir, file.filename)
-    with open(file_path, "wb") as buffer:
+    with span("upload.write"), open(file_path, "wb") as buffer:
         shutil.copyfileobj(file.file, buffer)
     
     try:
-        # Extract text from the resume
-        resume_text = resume_parser.extract_text(file_path)
-        
-        # Parse the resume text
-        parsed_resume = resume_parser.parse_resume(resume_text)
+        # Extract text from the resume and parse it on the parse pool, off the event loop
+        resume_text = await run_in_pool(parse_pool(), resume_parser.extract_text, file_path)
+        parsed_resume = await run_in_pool(parse_pool(), resume_parser.parse_resume, resume_text)
         
         # Create resume document
         resume = Resume(
-            candidate_name=parsed_resume.get("candidate_name", ""),
-            email=parsed_resume.get("email"),
-            phone=parsed_resume.get("phone"),
-            location=parsed_resume.get("location"),
-            linkedin=parsed_resume.get("links", {}).get("linkedin"),
-            github=parsed_resume.get("links", {}).get("github"),
-            website=parsed_resume.get("links", {}).get("website"),
-            summary=parsed_resume.get("summary"),
-            education=parsed_resume.get("education", []),
-            experience=parsed_resume.get("experience", []),
-            skills=[{"name": skill} for skill in parsed_resume.get("skills", [])],
+            **parsed_resume_fields(parsed_resume),
             file_name=file.filename,
             file_path=file_path,
-            file_type=file_ext.strip('.').upper(),
-            raw_text=resume_text
+            file_type=file_ext.strip('.').upper()
         )
         
-        # Save to database
-        await resume.save()
+        # Save to database; the raw text goes to the compressed blob store
+        with span("db.save"):
+            await resume.save()
+        tag(resume_id=resume.id)
+        await put_text(OWNER_RESUME, str(resume.id), resume_text)
+        
+        # Make the new resume searchable by skill
+        with span("index.skills"):
+            index_resume(resume.dict())
+        
+        # ...and by embedding (/analysis/similar-candidates); the startup backfill retries failures
+        try:
+            with span("index.vector"):
+                await store_resume_vectors(get_matching_engine(), [resume.dict()])
+        except Exception as e:
+            print(f"Error storing vector for resume {resume.id}: {e}")
         
         return resume
     
@@ -77,14 +90,65 @@ async def upload_resume(file: UploadFile = File(...)):
             detail=f"Error processing resume: {str(e)}"
         )
 
-@router.get("/", response_description="List all resumes")
-async def list_resumes():
+@router.get("/", response_description="List resumes")
+async def list_resumes(response: Response, limit: Optional[int] = None, cursor: Optional[str] = None,
+                       fields: Optional[str] = None, include_raw_text: bool = False,
+                       newest_first: bool = False, include_total: bool = False):
+    """
+    Retrieve a page of uploaded resumes.
+    Pass the X-Next-Cursor response header back as cursor for the next page.
+    newest_first lists the latest first; include_total adds an X-Total-Count header.
+    fields selects a comma-separated projection ("all" for every field); by default
+    a summary is returned. raw_text is only included with include_raw_text=true.
     """
-    Retrieve a list of all uploaded resumes.
+    projection = build_projection(Resume, fields, RESUME_SUMMARY_FIELDS)
+    resumes = await paginate(Resume, {}, projection, response, limit, cursor,
+                             newest_first, include_total)
+    if include_raw_text:
+        await attach_texts(OWNER_RESUME, resumes)
+    return fast_response(resumes, response)
+
+@router.get("/search", response_description="Search resumes by skill query")
+async def search_resumes_by_skills(q: str, min_years: Optional[float] = None, max_years: Optional[float] = None):
     """
-    resumes = await Resume.find_all().to_list()
+    Search resumes with a boolean skill query, e.g. "python AND kubernetes AND NOT php, min 5 years".
+    Supports AND, OR, NOT, parentheses, quoted multi-word skills and years-of-experience filters.
+    """
+    try:
+        resume_ids = skill_index.search(q, min_years=min_years, max_years=max_years)
+    except SkillQueryError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid skill query: {str(e)}"
+        )
+    
+    resumes = await Resume.find({"_id": {"$in": [PydanticObjectId(rid) for rid in resume_ids]}}).to_list()
     return resumes
 
+@router.get("/export", response_description="Stream candidates as NDJSON or CSV")
+async def export_resumes(format: str = "ndjson", q: Optional[str] = None, min_years: Optional[float] = None,
+                         max_years: Optional[float] = None, fields: Optional[str] = None,
+                         include_raw_text: bool = False):
+    """
+    Stream resumes as NDJSON or CSV, optionally filtered by a boolean skill
+    query and years of experience (see /resumes/search). fields selects the
+    exported columns ("all" for every field); raw_text only with include_raw_text=true.
+    """
+    query = {}
+    if q or min_years is not None or max_years is not None:
+        try:
+            resume_ids = skill_index.search(q or "", min_years=min_years, max_years=max_years)
+        except SkillQueryError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid skill query: {str(e)}"
+            )
+        query["_id"] = {"$in": [PydanticObjectId(rid) for rid in resume_ids]}
+    
+    projection = build_projection(Resume, fields, RESUME_SUMMARY_FIELDS)
+    return stream_export(Resume.get_motor_collection(), query, projection, format, "candidates",
+                         raw_text_owner=OWNER_RESUME if include_raw_text else None)
+
 @router.get("/{id}", response_description="Get a resume by ID")
 async def get_resume(id: str):
     """
@@ -98,6 +162,20 @@ async def get_resume(id: str):
         )
     return resume
 
+@router.get("/{id}/raw-text", response_description="Get the extracted text of a resume")
+async def get_resume_raw_text(id: str):
+    """
+    Retrieve the full text extracted from a resume file.
+    Kept out of the resume document itself and loaded only on request.
+    """
+    raw_text = await get_text(OWNER_RESUME, id)
+    if raw_text is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Raw text for resume with ID {id} not found"
+        )
+    return {"id": id, "raw_text": raw_text}
+
 @router.delete("/{id}", response_description="Delete a resume")
 async def delete_resume(id: str):
     """
@@ -117,14 +195,16 @@ async def delete_resume(id: str):
     
     # Delete from database
     await resume.delete()
+    await delete_blobs(OWNER_RESUME, id)
+    skill_index.remove_resume(id)
+    get_resume_vectors().delete([id])
     
     return JSONResponse(status_code=status.HTTP_200_OK, content={"message": "Resume deleted successfully"})
 
 @router.get("/candidate/{name}", response_description="Search resumes by candidate name")
-async def search_resume_by_name(name: str):
+async def search_resume_by_name(name: str, limit: Optional[int] = None):
     """
-    Search for resumes by candidate name.
-    Uses a case-insensitive partial match.
+    Search for resumes by candidate name, best match first.
+    Case and accents are ignored; every word of name must start a word of the candidate's name.
     """
-    resumes = await Resume.find({"candidate_name": {"$regex": name, "$options": "i"}}).to_list()
-    return resumes 
\ No newline at end of file
+    return await search_documents(Resume, "name_search", name, limit) 
\ No newline at end of file
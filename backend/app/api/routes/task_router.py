@@ -0,0 +1,66 @@
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, HTTPException, status
+from pydantic import BaseModel
+
+from app.services.task_queue import task_queue, TASK_STATUSES
+
+router = APIRouter()
+
+# Task types the worker process knows how to run (see app.services.task_handlers)
+TASK_TYPES = ("match", "rank", "rematch", "parse_resume", "parse_job")
+
+class TaskRequest(BaseModel):
+    task_type: str
+    payload: Dict[str, Any] = {}
+    max_attempts: Optional[int] = None  # Defaults to TASK_MAX_ATTEMPTS
+
+@router.post("/", response_description="Enqueue a background task", status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_task(task_request: TaskRequest):
+    """
+    Queue long-running analysis work (bulk ranking, re-parsing, rematching) for
+    the worker process. Poll GET /tasks/{id} for its status and result.
+    """
+    if task_request.task_type not in TASK_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown task type '{task_request.task_type}'; expected one of {', '.join(TASK_TYPES)}"
+        )
+    
+    try:
+        return await task_queue.enqueue(task_request.task_type, task_request.payload, task_request.max_attempts)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error enqueuing task: {str(e)}"
+        )
+
+@router.get("/", response_description="List background tasks")
+async def list_tasks(status_filter: Optional[str] = None, limit: int = 50):
+    """
+    List the most recent tasks, optionally filtered by status, together with
+    the number of tasks in each status.
+    """
+    if status_filter and status_filter not in TASK_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown status '{status_filter}'; expected one of {', '.join(TASK_STATUSES)}"
+        )
+    
+    return {
+        "counts": await task_queue.counts(),
+        "tasks": await task_queue.list(status_filter, limit)
+    }
+
+@router.get("/{id}", response_description="Get a background task")
+async def get_task(id: str):
+    """
+    Get the status, attempts, result or last error of a task.
+    """
+    task = await task_queue.get(id)
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task with ID {id} not found"
+        )
+    
+    return task
@@ -1,46 +1,176 @@
-from pymongo import MongoClient
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# MongoDB connection settings
-MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
-DB_NAME = os.getenv("DB_NAME", "resume_analyzer")
-
-# Create synchronous client for use in initialization scripts
-client = MongoClient(MONGO_URL)
-db = client[DB_NAME]
-
-# Create async client for use in FastAPI app
-async_client = AsyncIOMotorClient(MONGO_URL)
-async_db = async_client[DB_NAME]
-
-# Collection references
-resume_collection = db["resumes"]
-job_collection = db["jobs"]
-match_collection = db["matches"]
-
-# Async collection references
-async_resume_collection = async_db["resumes"]
-async_job_collection = async_db["jobs"]
-async_match_collection = async_db["matches"]
-
-# Initialize database with indexes
-def init_db():
-    # Create text indexes for search
-    resume_collection.create_index([("candidate_name", "text"), ("skills.name", "text")])
-    job_collection.create_index([("title", "text"), ("company_name", "text"), ("required_skills.name", "text")])
-    
-    # Create indexes for faster lookups
-    resume_collection.create_index("created_at")
-    job_collection.create_index("created_at")
-    match_collection.create_index([("resume_id", 1), ("job_id", 1)], unique=True)
-    match_collection.create_index("match_score")
-
-# Close connections when app shuts down
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import motor.motor_asyncio
+from beanie import init_beanie
+
+from app.core.config import settings
+from app.models.resume import Resume
+from app.models.job import JobDescription
+from app.models.analysis import ResumeJobMatch
+from app.models.task import Task
+from app.models.blob import DocumentBlob
+from app.models.lock import Lock
+from app.services.blob_store import migrate_raw_text
+from app.services.search import backfill_search_keys
+
+DOCUMENT_MODELS = [Resume, JobDescription, ResumeJobMatch, Task, DocumentBlob, Lock]
+
+# Query shapes the API and worker run on every request or lease. Each must be
+# answered from an index without an in-memory sort (and, if marked covered,
+# without reading documents); check_query_shapes() reports any that are not.
+# Filter values only need the right type.
+QUERY_SHAPES = [
+    {"name": "matches for a job by score", "model": ResumeJobMatch,
+     "filter": {"job_id": ""}, "sort": [("overall_score", -1)], "limit": 10},
+    {"name": "matches for a resume by score", "model": ResumeJobMatch,
+     "filter": {"resume_id": ""}, "sort": [("overall_score", -1)], "limit": 10},
+    {"name": "top candidates for a job, scores only", "model": ResumeJobMatch,
+     "filter": {"job_id": ""}, "sort": [("overall_score", -1)], "limit": 10,
+     "projection": {"_id": 0, "resume_id": 1, "job_id": 1, "overall_score": 1}, "covered": True},
+    {"name": "best jobs for a resume, scores only", "model": ResumeJobMatch,
+     "filter": {"resume_id": ""}, "sort": [("overall_score", -1)], "limit": 10,
+     "projection": {"_id": 0, "resume_id": 1, "job_id": 1, "overall_score": 1}, "covered": True},
+    {"name": "stored match for a pair", "model": ResumeJobMatch,
+     "filter": {"resume_id": "", "job_id": ""}, "limit": 1},
+    {"name": "stale matches for a job", "model": ResumeJobMatch,
+     "filter": {"job_id": "", "$or": [{"job_hash": {"$ne": ""}}, {"engine_version": {"$ne": ""}}]}},
+    {"name": "active jobs, newest first", "model": JobDescription,
+     "filter": {"is_active": True}, "sort": [("created_at", -1)], "limit": 50},
+    {"name": "resumes, newest first", "model": Resume,
+     "filter": {}, "sort": [("created_at", -1)], "limit": 50},
+    {"name": "candidate name search", "model": Resume,
+     "filter": {"name_search.prefixes": {"$all": ["ja", "doe"]}}, "limit": 200},
+    {"name": "job title search", "model": JobDescription,
+     "filter": {"title_search.normalized": {"$regex": "^senior eng"}}, "limit": 200},
+    {"name": "due queued tasks", "model": Task,
+     "filter": {"status": "queued", "available_at": {"$lte": datetime(2000, 1, 1)}},
+     "sort": [("available_at", 1)], "limit": 1},
+    {"name": "expired task leases", "model": Task,
+     "filter": {"status": "running", "lease_expires_at": {"$lt": datetime(2000, 1, 1)}}, "limit": 1},
+    {"name": "tasks by status, newest first", "model": Task,
+     "filter": {"status": "queued"}, "sort": [("created_at", -1)], "limit": 50},
+]
+
+_client: Optional[motor.motor_asyncio.AsyncIOMotorClient] = None
+
+
+def get_database():
+    global _client
+    if _client is None:
+        _client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGODB_URL)
+    return _client[settings.DATABASE_NAME]
+
+
+async def _dedupe_matches(database) -> int:
+    """
+    Keep only the most recently updated match per (resume_id, job_id) so the
+    unique index can be built. Only runs while that index is missing.
+    """
+    collection = database[ResumeJobMatch.Settings.name]
+    if "resume_job_unique" in await collection.index_information():
+        return 0
+
+    removed = 0
+    duplicates = collection.aggregate([
+        {"$sort": {"updated_at": -1}},
+        {"$group": {"_id": {"resume_id": "$resume_id", "job_id": "$job_id"},
+                    "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True)
+    async for group in duplicates:
+        result = await collection.delete_many({"_id": {"$in": group["ids"][1:]}})
+        removed += result.deleted_count
+    if removed:
+        print(f"Removed {removed} duplicate resume-job matches before building the unique index")
+    return removed
+
+
+async def init_db():
+    """
+    Connect Beanie and reconcile the indexes declared in each model's Settings:
+    missing indexes are created; indexes no model declares are dropped only
+    when DB_DROP_UNDECLARED_INDEXES is set.
+    """
+    database = get_database()
+    await _dedupe_matches(database)
+    await init_beanie(
+        database=database,
+        document_models=DOCUMENT_MODELS,
+        allow_index_dropping=settings.DB_DROP_UNDECLARED_INDEXES
+    )
+    await migrate_raw_text(database)
+    if settings.SEARCH_BACKFILL_ON_STARTUP:
+        await backfill_search_keys()
+    if settings.DB_CHECK_QUERIES_ON_STARTUP:
+        for problem in (await check_query_shapes())["problems"]:
+            print(f"Unindexed query: {problem}")
+
+
+def _plan_stages(plan: Dict) -> List[str]:
+    stages = [plan.get("stage", "")]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages.extend(_plan_stages(plan[key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+
+async def _explain(database, shape: Dict) -> Dict:
+    command = {"find": shape["model"].Settings.name, "filter": shape["filter"]}
+    if shape.get("sort"):
+        command["sort"] = dict(shape["sort"])
+    if shape.get("limit"):
+        command["limit"] = shape["limit"]
+    if shape.get("projection"):
+        command["projection"] = shape["projection"]
+    explained = await database.command({"explain": command, "verbosity": "queryPlanner"})
+    return explained["queryPlanner"]["winningPlan"]
+
+
+async def check_query_shapes(slow_ms: Optional[int] = None) -> Dict:
+    """
+    Explain every QUERY_SHAPES entry and flag collection scans and in-memory
+    sorts. When database profiling is on (db.setProfilingLevel), collection
+    scans slower than slow_ms recorded in system.profile are listed as well.
+    """
+    database = get_database()
+    slow_ms = settings.DB_SLOW_QUERY_MS if slow_ms is None else slow_ms
+
+    shapes, problems = [], []
+    for shape in QUERY_SHAPES:
+        stages = _plan_stages(await _explain(database, shape))
+        issues = []
+        if "COLLSCAN" in stages:
+            issues.append("collection scan")
+        if "SORT" in stages:
+            issues.append("in-memory sort")
+        if shape.get("covered") and "FETCH" in stages:
+            issues.append("not covered by its index")
+        shapes.append({"name": shape["name"], "collection": shape["model"].Settings.name,
+                       "stages": stages, "issues": issues})
+        if issues:
+            problems.append(f"{shape['name']}: {', '.join(issues)}")
+
+    slow_operations = []
+    cursor = database["system.profile"].find(
+        {"planSummary": "COLLSCAN", "millis": {"$gte": slow_ms}},
+        {"op": 1, "ns": 1, "command": 1, "millis": 1, "docsExamined": 1, "ts": 1}
+    ).sort("ts", -1).limit(50)
+    async for operation in cursor:
+        operation.pop("_id", None)
+        # The recorded command may hold BSON values; keep it readable
+        operation["command"] = str(operation.get("command", ""))[:500]
+        slow_operations.append(operation)
+    for operation in slow_operations:
+        problems.append(f"slow collection scan on {operation.get('ns')} ({operation.get('millis')} ms)")
+
+    return {"shapes": shapes, "slow_operations": slow_operations, "problems": problems}
+
+
 def close_mongo_connection():
-    client.close()
-    async_client.close() 
\ No newline at end of file
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
@@ -0,0 +1,132 @@
+import asyncio
+import math
+import time
+from typing import Dict, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+from app.core import metrics
+
+ADMISSION_IN_FLIGHT = metrics.registry.gauge(
+    "admission_in_flight", "Requests admitted and running, per limited route", ("route",)
+)
+ADMISSION_QUEUED = metrics.registry.gauge(
+    "admission_queued", "Requests waiting for a slot, per limited route", ("route",)
+)
+ADMISSION_LIMIT = metrics.registry.gauge(
+    "admission_limit", "Configured concurrency and queue limits, per limited route", ("route", "limit")
+)
+ADMISSION_REJECTED = metrics.registry.counter(
+    "admission_rejected_total", "Requests turned away (queue_full: 429, queue_timeout: 503)", ("route", "reason")
+)
+ADMISSION_WAIT = metrics.registry.histogram(
+    "admission_wait_seconds", "Time admitted requests spent waiting for a slot", ("route",)
+)
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AdmissionLimiter:
+    """
+    Concurrency limit with a bounded wait queue for one expensive route.
+
+    Up to max_concurrent requests run at once and up to max_queue more wait
+    for a slot. A request arriving to a full queue is rejected at once with
+    429; one that waits longer than queue_timeout seconds gets 503. Both
+    carry a Retry-After estimated from recent service times, so a burst
+    sheds load quickly instead of queueing work nobody will wait for.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.waiting = 0
+        # Moving average of how long an admitted request holds its slot
+        self.avg_seconds = 1.0
+        # Created on first use so it binds to the server's event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        ADMISSION_LIMIT.set(self.max_concurrent, route=name, limit="concurrency")
+        ADMISSION_LIMIT.set(self.max_queue, route=name, limit="queue")
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to free up for a new request."""
+        return max(1, math.ceil(self.avg_seconds * (self.waiting + 1) / self.max_concurrent))
+
+    def _reject(self, status_code: int, reason: str, detail: str) -> AdmissionRejected:
+        ADMISSION_REJECTED.inc(route=self.name, reason=reason)
+        return AdmissionRejected(status_code, detail, self.retry_after())
+
+    async def acquire(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                raise self._reject(429, "queue_full",
+                                   f"Too many {self.name} requests in progress; retry later")
+            self.waiting += 1
+            ADMISSION_QUEUED.inc(route=self.name)
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise self._reject(503, "queue_timeout",
+                                   f"Timed out waiting for a {self.name} slot; retry later")
+            finally:
+                self.waiting -= 1
+                ADMISSION_QUEUED.dec(route=self.name)
+            ADMISSION_WAIT.observe(time.perf_counter() - start, route=self.name)
+        else:
+            await self._semaphore.acquire()
+            ADMISSION_WAIT.observe(0.0, route=self.name)
+        ADMISSION_IN_FLIGHT.inc(route=self.name)
+
+    def release(self, held_seconds: float):
+        self.avg_seconds = 0.8 * self.avg_seconds + 0.2 * held_seconds
+        ADMISSION_IN_FLIGHT.dec(route=self.name)
+        self._semaphore.release()
+
+
+class AdmissionMiddleware:
+    """
+    Apply an AdmissionLimiter to matching routes before the request body is
+    read, so a rejected upload costs no memory. limits maps
+    (method, path) to a limiter; a trailing slash on the path is ignored.
+    """
+
+    def __init__(self, app, limits: Dict[Tuple[str, str], AdmissionLimiter]):
+        self.app = app
+        self.limits = {(method, path.rstrip("/")): limiter for (method, path), limiter in limits.items()}
+
+    async def __call__(self, scope, receive, send):
+        limiter = None
+        if scope["type"] == "http":
+            limiter = self.limits.get((scope["method"], scope["path"].rstrip("/")))
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await limiter.acquire()
+        except AdmissionRejected as rejected:
+            response = JSONResponse(
+                {"detail": rejected.detail}, status_code=rejected.status_code,
+                headers={"Retry-After": str(rejected.retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - start)
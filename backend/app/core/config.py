@@ -27,8 +27,133 @@ class Settings(BaseModel):
     EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
     SPACY_MODEL: str = "en_core_web_md"
     
+    # Embedding storage: float32, float16 or int8 (scalar quantized, per-vector scales)
+    EMBEDDING_DTYPE: str = os.getenv("EMBEDDING_DTYPE", "float16")
+    EMBEDDING_CACHE_SIZE: int = int(os.getenv("EMBEDDING_CACHE_SIZE", "100000"))
+    
+    # Matching tier ("lexical", "static" or "full") and latency budget (0 = none)
+    MATCH_DEFAULT_MODE: str = os.getenv("MATCH_DEFAULT_MODE", "full")
+    MATCH_DEFAULT_DEADLINE_MS: float = float(os.getenv("MATCH_DEFAULT_DEADLINE_MS", "0"))
+    
+    # "rematch" tasks recompute stored matches after a job or resume changes (run by app.worker)
+    REMATCH_BATCH_SIZE: int = int(os.getenv("REMATCH_BATCH_SIZE", "16"))
+    REMATCH_MODE: str = os.getenv("REMATCH_MODE", "full")
+    # MATCH_STORAGE_MODE "compact" stores only IDs and scores; details are recomputed on read
+    MATCH_STORAGE_MODE: str = os.getenv("MATCH_STORAGE_MODE", "full")
+    # Concurrent identical /analysis/match requests share one computation per process;
+    # MATCH_LOCK_ENABLED also serializes them across processes through a Mongo lock
+    MATCH_SINGLE_FLIGHT: bool = os.getenv("MATCH_SINGLE_FLIGHT", "true").lower() in ("1", "true", "yes")
+    MATCH_LOCK_ENABLED: bool = os.getenv("MATCH_LOCK_ENABLED", "false").lower() in ("1", "true", "yes")
+    MATCH_LOCK_TTL_SECONDS: float = float(os.getenv("MATCH_LOCK_TTL_SECONDS", "60"))
+    MATCH_LOCK_WAIT_SECONDS: float = float(os.getenv("MATCH_LOCK_WAIT_SECONDS", "30"))
+    MATCH_LOCK_POLL_MS: float = float(os.getenv("MATCH_LOCK_POLL_MS", "100"))
+    # Match results per unordered bulk write (rank and rematch jobs)
+    MATCH_WRITE_BATCH_SIZE: int = int(os.getenv("MATCH_WRITE_BATCH_SIZE", "1000"))
+    
+    # Admission control for the expensive write/match routes: at most *_CONCURRENCY requests
+    # run per process and *_QUEUE more wait up to ADMISSION_QUEUE_TIMEOUT_SECONDS for a slot.
+    # A full queue answers 429, a timed-out wait 503, both with Retry-After.
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() in ("1", "true", "yes")
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "10"))
+    ADMISSION_UPLOAD_CONCURRENCY: int = int(os.getenv("ADMISSION_UPLOAD_CONCURRENCY", "4"))
+    ADMISSION_UPLOAD_QUEUE: int = int(os.getenv("ADMISSION_UPLOAD_QUEUE", "16"))
+    ADMISSION_JOB_CONCURRENCY: int = int(os.getenv("ADMISSION_JOB_CONCURRENCY", "4"))
+    ADMISSION_JOB_QUEUE: int = int(os.getenv("ADMISSION_JOB_QUEUE", "16"))
+    ADMISSION_MATCH_CONCURRENCY: int = int(os.getenv("ADMISSION_MATCH_CONCURRENCY", "8"))
+    ADMISSION_MATCH_QUEUE: int = int(os.getenv("ADMISSION_MATCH_QUEUE", "32"))
+    
+    # Production server (python -m app.server): models load once, then SERVER_WORKERS processes
+    # are forked (0 = one per available core)
+    SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT: int = int(os.getenv("SERVER_PORT", "8000"))
+    SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", "0"))
+    SERVER_BACKLOG: int = int(os.getenv("SERVER_BACKLOG", "2048"))
+    
+    # CPU thread budget per worker process (app/core/resources.py). Each pool is derived from
+    # the worker's share of the cores (SERVER_THREADS_PER_WORKER, 0 = available cores / workers)
+    # unless set: torch intra-op threads, BLAS threads per calling thread, and the thread pools
+    # running matches and parses. CPU_AFFINITY pins workers: "" (off), "auto" (a separate block
+    # of cores per server worker) or a CPU list like "0-7,12". Startup warns, or fails with
+    # CPU_BUDGET_STRICT, when all workers together can keep more threads busy than there are cores.
+    # MATCH_POOL_MIN keeps enough match threads per worker to feed the encoder's micro-batches
+    # and the match admission limit even when a worker's share is a single core.
+    SERVER_THREADS_PER_WORKER: int = int(os.getenv("SERVER_THREADS_PER_WORKER", "0"))
+    TORCH_THREADS: int = int(os.getenv("TORCH_THREADS", "0"))
+    BLAS_THREADS: int = int(os.getenv("BLAS_THREADS", "1"))
+    MATCH_POOL_SIZE: int = int(os.getenv("MATCH_POOL_SIZE", "0"))
+    MATCH_POOL_MIN: int = int(os.getenv("MATCH_POOL_MIN", "8"))
+    PARSE_POOL_SIZE: int = int(os.getenv("PARSE_POOL_SIZE", "0"))
+    CPU_AFFINITY: str = os.getenv("CPU_AFFINITY", "")
+    CPU_BUDGET_STRICT: bool = os.getenv("CPU_BUDGET_STRICT", "false").lower() in ("1", "true", "yes")
+    
+    # Micro-batching of sentence-transformer encodes across concurrent requests; a batch
+    # waits up to INFERENCE_MAX_WAIT_MS only while another match may still add to it
+    INFERENCE_MAX_BATCH_SIZE: int = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "32"))
+    INFERENCE_MAX_WAIT_MS: float = float(os.getenv("INFERENCE_MAX_WAIT_MS", "5"))
+    
+    # Memory-mapped corpus vector store shared by all workers on a host
+    VECTOR_STORE_DIR: str = os.getenv("VECTOR_STORE_DIR", "./vector_store")
+    VECTOR_STORE_COMPACT_RATIO: float = float(os.getenv("VECTOR_STORE_COMPACT_RATIO", "0.2"))
+    VECTOR_STORE_COMPACT_INTERVAL_SECONDS: int = int(os.getenv("VECTOR_STORE_COMPACT_INTERVAL_SECONDS", "3600"))
+    # Embed resumes missing from the vector store at startup (one worker per host does it)
+    VECTOR_STORE_BACKFILL_ON_STARTUP: bool = os.getenv("VECTOR_STORE_BACKFILL_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+    
+    # Durable task queue ("mongo" or "memory") and the worker process that drains it
+    TASK_QUEUE_BACKEND: str = os.getenv("TASK_QUEUE_BACKEND", "mongo")
+    TASK_VISIBILITY_TIMEOUT_SECONDS: int = int(os.getenv("TASK_VISIBILITY_TIMEOUT_SECONDS", "300"))
+    TASK_MAX_ATTEMPTS: int = int(os.getenv("TASK_MAX_ATTEMPTS", "3"))
+    TASK_RETRY_BACKOFF_SECONDS: int = int(os.getenv("TASK_RETRY_BACKOFF_SECONDS", "30"))
+    WORKER_CONCURRENCY: int = int(os.getenv("WORKER_CONCURRENCY", "1"))
+    WORKER_POLL_INTERVAL_SECONDS: float = float(os.getenv("WORKER_POLL_INTERVAL_SECONDS", "1"))
+    
+    # Per-stage request timings: log one JSON line per request at or above TIMING_LOG_MIN_MS.
+    # Clients can always ask for a Server-Timing header with "X-Timing: 1" or "?timing=1".
+    TIMING_ENABLED: bool = os.getenv("TIMING_ENABLED", "false").lower() in ("1", "true", "yes")
+    TIMING_LOG_MIN_MS: float = float(os.getenv("TIMING_LOG_MIN_MS", "0"))
+    
+    # /metrics: with METRICS_DIR set, every worker writes a snapshot there and scrapes merge them
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+    METRICS_DIR: str = os.getenv("METRICS_DIR", "")
+    METRICS_FLUSH_SECONDS: float = float(os.getenv("METRICS_FLUSH_SECONDS", "10"))
+    METRICS_STALE_SECONDS: float = float(os.getenv("METRICS_STALE_SECONDS", "60"))
+    # Task counts by status come from a Mongo aggregate, refreshed at most this often
+    TASK_METRICS_INTERVAL_SECONDS: float = float(os.getenv("TASK_METRICS_INTERVAL_SECONDS", "30"))
+    
+    # Opt-in request profiling for admins: send "X-Profile: 1" (or a sampling rate like 0.1)
+    # with "X-Admin-Token". Disabled while ADMIN_TOKEN is empty.
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "./profiles")
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "1.0"))
+    PROFILE_INTERVAL_MS: float = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    PROFILE_MAX_SECONDS: float = float(os.getenv("PROFILE_MAX_SECONDS", "120"))
+    
+    # Indexes declared on the models are created at startup; undeclared ones are only
+    # dropped with DB_DROP_UNDECLARED_INDEXES. Collection scans slower than
+    # DB_SLOW_QUERY_MS show up in GET /admin/query-check (with database profiling on).
+    DB_DROP_UNDECLARED_INDEXES: bool = os.getenv("DB_DROP_UNDECLARED_INDEXES", "false").lower() in ("1", "true", "yes")
+    DB_CHECK_QUERIES_ON_STARTUP: bool = os.getenv("DB_CHECK_QUERIES_ON_STARTUP", "false").lower() in ("1", "true", "yes")
+    DB_SLOW_QUERY_MS: int = int(os.getenv("DB_SLOW_QUERY_MS", "100"))
+    
+    # Raw text (and other bulky per-document data) is stored zlib-compressed in document_blobs
+    BLOB_COMPRESSION_LEVEL: int = int(os.getenv("BLOB_COMPRESSION_LEVEL", "6"))
+    
     # File storage settings
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "./uploads")
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10 MB
+    
+    # List endpoints: keyset pagination page sizes
+    PAGE_SIZE_DEFAULT: int = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+    PAGE_SIZE_MAX: int = int(os.getenv("PAGE_SIZE_MAX", "500"))
+    
+    # Streaming exports: documents fetched from Mongo and flushed to the client per batch
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+    
+    # Search settings
+    # Name/title/company search ranks at most SEARCH_CANDIDATE_LIMIT index hits per lookup
+    SEARCH_CANDIDATE_LIMIT: int = int(os.getenv("SEARCH_CANDIDATE_LIMIT", "200"))
+    SEARCH_RESULT_LIMIT: int = int(os.getenv("SEARCH_RESULT_LIMIT", "20"))
+    SEARCH_BACKFILL_ON_STARTUP: bool = os.getenv("SEARCH_BACKFILL_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+    # Other workers' uploads/deletes are picked up by a periodic rebuild (0 disables)
+    SKILL_INDEX_REFRESH_SECONDS: int = int(os.getenv("SKILL_INDEX_REFRESH_SECONDS", "300"))
 
 settings = Settings() 
\ No newline at end of file
@@ -0,0 +1,450 @@
+import asyncio
+import bisect
+import glob
+import json
+import os
+import resource
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+from app.core.config import settings
+
+# Counters and histograms of exited processes are folded into this snapshot file
+EXITED_SNAPSHOT = "metrics-exited.json"
+RETIRE_LOCK_FILE = "retire.lock"
+
+# Default latency buckets in seconds (request and stage durations)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _ThreadShards:
+    """
+    One dict per thread that writes to a metric, so updates take no lock.
+    Only the owning thread writes a shard, and every write is a single item
+    assignment; dict(shard) copies a shard in one step under the GIL, so a
+    reader sees each value either before or after an update, never half of one.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._all: List[Dict] = []
+
+    def get(self) -> Dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            self._all.append(shard)
+        return shard
+
+    def snapshots(self) -> List[Dict]:
+        return [dict(shard) for shard in list(self._all)]
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(label, "")) for label in self.labelnames)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._shards = _ThreadShards()
+
+    def inc(self, amount: float = 1.0, **labels):
+        shard = self._shards.get()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def collect(self) -> Dict[Tuple[str, ...], float]:
+        values: Dict[Tuple[str, ...], float] = {}
+        for shard in self._shards.snapshots():
+            for key, value in shard.items():
+                values[key] = values.get(key, 0.0) + value
+        return values
+
+
+class Gauge(Metric):
+    """Per-process value: set() for last-write-wins readings, inc()/dec() for levels like in-flight."""
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._shards = _ThreadShards()
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        shard = self._shards.get()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def collect(self) -> Dict[Tuple[str, ...], float]:
+        values = dict(self._values)
+        for shard in self._shards.snapshots():
+            for key, value in shard.items():
+                values[key] = values.get(key, 0.0) + value
+        return values
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _ThreadShards()
+
+    def observe(self, value: float, **labels):
+        shard = self._shards.get()
+        key = self._key(labels)
+        bucket = bisect.bisect_left(self.buckets, value)
+        # Per-bucket (non-cumulative) counts, then sum and count. The row is
+        # replaced rather than updated in place, so a snapshot holding the old
+        # one never sees a bucket counted without its sum and count.
+        row = shard.get(key)
+        row = list(row) if row is not None else [0] * (len(self.buckets) + 1) + [0.0, 0]
+        row[bucket] += 1
+        row[-2] += value
+        row[-1] += 1
+        shard[key] = row
+
+    def collect(self) -> Dict[Tuple[str, ...], List[float]]:
+        values: Dict[Tuple[str, ...], List[float]] = {}
+        for shard in self._shards.snapshots():
+            for key, row in shard.items():
+                if key in values:
+                    values[key] = [a + b for a, b in zip(values[key], row)]
+                else:
+                    values[key] = list(row)
+        return values
+
+
+Collector = Callable[[], Union[None, Awaitable[None]]]
+
+
+class MetricsRegistry:
+    """
+    Process-local metrics plus, when METRICS_DIR is set, per-process snapshot
+    files that any worker merges on scrape: counters and histograms are summed
+    across processes, gauges are reported per process with a pid label.
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self._collectors: List[Collector] = []
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def register_collector(self, collector: Collector):
+        """Callback run before every snapshot to refresh gauges (may be async)."""
+        self._collectors.append(collector)
+
+    def _register(self, metric: Metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    async def run_collectors(self):
+        for collector in self._collectors:
+            try:
+                result = collector()
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+
+    def snapshot(self) -> Dict:
+        return {
+            "pid": os.getpid(),
+            "time": time.time(),
+            "metrics": {
+                name: {
+                    "type": metric.kind,
+                    "help": metric.help,
+                    "labelnames": list(metric.labelnames),
+                    "buckets": list(getattr(metric, "buckets", [])),
+                    "values": [[list(key), value] for key, value in metric.collect().items()]
+                }
+                for name, metric in self.metrics.items()
+            }
+        }
+
+    def write_snapshot(self):
+        if not settings.METRICS_DIR:
+            return
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        path = os.path.join(settings.METRICS_DIR, f"metrics-{os.getpid()}.json")
+        # Write then rename so readers never see a partial file
+        with open(path + ".tmp", "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(path + ".tmp", path)
+
+    def _read_snapshots(self) -> List[Dict]:
+        if not settings.METRICS_DIR:
+            return [self.snapshot()]
+        snapshots = _load_snapshots(settings.METRICS_DIR)
+        exited = [path for path, snap in snapshots.items() if _exited(snap, settings.METRICS_STALE_SECONDS)]
+        if exited and _retire_snapshots(settings.METRICS_DIR, exited, settings.METRICS_STALE_SECONDS):
+            snapshots = _load_snapshots(settings.METRICS_DIR)
+        return list(snapshots.values())
+
+    async def render(self) -> str:
+        """Prometheus text exposition of all processes' metrics."""
+        await self.run_collectors()
+        self.write_snapshot()
+        return render_snapshots(self._read_snapshots(), settings.METRICS_STALE_SECONDS)
+
+
+def _load_snapshots(directory: str) -> Dict[str, Dict]:
+    snapshots = {}
+    for path in glob.glob(os.path.join(directory, "metrics-*.json")):
+        try:
+            with open(path) as f:
+                snapshots[path] = json.load(f)
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def _exited(snapshot: Dict, stale_seconds: float) -> bool:
+    """A snapshot left by a process that stopped writing it and no longer exists."""
+    pid = snapshot.get("pid")
+    if not isinstance(pid, int) or time.time() - snapshot.get("time", 0) <= stale_seconds:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+def _fold_snapshot(into: Dict, snapshot: Dict):
+    """Add a snapshot's counters and histograms to another; gauges die with their process."""
+    for name, metric in snapshot["metrics"].items():
+        if metric["type"] == "gauge":
+            continue
+        entry = into["metrics"].setdefault(name, {**metric, "values": []})
+        values = {tuple(key): value for key, value in entry["values"]}
+        for key, value in metric["values"]:
+            current = values.get(tuple(key))
+            if current is None:
+                values[tuple(key)] = value
+            elif metric["type"] == "histogram":
+                values[tuple(key)] = [a + b for a, b in zip(current, value)]
+            else:
+                values[tuple(key)] = current + value
+        entry["values"] = [[list(key), value] for key, value in values.items()]
+
+
+def _retire_snapshots(directory: str, paths: List[str], stale_seconds: float) -> bool:
+    """
+    Fold the snapshots of exited processes into EXITED_SNAPSHOT, so their
+    counters keep counting, and remove their files. Returns False if another
+    process is already doing it.
+    """
+    with open(os.path.join(directory, RETIRE_LOCK_FILE), "a") as lock_file:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+
+        exited_path = os.path.join(directory, EXITED_SNAPSHOT)
+        try:
+            with open(exited_path) as f:
+                exited = json.load(f)
+        except (OSError, ValueError):
+            exited = {"pid": "exited", "time": 0, "metrics": {}}
+
+        # Read them again under the lock: another process may have retired them meanwhile
+        retired = []
+        for path in paths:
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if _exited(snapshot, stale_seconds):
+                _fold_snapshot(exited, snapshot)
+                retired.append(path)
+
+        if retired:
+            with open(exited_path + ".tmp", "w") as f:
+                json.dump(exited, f)
+            os.replace(exited_path + ".tmp", exited_path)
+            for path in retired:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        return True
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = list(zip(names, values)) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def render_snapshots(snapshots: List[Dict], stale_seconds: float) -> str:
+    now = time.time()
+    merged: Dict[str, Dict] = {}
+    for snap in snapshots:
+        # Gauges of exited workers stop being reported; their counters keep counting
+        live = now - snap.get("time", now) <= stale_seconds
+        for name, metric in snap["metrics"].items():
+            entry = merged.setdefault(name, {**metric, "values": {}})
+            for key, value in metric["values"]:
+                if metric["type"] == "gauge":
+                    if live:
+                        entry["values"][tuple(key) + (str(snap["pid"]),)] = value
+                elif metric["type"] == "histogram":
+                    current = entry["values"].get(tuple(key))
+                    entry["values"][tuple(key)] = [a + b for a, b in zip(current, value)] if current else list(value)
+                else:
+                    entry["values"][tuple(key)] = entry["values"].get(tuple(key), 0.0) + value
+
+    lines = []
+    for name in sorted(merged):
+        metric = merged[name]
+        labelnames = metric["labelnames"]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for key, value in sorted(metric["values"].items()):
+            if metric["type"] == "gauge":
+                lines.append(f"{name}{_format_labels(labelnames + ['pid'], key)} {_format_value(value)}")
+            elif metric["type"] == "histogram":
+                cumulative = 0
+                for bound, count in zip(metric["buckets"] + [float("inf")], value[:-2]):
+                    cumulative += count
+                    le = {"le": _format_value(bound)}
+                    lines.append(f"{name}_bucket{_format_labels(labelnames, key, le)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labelnames, key)} {_format_value(value[-2])}")
+                lines.append(f"{name}_count{_format_labels(labelnames, key)} {_format_value(value[-1])}")
+            else:
+                lines.append(f"{name}{_format_labels(labelnames, key)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def process_rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+registry = MetricsRegistry()
+
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+REQUESTS_IN_FLIGHT = registry.gauge("http_requests_in_flight", "HTTP requests currently being handled")
+STAGE_DURATION = registry.histogram(
+    "stage_duration_seconds", "Duration of timed stages (parsing, matching, encodes, database)", ("stage",)
+)
+MODEL_LOAD_SECONDS = registry.gauge("model_load_seconds", "Time taken to load each model", ("model",))
+PROCESS_RSS = registry.gauge("process_resident_memory_bytes", "Resident memory of the process")
+
+registry.register_collector(lambda: PROCESS_RSS.set(process_rss_bytes()))
+
+
+def observe_span(name: str, seconds: float):
+    """Span listener: every timed stage feeds the stage histogram."""
+    STAGE_DURATION.observe(seconds, stage=name)
+    if ".model_load" in name:
+        # e.g. "match.model_load.transformer" -> model="match.transformer"
+        MODEL_LOAD_SECONDS.set(seconds, model=name.replace(".model_load", ""))
+
+
+async def flush_snapshots():
+    """Keep this process's snapshot fresh for scrapes served by other workers."""
+    while True:
+        await asyncio.sleep(settings.METRICS_FLUSH_SECONDS)
+        try:
+            await registry.run_collectors()
+            registry.write_snapshot()
+        except Exception as e:
+            print(f"Error writing metrics snapshot: {e}")
+
+
+def _route_label(scope: Dict) -> str:
+    # The router stores the matched route in the scope; unmatched paths share one label
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    endpoint = scope.get("endpoint")
+    return getattr(endpoint, "__name__", "unmatched")
+
+
+class MetricsMiddleware:
+    """Request latency histogram and in-flight gauge for every HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            REQUEST_DURATION.observe(
+                time.perf_counter() - start,
+                method=scope["method"], route=_route_label(scope), status=status_code
+            )
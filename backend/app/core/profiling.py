@@ -0,0 +1,207 @@
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+
+from app.core.config import settings
+from app.core.timing import Trace, current_trace, activate
+
+# Admin switch: "X-Profile: 1" (or a sampling rate such as "0.1", also accepted as ?profile=...)
+# plus "X-Admin-Token". The token is only read from the header so it stays out of access logs.
+PROFILE_HEADER = b"x-profile"
+ADMIN_TOKEN_HEADER = b"x-admin-token"
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler for one request.
+
+    A background thread snapshots the stacks of the threads working on the
+    request every interval_ms. The event loop thread is sampled throughout;
+    threadpool threads are sampled while they run a timing span of the
+    request's trace (see app.core.timing.span). Stacks are counted in the
+    folded format flamegraph.pl and speedscope read.
+    """
+
+    def __init__(self, interval_ms: float = 5.0, max_seconds: float = 60.0):
+        self.interval = max(0.001, interval_ms / 1000.0)
+        self.max_seconds = max_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._threads: Dict[int, int] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def enter_thread(self):
+        ident = threading.get_ident()
+        self._threads[ident] = self._threads.get(ident, 0) + 1
+
+    def exit_thread(self):
+        ident = threading.get_ident()
+        depth = self._threads.get(ident, 0) - 1
+        if depth > 0:
+            self._threads[ident] = depth
+        else:
+            self._threads.pop(ident, None)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            frames = sys._current_frames()
+            for ident in list(self._threads):
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.stacks[self._fold(frame)] += 1
+                    self.samples += 1
+
+    @staticmethod
+    def _fold(frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _profile_rate(scope: Dict) -> Optional[float]:
+    """Requested sampling rate if the request carries a valid admin profiling flag."""
+    if not settings.ADMIN_TOKEN:
+        return None
+
+    headers = dict(scope.get("headers", []))
+    flag = headers.get(PROFILE_HEADER, b"").decode("latin-1")
+    token = headers.get(ADMIN_TOKEN_HEADER, b"").decode("latin-1")
+    query = scope.get("query_string", b"")
+    if query and b"profile" in query:
+        params = parse_qs(query.decode("latin-1"))
+        flag = flag or params.get("profile", [""])[0]
+
+    if not flag or not hmac.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode()):
+        return None
+    if flag.lower() in ("1", "true", "yes"):
+        return settings.PROFILE_SAMPLE_RATE
+    try:
+        return min(1.0, max(0.0, float(flag)))
+    except ValueError:
+        return None
+
+
+def _safe(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", str(value)).strip("_")[:80]
+
+
+def _request_tags(trace: Trace, scope: Dict) -> Dict:
+    tags = dict(scope.get("path_params", {}))
+    tags.update(trace.tags)
+    return tags
+
+
+def profile_path(trace: Trace, scope: Dict) -> str:
+    """<PROFILE_DIR>/<time>-<path>[-resume-<id>][-job-<id>], without extension."""
+    tags = _request_tags(trace, scope)
+    parts = [datetime.now().strftime("%Y%m%d-%H%M%S-%f"), _safe(scope["path"])]
+    for key in ("resume_id", "job_id"):
+        if tags.get(key):
+            parts.append(f"{key[:-3]}-{_safe(tags[key])}")
+    return os.path.join(settings.PROFILE_DIR, "-".join(part for part in parts if part))
+
+
+def write_profile(profiler: SamplingProfiler, trace: Trace, scope: Dict, status_code: Optional[int], base: str):
+    """Write the folded stacks to <base>.folded and the request details to <base>.json."""
+    os.makedirs(os.path.dirname(base) or ".", exist_ok=True)
+    with open(base + ".folded", "w") as f:
+        f.write(profiler.folded())
+    with open(base + ".json", "w") as f:
+        json.dump({
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "tags": _request_tags(trace, scope),
+            "total_ms": round(trace.elapsed_ms(), 3),
+            "samples": profiler.samples,
+            "interval_ms": profiler.interval * 1000.0,
+            "spans": trace.summary()
+        }, f, indent=2, default=str)
+
+
+class ProfilingMiddleware:
+    """
+    Runs admin-flagged requests under SamplingProfiler and writes the profile
+    to PROFILE_DIR, named after the path and any resume/job IDs the handler
+    tagged (see app.core.timing.tag). The file name is returned in an
+    X-Profile-File header. Requests without a valid flag pass straight through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rate = _profile_rate(scope)
+        if rate is None or random.random() >= rate:
+            await self.app(scope, receive, send)
+            return
+
+        # Reuse the timing trace if there is one so spans show up in both places
+        trace = current_trace()
+        context = nullcontext()
+        if trace is None:
+            trace = Trace(f"{scope['method']} {scope['path']}")
+            context = activate(trace)
+
+        profiler = SamplingProfiler(settings.PROFILE_INTERVAL_MS, settings.PROFILE_MAX_SECONDS)
+        trace.profiler = profiler
+        profiler.enter_thread()
+        profiler.start()
+        status_code = None
+        base = None
+
+        async def send_with_profile(message):
+            nonlocal status_code, base
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # The handler has tagged its IDs by now; name the file before the headers go out
+                base = profile_path(trace, scope)
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-file", os.path.basename(base).encode("latin-1") + b".folded"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            with context:
+                await self.app(scope, receive, send_with_profile)
+        finally:
+            profiler.stop()
+            profiler.exit_thread()
+            trace.profiler = None
+            try:
+                base = base or profile_path(trace, scope)
+                write_profile(profiler, trace, scope, status_code, base)
+                print(f"Wrote profile {base}.folded ({profiler.samples} samples)")
+            except OSError as e:
+                print(f"Error writing profile: {e}")
@@ -0,0 +1,237 @@
+"""
+CPU thread budget for one API or task worker process.
+
+The sentence transformer (torch), numpy/sklearn (BLAS), the pool that runs
+matches and the pool that runs spaCy parses each start threads of their own,
+and every server worker has all of them. Left alone, each library sizes its
+pool to the whole machine and N workers oversubscribe the cores N times.
+ThreadBudget derives every pool size from the cores one worker gets, lets
+Settings override each, and checks that the total fits the host.
+"""
+import asyncio
+import contextvars
+import functools
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core import metrics
+
+# Native math libraries read these when they are first imported
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+CPU_BUDGET = metrics.registry.gauge("cpu_budget_threads", "Threads allotted to each CPU consumer in this worker", ("pool",))
+
+
+def parse_cpu_list(value: str) -> List[int]:
+    """ "0-3,8" -> [0, 1, 2, 3, 8] """
+    cpus = set()
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-", 1)
+            cpus.update(range(int(first), int(last) + 1))
+        else:
+            cpus.add(int(part))
+    return sorted(cpus)
+
+
+def allowed_cpus() -> List[int]:
+    """CPUs this process may run on (the container's cpuset, not the whole host)."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def available_cores() -> int:
+    """Allowed CPUs, further limited by a cgroup v2 CPU quota (docker --cpus) if one is set."""
+    cores = len(allowed_cpus())
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cores = min(cores, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cores
+
+
+def worker_count() -> int:
+    """Processes the production server forks (SERVER_WORKERS, 0 = one per core)."""
+    return settings.SERVER_WORKERS if settings.SERVER_WORKERS > 0 else available_cores()
+
+
+class ThreadBudget:
+    """
+    Thread counts for one worker out of workers, each derived from the
+    worker's share of the cores unless set explicitly:
+
+      torch_threads  sentence-transformer intra-op threads (TORCH_THREADS, default: 3/4 of the share)
+      blas_threads   numpy/sklearn BLAS threads per calling thread (BLAS_THREADS)
+      match_threads  threads running match_resume_to_job (MATCH_POOL_SIZE, default: 3/4 of the
+                     share, at least MATCH_POOL_MIN)
+      parse_threads  threads running text extraction and spaCy (PARSE_POOL_SIZE, default: 1/4 of
+                     the share, at least 1)
+
+    Match threads in full mode mostly wait on the encoder, and uploads are rare
+    next to matches, so the threads the minimums add on top of the share are
+    not counted as busy: a worker can keep max(torch, match * blas) + parse * blas
+    cores busy, counting the share-derived (or explicit) pool sizes.
+    """
+
+    def __init__(self, workers: int = 1, cores: Optional[int] = None):
+        self.workers = max(1, workers)
+        self.cores = available_cores() if cores is None else cores
+        self.cores_per_worker = settings.SERVER_THREADS_PER_WORKER or max(1, self.cores // self.workers)
+
+        share = self.cores_per_worker
+        self._busy_parse = settings.PARSE_POOL_SIZE or share // 4
+        self._busy_match = settings.MATCH_POOL_SIZE or max(1, share - share // 4)
+        self.parse_threads = max(1, self._busy_parse)
+        self.match_threads = settings.MATCH_POOL_SIZE or max(settings.MATCH_POOL_MIN, self._busy_match)
+        self.torch_threads = settings.TORCH_THREADS or self._busy_match
+        self.blas_threads = max(1, settings.BLAS_THREADS)
+
+    def worker_threads(self) -> int:
+        """Cores one worker can keep busy at once."""
+        return max(self.torch_threads, self._busy_match * self.blas_threads) + self._busy_parse * self.blas_threads
+
+    def affinity(self, slot: Optional[int] = None) -> Optional[List[int]]:
+        """
+        CPUs to pin this worker to: CPU_AFFINITY as a CPU list, or with "auto" the
+        slot-th block of cores_per_worker allowed CPUs (server workers only).
+        """
+        if not settings.CPU_AFFINITY:
+            return None
+        if settings.CPU_AFFINITY != "auto":
+            return parse_cpu_list(settings.CPU_AFFINITY)
+        if slot is None:
+            return None
+        cpus = allowed_cpus()
+        start = slot * self.cores_per_worker
+        return [cpus[(start + offset) % len(cpus)] for offset in range(min(self.cores_per_worker, len(cpus)))]
+
+    def problems(self) -> List[str]:
+        problems = []
+        total = self.workers * self.worker_threads()
+        if total > self.cores:
+            problems.append(
+                f"{self.workers} worker(s) x {self.worker_threads()} busy threads = {total} "
+                f"exceeds {self.cores} available cores"
+            )
+        if settings.CPU_AFFINITY not in ("", "auto"):
+            pinned = parse_cpu_list(settings.CPU_AFFINITY)
+            outside = sorted(set(pinned) - set(allowed_cpus()))
+            if outside:
+                problems.append(f"CPU_AFFINITY lists CPUs this process may not use: {outside}")
+            elif len(pinned) < self.worker_threads():
+                problems.append(
+                    f"CPU_AFFINITY pins {len(pinned)} CPU(s) for {self.worker_threads()} busy threads"
+                )
+        return problems
+
+    def as_dict(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "cores": self.cores,
+            "cores_per_worker": self.cores_per_worker,
+            "torch_threads": self.torch_threads,
+            "blas_threads": self.blas_threads,
+            "match_threads": self.match_threads,
+            "parse_threads": self.parse_threads,
+            "worker_threads": self.worker_threads()
+        }
+
+
+def limit_native_threads(budget: ThreadBudget):
+    """Size the OpenMP/BLAS pools; only effective before numpy and torch are imported."""
+    for name in THREAD_ENV_VARS:
+        os.environ.setdefault(name, str(budget.blas_threads))
+    # The Rust tokenizers disable their pool after fork anyway; do it up front without the warning
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+
+_budget: Optional[ThreadBudget] = None
+_configured_pid: Optional[int] = None
+
+
+def check_budget(budget: ThreadBudget):
+    """Print the budget's problems, or raise them with CPU_BUDGET_STRICT."""
+    problems = budget.problems()
+    for problem in problems:
+        print(f"CPU budget: {problem}")
+    if problems and settings.CPU_BUDGET_STRICT:
+        raise RuntimeError(f"CPU thread budget exceeded: {'; '.join(problems)}")
+
+
+def configure_process(workers: int = 1, slot: Optional[int] = None, check: bool = True) -> ThreadBudget:
+    """
+    Apply the budget to this process: torch and BLAS thread counts, CPU
+    affinity, pool sizes. Runs once per process; app.server calls it in each
+    forked worker with the real worker count (having checked the budget
+    before forking), everything else runs as a single worker.
+    """
+    global _budget, _configured_pid
+    if _configured_pid == os.getpid():
+        return _budget
+
+    budget = ThreadBudget(workers)
+    if check:
+        check_budget(budget)
+
+    limit_native_threads(budget)
+    cpus = budget.affinity(slot)
+    if cpus and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+
+    import torch
+    from threadpoolctl import threadpool_limits
+    torch.set_num_threads(budget.torch_threads)
+    threadpool_limits(limits=budget.blas_threads, user_api="blas")
+
+    for pool, threads in (("torch", budget.torch_threads), ("blas", budget.blas_threads),
+                          ("match", budget.match_threads), ("parse", budget.parse_threads)):
+        CPU_BUDGET.set(threads, pool=pool)
+
+    _budget = budget
+    _configured_pid = os.getpid()
+    return budget
+
+
+def current_budget() -> ThreadBudget:
+    return _budget if _budget is not None and _configured_pid == os.getpid() else ThreadBudget()
+
+
+_pools: Dict[str, ThreadPoolExecutor] = {}
+_pools_pid: Optional[int] = None
+
+
+def _pool(name: str, size: int) -> ThreadPoolExecutor:
+    global _pools_pid
+    # Threads do not survive fork, so a forked worker starts its own pools
+    if _pools_pid != os.getpid():
+        _pools.clear()
+        _pools_pid = os.getpid()
+    if name not in _pools:
+        _pools[name] = ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"{name}-pool")
+    return _pools[name]
+
+
+def match_pool() -> ThreadPoolExecutor:
+    return _pool("match", current_budget().match_threads)
+
+
+def parse_pool() -> ThreadPoolExecutor:
+    return _pool("parse", current_budget().parse_threads)
+
+
+async def run_in_pool(pool: ThreadPoolExecutor, fn: Callable, *args):
+    """Run fn on pool from the event loop, keeping the caller's timing trace."""
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        pool, functools.partial(context.run, fn, *args)
+    )
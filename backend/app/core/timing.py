@@ -0,0 +1,230 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.timing")
+if settings.TIMING_ENABLED and not logger.handlers:
+    # Bare JSON lines, ready for a log shipper
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# Header or query flag that asks for a Server-Timing header on the response
+TIMING_HEADER = b"x-timing"
+TIMING_QUERY_PARAM = "timing"
+
+
+class Trace:
+    """Spans recorded while handling one request (or one background task)."""
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.start = time.perf_counter()
+        # (span name, duration in seconds); list.append is atomic, so worker threads may record too
+        self.spans: List[Tuple[str, float]] = []
+        # IDs of the documents involved, e.g. resume_id/job_id, for logs and profiles
+        self.tags: Dict[str, str] = {}
+        # Set by app.core.profiling while the request is being profiled
+        self.profiler = None
+
+    def record(self, name: str, seconds: float):
+        self.spans.append((name, seconds))
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000.0
+
+    def summary(self) -> Dict[str, Dict]:
+        """Total milliseconds and call count per span name, in first-seen order."""
+        totals: Dict[str, Dict] = {}
+        for name, seconds in list(self.spans):
+            entry = totals.setdefault(name, {"ms": 0.0, "count": 0})
+            entry["ms"] += seconds * 1000.0
+            entry["count"] += 1
+        for entry in totals.values():
+            entry["ms"] = round(entry["ms"], 3)
+        return totals
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, e.g. 'db.fetch;dur=3.1, match;dur=41.7, total;dur=46.0'."""
+        parts = [f"{name};dur={entry['ms']}" for name, entry in self.summary().items()]
+        parts.append(f"total;dur={round(self.elapsed_ms(), 3)}")
+        return ", ".join(parts)
+
+    def log(self, **fields):
+        """Emit one structured (JSON) log line for the trace."""
+        record = {"event": "timing", "name": self.name, "total_ms": round(self.elapsed_ms(), 3)}
+        record.update(self.tags)
+        record.update(fields)
+        record["spans"] = self.summary()
+        logger.info(json.dumps(record, default=str))
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+# Called with (span name, seconds) for every finished span, traced or not (see app.core.metrics)
+_span_listeners: List[Callable[[str, float], None]] = []
+
+
+def add_span_listener(listener: Callable[[str, float], None]):
+    _span_listeners.append(listener)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def activate(trace: Trace):
+    """Make trace the current trace for the enclosed block."""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def tag(**tags):
+    """Attach IDs (resume_id=..., job_id=...) to the current trace, if any."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.tags.update({key: str(value) for key, value in tags.items() if value is not None})
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "trace", "start")
+
+    def __init__(self, name: str, trace: Optional[Trace]):
+        self.name = name
+        self.trace = trace
+
+    def __enter__(self):
+        if self.trace is not None and self.trace.profiler is not None:
+            self.trace.profiler.enter_thread()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        if self.trace is not None:
+            self.trace.record(self.name, seconds)
+            if self.trace.profiler is not None:
+                self.trace.profiler.exit_thread()
+        for listener in _span_listeners:
+            listener(self.name, seconds)
+        return False
+
+
+def span(name: str):
+    """
+    Time a block under the current trace:
+
+        with span("parse.spacy"):
+            doc = nlp(text)
+
+    Outside a trace, with no listeners, this is a shared no-op object.
+    """
+    trace = _current_trace.get()
+    if trace is None and not _span_listeners:
+        return _NOOP_SPAN
+    return _Span(name, trace)
+
+
+def timed(name: str):
+    """Decorator form of span()."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def trace(name: str, log: bool = True, **fields):
+    """Record spans for a unit of work outside a request, e.g. a worker task."""
+    if not settings.TIMING_ENABLED:
+        yield None
+        return
+    current = Trace(name)
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        _current_trace.reset(token)
+        if log and current.elapsed_ms() >= settings.TIMING_LOG_MIN_MS:
+            current.log(**fields)
+
+
+def _timing_requested(scope: Dict) -> bool:
+    for key, value in scope.get("headers", []):
+        if key == TIMING_HEADER:
+            return value.lower() in (b"1", b"true", b"yes")
+    query = scope.get("query_string", b"")
+    if query and TIMING_QUERY_PARAM.encode() in query:
+        values = parse_qs(query.decode("latin-1")).get(TIMING_QUERY_PARAM, [])
+        return any(v.lower() in ("1", "true", "yes") for v in values)
+    return False
+
+
+class TimingMiddleware:
+    """
+    Opens a trace per HTTP request when TIMING_ENABLED is set or the client asks
+    for timings (X-Timing: 1 header or ?timing=1). Requested timings come back in
+    a Server-Timing header; enabled timings are logged as one JSON line per
+    request. Otherwise the request passes straight through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        requested = _timing_requested(scope)
+        if not requested and not settings.TIMING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        current = Trace(f"{scope['method']} {scope['path']}")
+        token = _current_trace.set(current)
+        status_code = None
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if requested:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", current.server_timing().encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_trace.reset(token)
+            if settings.TIMING_ENABLED and current.elapsed_ms() >= settings.TIMING_LOG_MIN_MS:
+                current.log(method=scope["method"], path=scope["path"], status=status_code)
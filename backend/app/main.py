@@ -1,15 +1,25 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import os
-import motor.motor_asyncio
-from beanie import init_beanie
+import time
+import asyncio
 
 from app.core.config import settings
+from app.core.timing import TimingMiddleware, add_span_listener
+from app.core.profiling import ProfilingMiddleware
+from app.core.admission import AdmissionLimiter, AdmissionMiddleware
+from app.core import metrics
+from app.core import resources
+from app.config.database import init_db, close_mongo_connection
 from app.models.resume import Resume
-from app.models.job import JobDescription
-from app.models.analysis import ResumeJobMatch
-from app.api.routes import resume_router, job_router, analysis_router
+from app.services.skill_index import skill_index
+from app.services.vector_store import get_resume_vectors, backfill_resume_vectors
+from app.services.task_queue import task_queue
+from app.services.task_handlers import TaskHandlers
+from app import worker
+from app.api.routes import resume_router, job_router, analysis_router, task_router, admin_router
 
 # Create FastAPI app
 app = FastAPI(
@@ -18,6 +28,19 @@ app = FastAPI(
     version="0.1.0",
 )
 
+# Bounded concurrency and wait queues for the expensive routes (inside CORS so
+# browsers can read the 429/503 and its Retry-After)
+if settings.ADMISSION_ENABLED:
+    timeout = settings.ADMISSION_QUEUE_TIMEOUT_SECONDS
+    app.add_middleware(AdmissionMiddleware, limits={
+        ("POST", f"{settings.API_V1_STR}/resumes/upload"): AdmissionLimiter(
+            "upload", settings.ADMISSION_UPLOAD_CONCURRENCY, settings.ADMISSION_UPLOAD_QUEUE, timeout),
+        ("POST", f"{settings.API_V1_STR}/jobs/"): AdmissionLimiter(
+            "job_create", settings.ADMISSION_JOB_CONCURRENCY, settings.ADMISSION_JOB_QUEUE, timeout),
+        ("POST", f"{settings.API_V1_STR}/analysis/match"): AdmissionLimiter(
+            "match", settings.ADMISSION_MATCH_CONCURRENCY, settings.ADMISSION_MATCH_QUEUE, timeout),
+    })
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -25,26 +48,94 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Profile-File", "X-Next-Cursor", "X-Total-Count", "Retry-After", "X-Rematch-Task", "X-Parse-Task"],
 )
 
+# Admin-only sampling profiler for flagged requests (inside the timing middleware to share its trace)
+app.add_middleware(ProfilingMiddleware)
+
+# Per-stage timings (Server-Timing header on request, JSON logs when TIMING_ENABLED)
+app.add_middleware(TimingMiddleware)
+
+# Request latency and in-flight metrics; every timed stage also feeds /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+    add_span_listener(metrics.observe_span)
+
 # Create uploads directory if it doesn't exist
 os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 
 # Database initialization
 @app.on_event("startup")
 async def start_db():
-    # Create motor client
-    client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGODB_URL)
+    # Size torch/BLAS threads and the match/parse pools (already done in app.server workers)
+    resources.configure_process()
+    
+    # Initialize beanie and create the indexes declared on the models
+    await init_db()
     
-    # Initialize beanie with the Product document class
-    await init_beanie(
-        database=client[settings.DATABASE_NAME],
-        document_models=[
-            Resume,
-            JobDescription,
-            ResumeJobMatch
-        ]
+    # Build the in-process skill index and keep it in sync with other workers
+    await rebuild_skill_index()
+    if settings.SKILL_INDEX_REFRESH_SECONDS > 0:
+        asyncio.create_task(refresh_skill_index())
+    if settings.VECTOR_STORE_COMPACT_INTERVAL_SECONDS > 0:
+        asyncio.create_task(compact_vector_store())
+    if settings.VECTOR_STORE_BACKFILL_ON_STARTUP:
+        asyncio.create_task(backfill_vector_store())
+    if settings.METRICS_ENABLED and settings.METRICS_DIR:
+        asyncio.create_task(metrics.flush_snapshots())
+    
+    # The in-memory task queue is only visible to this process, so run its tasks here
+    if settings.TASK_QUEUE_BACKEND == "memory":
+        start_task_consumers()
+
+@app.on_event("shutdown")
+async def stop_db():
+    if getattr(app.state, "task_consumers_stopping", None) is not None:
+        app.state.task_consumers_stopping.set()
+    close_mongo_connection()
+
+def start_task_consumers():
+    handlers = TaskHandlers(
+        analysis_router.matching_engine,
+        resume_router.resume_parser,
+        job_router.job_parser,
+        task_queue,
+        batch_size=settings.REMATCH_BATCH_SIZE
     )
+    app.state.task_consumers_stopping = asyncio.Event()
+    for loop in worker.consumers(handlers, app.state.task_consumers_stopping):
+        asyncio.create_task(loop)
+
+async def rebuild_skill_index():
+    cursor = Resume.get_motor_collection().find({}, {"skills": 1, "experience": 1})
+    skill_index.rebuild(await cursor.to_list(length=None))
+
+async def refresh_skill_index():
+    while True:
+        await asyncio.sleep(settings.SKILL_INDEX_REFRESH_SECONDS)
+        try:
+            await rebuild_skill_index()
+        except Exception as e:
+            print(f"Error refreshing skill index: {e}")
+
+async def backfill_vector_store():
+    # Uploads and re-parses write vectors as they go; this catches older resumes
+    try:
+        added = await backfill_resume_vectors(analysis_router.matching_engine)
+        if added:
+            print(f"Backfilled {added} resume vector(s)")
+    except Exception as e:
+        print(f"Error backfilling resume vectors: {e}")
+
+async def compact_vector_store():
+    # Every worker may try; the store's file lock lets only one rewrite at a time
+    while True:
+        await asyncio.sleep(settings.VECTOR_STORE_COMPACT_INTERVAL_SECONDS)
+        try:
+            get_resume_vectors().compact_if_needed(settings.VECTOR_STORE_COMPACT_RATIO)
+        except Exception as e:
+            print(f"Error compacting vector store: {e}")
 
 # Root endpoint
 @app.get("/")
@@ -60,10 +151,56 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+# Prometheus metrics endpoint
+EMBEDDING_CACHE_HITS = metrics.registry.counter("embedding_cache_hits_total", "Embedding cache hits", ("cache",))
+EMBEDDING_CACHE_MISSES = metrics.registry.counter("embedding_cache_misses_total", "Embedding cache misses", ("cache",))
+EMBEDDING_CACHE_HIT_RATIO = metrics.registry.gauge("embedding_cache_hit_ratio", "Embedding cache hit rate", ("cache",))
+EMBEDDING_CACHE_BYTES = metrics.registry.gauge("embedding_cache_bytes", "Memory held by each embedding cache", ("cache",))
+QUEUE_DEPTH = metrics.registry.gauge("queue_depth", "Items waiting in each work queue", ("queue",))
+TASKS = metrics.registry.gauge("tasks", "Background tasks by status", ("status",))
+
+# Cache lookups counted so far, to turn the caches' running totals into counter increments
+_counted_lookups = {}
+
+def collect_engine_metrics():
+    stats = analysis_router.matching_engine.embedding_stats()
+    for cache in ("static_vectors", "text_embeddings"):
+        for counter, field in ((EMBEDDING_CACHE_HITS, "hits"), (EMBEDDING_CACHE_MISSES, "misses")):
+            total = stats[cache][field]
+            counted = _counted_lookups.get((cache, field), 0)
+            if total > counted:
+                counter.inc(total - counted, cache=cache)
+                _counted_lookups[(cache, field)] = total
+        EMBEDDING_CACHE_HIT_RATIO.set(stats[cache]["hit_rate"], cache=cache)
+        EMBEDDING_CACHE_BYTES.set(stats[cache]["bytes"], cache=cache)
+    QUEUE_DEPTH.set(stats["encoder"]["queue_depth"], queue="encoder")
+
+# Counting tasks is an aggregate over the tasks collection, so it runs at most
+# once per TASK_METRICS_INTERVAL_SECONDS however often /metrics is scraped
+_task_metrics_collected_at = None
+
+async def collect_task_metrics():
+    global _task_metrics_collected_at
+    now = time.monotonic()
+    if _task_metrics_collected_at is not None and now - _task_metrics_collected_at < settings.TASK_METRICS_INTERVAL_SECONDS:
+        return
+    _task_metrics_collected_at = now
+    for task_status, count in (await task_queue.counts()).items():
+        TASKS.set(count, status=task_status)
+
+metrics.registry.register_collector(collect_engine_metrics)
+metrics.registry.register_collector(collect_task_metrics)
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    return PlainTextResponse(await metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
 # Include API routers
 app.include_router(resume_router.router, prefix=f"{settings.API_V1_STR}/resumes", tags=["resumes"])
 app.include_router(job_router.router, prefix=f"{settings.API_V1_STR}/jobs", tags=["jobs"])
 app.include_router(analysis_router.router, prefix=f"{settings.API_V1_STR}/analysis", tags=["analysis"])
+app.include_router(task_router.router, prefix=f"{settings.API_V1_STR}/tasks", tags=["tasks"])
+app.include_router(admin_router.router, prefix=f"{settings.API_V1_STR}/admin", tags=["admin"])
 
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
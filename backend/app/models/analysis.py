@@ -2,6 +2,7 @@ from datetime import datetime
 from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 from beanie import Document
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
 class SkillMatch(BaseModel):
     resume_skill: str
@@ -21,13 +22,14 @@ class ResumeJobMatch(Document):
     resume_id: str
     job_id: str
     
-    # Basic Info
-    candidate_name: str
-    job_title: str
-    company: str
+    # Basic Info (not stored for compact matches)
+    candidate_name: str = ""
+    job_title: str = ""
+    company: str = ""
     
     # Match Scores
     overall_score: float  # 0.0 to 1.0
+    scores: Dict[str, float] = {}  # Component scores, e.g. {"skills": 0.8}; all a compact match keeps
     category_scores: List[CategoryScore] = []
     
     # Detailed Matches
@@ -42,12 +44,40 @@ class ResumeJobMatch(Document):
     # Recommendations
     improvement_suggestions: List[str] = []
     
+    # Matching tier used and components dropped to meet a latency budget
+    match_mode: str = "full"  # "lexical", "static" or "full"
+    skipped_components: List[str] = []
+    degraded: bool = False  # Some similarity calls fell back to lexical after the deadline
+    
+    # Stored without the explanatory detail (MATCH_STORAGE_MODE=compact); GET /analysis/{id} recomputes it
+    compact: bool = False
+    
+    # Cache Key: content hashes of the inputs and the engine version that scored them
+    resume_hash: Optional[str] = None
+    job_hash: Optional[str] = None
+    engine_version: Optional[str] = None
+    
     # Metadata
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
     
     class Settings:
         name = "resume_job_matches"
+        indexes = [
+            # One stored match per pair; also serves the /analysis/match lookup
+            IndexModel([("resume_id", ASCENDING), ("job_id", ASCENDING)], name="resume_job_unique", unique=True),
+            # Ranked candidates for a job / ranked jobs for a resume; the trailing ID
+            # covers scores_only ranking queries so they never touch the documents
+            IndexModel(
+                [("job_id", ASCENDING), ("overall_score", DESCENDING), ("resume_id", ASCENDING)],
+                name="job_score_resume"
+            ),
+            IndexModel(
+                [("resume_id", ASCENDING), ("overall_score", DESCENDING), ("job_id", ASCENDING)],
+                name="resume_score_job"
+            ),
+            IndexModel([("created_at", DESCENDING)], name="created_at")
+        ]
         
     class Config:
         schema_extra = {
@@ -0,0 +1,29 @@
+from datetime import datetime
+from pydantic import Field
+from beanie import Document
+from pymongo import ASCENDING, IndexModel
+
+class DocumentBlob(Document):
+    # Owner
+    owner_type: str  # "resume" or "job"
+    owner_id: str
+    kind: str  # e.g., "raw_text"; room for spaCy DocBins or layout data
+
+    # Content
+    encoding: str = "zlib"
+    content_type: str = "text/plain; charset=utf-8"
+    size: int = 0  # Uncompressed bytes
+    data: bytes
+
+    # Metadata
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+    class Settings:
+        name = "document_blobs"
+        indexes = [
+            IndexModel(
+                [("owner_type", ASCENDING), ("owner_id", ASCENDING), ("kind", ASCENDING)],
+                name="owner_kind_unique", unique=True
+            )
+        ]
@@ -1,7 +1,10 @@
 from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel, Field
-from beanie import Document
+from beanie import Document, Insert, Replace, Save, before_event
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from app.services.search_keys import SearchKeys, search_keys
 
 class Requirement(BaseModel):
     description: str
@@ -36,11 +39,28 @@ class JobDescription(Document):
     updated_at: datetime = Field(default_factory=datetime.now)
     is_active: bool = True
     
-    # Raw Content
-    raw_text: str
+    # Raw text lives in the document_blobs collection (see app.services.blob_store)
+    
+    # Normalized title and company for indexed search (kept in sync on every save)
+    title_search: Optional[SearchKeys] = None
+    company_search: Optional[SearchKeys] = None
+    
+    @before_event(Insert, Replace, Save)
+    def update_search_keys(self):
+        self.title_search = search_keys(self.title)
+        self.company_search = search_keys(self.company)
     
     class Settings:
         name = "jobs"
+        indexes = [
+            # Newest open jobs first
+            IndexModel([("is_active", ASCENDING), ("created_at", DESCENDING)], name="active_created_at"),
+            IndexModel([("created_at", DESCENDING)], name="created_at"),
+            IndexModel([("title_search.normalized", ASCENDING)], name="title_search_normalized"),
+            IndexModel([("title_search.prefixes", ASCENDING)], name="title_search_prefixes"),
+            IndexModel([("company_search.normalized", ASCENDING)], name="company_search_normalized"),
+            IndexModel([("company_search.prefixes", ASCENDING)], name="company_search_prefixes")
+        ]
         
     class Config:
         schema_extra = {
@@ -86,7 +106,6 @@ class JobDescription(Document):
                 "min_experience_years": 5,
                 "education_level": "Bachelor's",
                 "salary_range": "$120,000 - $150,000",
-                "is_active": True,
-                "raw_text": "Full text content of the job description..."
+                "is_active": True
             }
         } 
\ No newline at end of file
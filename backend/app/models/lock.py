@@ -0,0 +1,19 @@
+from datetime import datetime
+from pydantic import Field
+from beanie import Document
+from pymongo import ASCENDING, IndexModel
+
+class Lock(Document):
+    # The lock name is the document _id, e.g. "match:<resume_id>:<job_id>"
+    owner: str
+    expires_at: datetime  # UTC, as the TTL monitor reads it
+
+    # Metadata
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "locks"
+        indexes = [
+            # Mongo removes locks abandoned by crashed holders shortly after they expire
+            IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0)
+        ]
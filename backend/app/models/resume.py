@@ -1,7 +1,10 @@
 from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel, Field
-from beanie import Document
+from beanie import Document, Insert, Replace, Save, before_event
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from app.services.search_keys import SearchKeys, search_keys
 
 class Education(BaseModel):
     institution: str
@@ -61,11 +64,22 @@ class Resume(Document):
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
     
-    # Raw Content
-    raw_text: str
+    # Raw text lives in the document_blobs collection (see app.services.blob_store)
+    
+    # Normalized candidate name for indexed search (kept in sync on every save)
+    name_search: Optional[SearchKeys] = None
+    
+    @before_event(Insert, Replace, Save)
+    def update_search_keys(self):
+        self.name_search = search_keys(self.candidate_name)
     
     class Settings:
         name = "resumes"
+        indexes = [
+            IndexModel([("created_at", DESCENDING)], name="created_at"),
+            IndexModel([("name_search.normalized", ASCENDING)], name="name_search_normalized"),
+            IndexModel([("name_search.prefixes", ASCENDING)], name="name_search_prefixes")
+        ]
         
     class Config:
         schema_extra = {
@@ -107,7 +121,6 @@ class Resume(Document):
                 "interests": ["Open Source", "AI Research"],
                 "file_name": "john_doe_resume.pdf",
                 "file_path": "/uploads/john_doe_resume.pdf",
-                "file_type": "PDF",
-                "raw_text": "Full text content of the resume..."
+                "file_type": "PDF"
             }
         } 
\ No newline at end of file
@@ -0,0 +1,52 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+from pydantic import Field
+from beanie import Document
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+class Task(Document):
+    # Work Item
+    task_type: str  # e.g., "match", "rank", "rematch", "parse_resume", "parse_job"
+    payload: Dict[str, Any] = {}
+
+    # State
+    status: str = "queued"  # "queued", "running", "succeeded", "failed"
+    attempts: int = 0
+    max_attempts: int = 3
+
+    # Leasing
+    available_at: datetime = Field(default_factory=datetime.now)  # Not leased before this (retry backoff)
+    lease_expires_at: Optional[datetime] = None
+    leased_by: Optional[str] = None
+
+    # Outcome
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    # Metadata
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+
+    class Settings:
+        name = "tasks"
+        indexes = [
+            # Leasing: queued tasks that are due, and running tasks whose lease expired
+            IndexModel([("status", ASCENDING), ("available_at", ASCENDING)], name="status_available_at"),
+            IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)], name="status_lease_expires_at"),
+            IndexModel([("status", ASCENDING), ("created_at", DESCENDING)], name="status_created_at"),
+            IndexModel([("task_type", ASCENDING), ("created_at", DESCENDING)], name="task_type_created_at"),
+            IndexModel([("created_at", DESCENDING)], name="created_at")
+        ]
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "task_type": "rank",
+                "payload": {"job_id": "60d21b4967d0d8992e610c86", "mode": "full"},
+                "status": "running",
+                "attempts": 1,
+                "max_attempts": 3,
+                "leased_by": "worker-1234-0"
+            }
+        }
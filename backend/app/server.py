@@ -0,0 +1,149 @@
+"""
+Production API server: python -m app.server
+
+Loads spaCy and the sentence transformer once in a parent process, freezes
+the heap and forks SERVER_WORKERS uvicorn workers that accept on one shared
+socket. The model weights are shared copy-on-write, so adding a worker costs
+its own caches and Python heap (a few hundred MB) rather than another
+~1 GB of models. The parent restarts workers that die and forwards
+SIGTERM/SIGINT for a graceful shutdown.
+
+Native thread pools are not fork safe: the BLAS/OpenMP pools are sized
+through the environment before numpy/torch are imported, the parent never
+runs inference, and each worker applies its share of the CPU thread budget
+(app.core.resources) after the fork. Everything holding sockets or threads (the Mongo
+client, the batching encoder, background loops) is created in the workers.
+
+`uvicorn app.main:app --reload` is still the way to run for development.
+"""
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+from app.core.config import settings
+from app.core import resources
+
+# Workers that exit sooner than this after starting are restarted with a delay
+MIN_WORKER_LIFETIME_SECONDS = 5.0
+
+
+def preload():
+    """Import the app and load every model so forked workers share them."""
+    import torch
+
+    # Keep the parent single-threaded: a pool started before fork is unusable in the children
+    torch.set_num_threads(1)
+
+    from app.main import app
+    from app.api.routes import analysis_router, resume_router, job_router
+
+    start = time.perf_counter()
+    analysis_router.matching_engine._load_models()
+    resume_router.resume_parser._load_spacy_model()
+    job_router.job_parser._load_spacy_model()
+    print(f"Loaded models in {time.perf_counter() - start:.1f}s")
+
+    # Move everything loaded so far out of the collector's reach, so collections
+    # in the workers do not write to (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def bind_socket() -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((settings.SERVER_HOST, settings.SERVER_PORT))
+    sock.listen(settings.SERVER_BACKLOG)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket, workers: int, slot: int):
+    """Body of the slot-th forked worker; never returns."""
+    import uvicorn
+
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, signal.SIG_DFL)
+    gc.enable()
+
+    status = 0
+    try:
+        resources.configure_process(workers, slot, check=False)
+        config = uvicorn.Config(app, backlog=settings.SERVER_BACKLOG, proxy_headers=True, log_level="info")
+        uvicorn.Server(config).run(sockets=[sock])
+    except Exception as e:
+        print(f"Worker {os.getpid()} failed: {e}")
+        status = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    os._exit(status)
+
+
+def main():
+    workers = resources.worker_count()
+    if settings.TASK_QUEUE_BACKEND == "memory" and workers > 1:
+        raise SystemExit("TASK_QUEUE_BACKEND=memory keeps tasks inside one process; "
+                         "use the mongo backend with SERVER_WORKERS > 1")
+    budget = resources.ThreadBudget(workers)
+    resources.check_budget(budget)
+    resources.limit_native_threads(budget)
+
+    # Nothing allocated while loading is garbage; skip collections until the heap is frozen
+    gc.disable()
+    app = preload()
+    sock = bind_socket()
+
+    children = {}
+    stopping = False
+
+    def spawn(slot: int):
+        pid = os.fork()
+        if pid == 0:
+            run_worker(app, sock, workers, slot)
+        children[pid] = (slot, time.monotonic())
+
+    def stop(signum, frame):
+        nonlocal stopping
+        # A second signal stops the workers without waiting for open requests
+        forward = signal.SIGKILL if stopping else signal.SIGTERM
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, forward)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for slot in range(workers):
+        spawn(slot)
+    print(f"Serving on {settings.SERVER_HOST}:{settings.SERVER_PORT} with {workers} worker(s); "
+          f"CPU budget per worker: {budget.as_dict()}")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        child = children.pop(pid, None)
+        if child is None or stopping:
+            continue
+        slot, started = child
+        print(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}; restarting")
+        if time.monotonic() - started < MIN_WORKER_LIFETIME_SECONDS:
+            time.sleep(MIN_WORKER_LIFETIME_SECONDS)
+        if not stopping:
+            spawn(slot)
+
+    sock.close()
+    print("Server stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import zlib
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.core.timing import span
+from app.models.blob import DocumentBlob
+
+OWNER_RESUME = "resume"
+OWNER_JOB = "job"
+RAW_TEXT = "raw_text"
+
+# Marker recorded in the migrations collection once embedded raw_text has been moved out
+RAW_TEXT_MIGRATION = "raw_text_to_document_blobs"
+
+
+def _collection():
+    return DocumentBlob.get_motor_collection()
+
+
+def _key(owner_type: str, owner_id: str, kind: str) -> Dict:
+    return {"owner_type": owner_type, "owner_id": str(owner_id), "kind": kind}
+
+
+def _encode(data: bytes) -> bytes:
+    return zlib.compress(data, settings.BLOB_COMPRESSION_LEVEL)
+
+
+def _decode(document: Dict) -> bytes:
+    data = bytes(document["data"])
+    return zlib.decompress(data) if document.get("encoding") == "zlib" else data
+
+
+def _update(data: bytes, content_type: str, now: datetime) -> Dict:
+    return {
+        "$set": {"encoding": "zlib", "content_type": content_type, "size": len(data),
+                 "data": _encode(data), "updated_at": now},
+        "$setOnInsert": {"created_at": now}
+    }
+
+
+async def put_blob(owner_type: str, owner_id: str, kind: str, data: bytes,
+                   content_type: str = "application/octet-stream"):
+    """Store (or replace) one compressed blob for a document."""
+    with span("db.blob_save"):
+        await _collection().update_one(
+            _key(owner_type, owner_id, kind), _update(data, content_type, datetime.now()), upsert=True
+        )
+
+
+async def get_blob(owner_type: str, owner_id: str, kind: str) -> Optional[bytes]:
+    with span("db.blob_fetch"):
+        document = await _collection().find_one(_key(owner_type, owner_id, kind), {"data": 1, "encoding": 1})
+    return _decode(document) if document else None
+
+
+async def put_text(owner_type: str, owner_id: str, text: str, kind: str = RAW_TEXT):
+    await put_blob(owner_type, owner_id, kind, (text or "").encode("utf-8"), "text/plain; charset=utf-8")
+
+
+async def get_text(owner_type: str, owner_id: str, kind: str = RAW_TEXT) -> Optional[str]:
+    data = await get_blob(owner_type, owner_id, kind)
+    return data.decode("utf-8") if data is not None else None
+
+
+async def get_texts(owner_type: str, owner_ids: Iterable[str], kind: str = RAW_TEXT) -> Dict[str, str]:
+    """Texts of many documents in one query, keyed by owner ID (missing ones left out)."""
+    owner_ids = [str(owner_id) for owner_id in owner_ids]
+    if not owner_ids:
+        return {}
+    cursor = _collection().find(
+        {"owner_type": owner_type, "owner_id": {"$in": owner_ids}, "kind": kind},
+        {"owner_id": 1, "data": 1, "encoding": 1}
+    )
+    with span("db.blob_fetch"):
+        return {document["owner_id"]: _decode(document).decode("utf-8") async for document in cursor}
+
+
+async def attach_texts(owner_type: str, documents: List[Dict], field: str = RAW_TEXT, kind: str = RAW_TEXT):
+    """Fill documents[i][field] from the blob store, e.g. for include_raw_text on list pages and exports."""
+    texts = await get_texts(owner_type, [document["_id"] for document in documents], kind)
+    for document in documents:
+        document[field] = texts.get(str(document["_id"]))
+
+
+async def delete_blobs(owner_type: str, owner_id: str):
+    """Remove every blob of a deleted document."""
+    await _collection().delete_many({"owner_type": owner_type, "owner_id": str(owner_id)})
+
+
+async def migrate_raw_text(database, batch_size: int = 200) -> int:
+    """
+    Move raw_text embedded in resume and job documents into the blob store and
+    unset it, batch by batch. Runs once: a marker in the migrations collection
+    keeps later startups from scanning the collections again. Safe to run from
+    several processes at once, since every step is an idempotent upsert or unset.
+    """
+    migrations = database["migrations"]
+    if await migrations.find_one({"_id": RAW_TEXT_MIGRATION}):
+        return 0
+
+    moved = 0
+    for owner_type, collection_name in ((OWNER_RESUME, "resumes"), (OWNER_JOB, "jobs")):
+        collection = database[collection_name]
+        last_id = None
+        while True:
+            # Walk _id in order so each batch resumes where the last one stopped
+            query = {"raw_text": {"$exists": True}}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            documents = await collection.find(query, {"raw_text": 1}) \
+                .sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+            if not documents:
+                break
+            last_id = documents[-1]["_id"]
+
+            now = datetime.now()
+            await _collection().bulk_write([
+                UpdateOne(
+                    _key(owner_type, str(document["_id"]), RAW_TEXT),
+                    _update((document.get("raw_text") or "").encode("utf-8"), "text/plain; charset=utf-8", now),
+                    upsert=True
+                )
+                for document in documents
+            ], ordered=False)
+            await collection.update_many(
+                {"_id": {"$in": [document["_id"] for document in documents]}}, {"$unset": {"raw_text": ""}}
+            )
+            moved += len(documents)
+
+    await migrations.update_one(
+        {"_id": RAW_TEXT_MIGRATION}, {"$setOnInsert": {"finished_at": datetime.now(), "moved": moved}}, upsert=True
+    )
+    if moved:
+        print(f"Moved raw_text of {moved} documents to the {DocumentBlob.Settings.name} collection")
+    return moved
@@ -0,0 +1,26 @@
+import hashlib
+import json
+from typing import Dict, Iterable
+
+# Only the fields the matching engine reads take part in the hash, so edits to
+# anything else (timestamps, file paths, raw text) keep cached matches valid.
+RESUME_MATCH_FIELDS = ("candidate_name", "skills", "experience", "education")
+JOB_MATCH_FIELDS = (
+    "title", "company", "description", "responsibilities", "skills",
+    "min_experience_years", "education_level"
+)
+
+
+def content_hash(data: Dict, fields: Iterable[str]) -> str:
+    """Stable SHA-256 of the given fields of a document."""
+    payload = {field: data.get(field) for field in fields}
+    encoded = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def resume_content_hash(resume_data: Dict) -> str:
+    return content_hash(resume_data, RESUME_MATCH_FIELDS)
+
+
+def job_content_hash(job_data: Dict) -> str:
+    return content_hash(job_data, JOB_MATCH_FIELDS)
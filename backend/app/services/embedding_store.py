@@ -0,0 +1,280 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+import numpy as np
+
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+
+# Rows scored per block when comparing a query against many stored vectors,
+# so only a small slice is ever upcast at a time.
+SIMILARITY_BLOCK_SIZE = 4096
+
+
+def quantize(vectors, dtype: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Normalize vectors to unit length and quantize them to the given dtype.
+
+    Returns the quantized matrix and one float32 scale per row. Scales are 1.0
+    for float32/float16; for int8 each row is scaled so its largest component
+    maps to 127.
+    """
+    if dtype not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported embedding dtype: {dtype}")
+
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    if dtype == "float32":
+        return unit, np.ones(len(unit), dtype=np.float32)
+    if dtype == "float16":
+        return unit.astype(np.float16), np.ones(len(unit), dtype=np.float32)
+
+    scales = (np.abs(unit).max(axis=1) / 127.0).astype(np.float32)
+    scaled = np.divide(unit, scales[:, None], out=np.zeros_like(unit), where=scales[:, None] > 0)
+    return np.round(scaled).astype(np.int8), scales
+
+
+def dequantize(data: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Convert quantized rows back to float32 unit vectors."""
+    return np.atleast_2d(data).astype(np.float32) * np.asarray(scales, dtype=np.float32)[:, None]
+
+
+def quantized_dot(matrix: np.ndarray, scales: np.ndarray, query: np.ndarray, query_scale: float) -> np.ndarray:
+    """
+    Cosine similarity of one quantized query against quantized rows.
+
+    int8 rows use integer dot products (int32 accumulation) followed by the
+    per-vector scales; float16 rows are upcast one block at a time.
+    """
+    results = np.empty(len(matrix), dtype=np.float32)
+    if matrix.dtype == np.int8:
+        query_acc = query.astype(np.int32)
+    else:
+        query_acc = query.astype(np.float32)
+
+    for start in range(0, len(matrix), SIMILARITY_BLOCK_SIZE):
+        block = matrix[start:start + SIMILARITY_BLOCK_SIZE]
+        block_acc = block.astype(np.int32) if matrix.dtype == np.int8 else block.astype(np.float32)
+        results[start:start + len(block)] = block_acc @ query_acc
+
+    return results * np.asarray(scales, dtype=np.float32) * np.float32(query_scale)
+
+
+def encode_vector(vector, dtype: str) -> Dict:
+    """Serialize a vector into a compact, BSON-friendly document."""
+    data, scales = quantize(vector, dtype)
+    return {"dtype": dtype, "dim": int(data.shape[1]), "scale": float(scales[0]), "data": data[0].tobytes()}
+
+
+def decode_vector(document: Dict) -> np.ndarray:
+    """Inverse of encode_vector; returns a float32 unit vector."""
+    data = np.frombuffer(document["data"], dtype=np.dtype(document["dtype"]))
+    return dequantize(data, np.array([document["scale"]]))[0]
+
+
+def quantization_report(vectors, dtype: str, num_queries: int = 100, top_k: int = 10) -> Dict:
+    """
+    Measure the accuracy lost by storing vectors at the given dtype.
+
+    Uses a deterministic sample of the vectors as queries and compares cosine
+    similarities (and top-k neighbours) against the float32 originals.
+    """
+    reference, _ = quantize(vectors, "float32")
+    data, scales = quantize(vectors, dtype)
+
+    if len(reference) == 0:
+        return {"dtype": dtype, "vectors": 0}
+
+    rng = np.random.default_rng(0)
+    query_rows = rng.choice(len(reference), size=min(num_queries, len(reference)), replace=False)
+    k = min(top_k, len(reference))
+
+    abs_errors = []
+    recalls = []
+    for row in query_rows:
+        exact = reference @ reference[row]
+        approx = quantized_dot(data, scales, data[row], scales[row])
+        abs_errors.append(np.abs(exact - approx))
+
+        exact_top = set(np.argpartition(-exact, k - 1)[:k])
+        approx_top = set(np.argpartition(-approx, k - 1)[:k])
+        recalls.append(len(exact_top & approx_top) / k)
+
+    abs_errors = np.concatenate(abs_errors)
+    float32_bytes = reference.nbytes
+    quantized_bytes = data.nbytes + (scales.nbytes if dtype == "int8" else 0)
+
+    return {
+        "dtype": dtype,
+        "vectors": int(len(reference)),
+        "dim": int(reference.shape[1]),
+        "float32_bytes": int(float32_bytes),
+        "quantized_bytes": int(quantized_bytes),
+        "compression_ratio": round(float32_bytes / quantized_bytes, 2) if quantized_bytes else 0.0,
+        "max_abs_error": float(abs_errors.max()),
+        "mean_abs_error": float(abs_errors.mean()),
+        f"recall_at_{k}": float(np.mean(recalls))
+    }
+
+
+class QuantizedEmbeddingStore:
+    """
+    Bounded in-memory store of quantized embeddings keyed by text.
+
+    Vectors are kept as rows of one preallocated matrix at the configured dtype
+    (float32, float16 or int8 with per-vector scales) and evicted least
+    recently used. Similarities are computed on the quantized rows. Safe to
+    share between threads; vectors are computed outside the lock.
+    """
+
+    def __init__(self, dtype: str = "float32", capacity: int = 100000):
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported embedding dtype: {dtype}")
+
+        self.dtype = dtype
+        self.capacity = capacity
+        self.dim = None
+        self._matrix = None
+        self._scales = None
+        self._rows: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._free_rows: List[int] = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rows
+
+    def keys(self) -> List[Hashable]:
+        """Stored keys, least recently used first."""
+        return list(self._rows)
+
+    def put(self, key: Hashable, vector) -> int:
+        """Store a vector under a key and return its row."""
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        with self._lock:
+            return self._put(key, vector)
+
+    def _put(self, key: Hashable, vector: np.ndarray) -> int:
+        if self.dim is None:
+            self.dim = len(vector)
+            self._matrix = np.zeros((min(self.capacity, 1024), self.dim), dtype=np.dtype(self.dtype))
+            self._scales = np.zeros(len(self._matrix), dtype=np.float32)
+        elif len(vector) != self.dim:
+            raise ValueError(f"Expected a {self.dim}-dimensional vector, got {len(vector)}")
+
+        if key in self._rows:
+            row = self._rows[key]
+            self._rows.move_to_end(key)
+        else:
+            row = self._allocate_row()
+            self._rows[key] = row
+
+        data, scales = quantize(vector, self.dtype)
+        self._matrix[row] = data[0]
+        self._scales[row] = scales[0]
+        return row
+
+    def get_or_compute(self, key: Hashable, compute) -> np.ndarray:
+        """
+        Return the stored vector for a key as a float32 unit vector, computing
+        and storing it on a miss. The vector is copied out under the lock: once
+        it is released, the key's row may be evicted and reused by another thread.
+        """
+        with self._lock:
+            row = self._rows.get(key)
+            if row is not None:
+                self.hits += 1
+                self._rows.move_to_end(key)
+                return self._row_vector(row)
+            self.misses += 1
+
+        vector = np.asarray(compute(key), dtype=np.float32).ravel()
+        with self._lock:
+            return self._row_vector(self._put(key, vector))
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        """Return the stored vector as a float32 unit vector, or None."""
+        with self._lock:
+            row = self._rows.get(key)
+            return self._row_vector(row) if row is not None else None
+
+    def similarity(self, key_a: Hashable, key_b: Hashable) -> float:
+        """Cosine similarity between two stored vectors."""
+        with self._lock:
+            row_a = self._rows[key_a]
+            row_b = self._rows[key_b]
+            a = self._matrix[row_a]
+            b = self._matrix[row_b]
+            if self._matrix.dtype == np.int8:
+                dot = float(np.dot(a.astype(np.int32), b.astype(np.int32)))
+            else:
+                dot = float(np.dot(a.astype(np.float32), b.astype(np.float32)))
+            return dot * float(self._scales[row_a]) * float(self._scales[row_b])
+
+    def _row_vector(self, row: int) -> np.ndarray:
+        # dequantize upcasts, so the result never aliases the matrix
+        return dequantize(self._matrix[row], self._scales[row:row + 1])[0]
+
+    def similarities(self, query_vector, keys: Optional[Iterable[Hashable]] = None) -> np.ndarray:
+        """Cosine similarity of a query vector against stored keys (or every row in key order)."""
+        with self._lock:
+            rows = [self._rows[key] for key in (keys if keys is not None else self._rows)]
+            if not rows:
+                return np.zeros(0, dtype=np.float32)
+            # Fancy indexing copies the rows, so scoring can run outside the lock
+            rows = np.asarray(rows)
+            matrix, scales = self._matrix[rows], self._scales[rows]
+
+        query, query_scales = quantize(query_vector, self.dtype)
+        return quantized_dot(matrix, scales, query[0], query_scales[0])
+
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+            self._free_rows = list(range(len(self._matrix))) if self._matrix is not None else []
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the vector matrix and its scales."""
+        if self._matrix is None:
+            return 0
+        return int(self._matrix.nbytes + self._scales.nbytes)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "dtype": self.dtype,
+            "dim": self.dim,
+            "entries": len(self._rows),
+            "capacity": self.capacity,
+            "bytes": self.nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def _allocate_row(self) -> int:
+        if self._free_rows:
+            return self._free_rows.pop()
+
+        if len(self._rows) < len(self._matrix):
+            return len(self._rows)
+
+        if len(self._matrix) < self.capacity:
+            # Grow geometrically up to the configured capacity
+            new_size = min(self.capacity, len(self._matrix) * 2)
+            matrix = np.zeros((new_size, self.dim), dtype=self._matrix.dtype)
+            matrix[:len(self._matrix)] = self._matrix
+            scales = np.zeros(new_size, dtype=np.float32)
+            scales[:len(self._scales)] = self._scales
+            self._matrix, self._scales = matrix, scales
+            return len(self._rows)
+
+        # Full: reuse the least recently used row
+        _, row = self._rows.popitem(last=False)
+        return row
@@ -0,0 +1,129 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Sequence
+import numpy as np
+
+
+class BatchingEncoder:
+    """
+    Dynamic micro-batching front end for an encode function.
+
+    Concurrent callers submit texts and get back a future; a dedicated worker
+    thread gathers pending requests until either max_batch_size texts are
+    queued or max_wait_ms has passed since the first one arrived, runs them
+    through the model as a single batch and hands each caller its rows.
+    It only waits while a caller inside a session() (e.g. another match) has
+    no request in the batch yet; a lone caller's texts are encoded at once.
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray],
+                 max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._sessions = 0
+        self._sessions_lock = threading.Lock()
+
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, texts: Sequence[str]) -> Future:
+        """Queue texts for encoding; the future resolves to one row per text."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((list(texts), future))
+        return future
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Blocking encode for callers running in worker threads."""
+        return self.submit(texts).result()
+
+    async def encode_async(self, texts: Sequence[str]) -> np.ndarray:
+        """Awaitable encode for callers on the event loop."""
+        return await asyncio.wrap_future(self.submit(texts))
+
+    @contextmanager
+    def session(self):
+        """Mark a unit of work (e.g. one match) that submits texts over its lifetime."""
+        with self._sessions_lock:
+            self._sessions += 1
+        try:
+            yield
+        finally:
+            with self._sessions_lock:
+                self._sessions -= 1
+
+    def stats(self) -> Dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "queue_depth": self._queue.qsize(),
+            "sessions": self._sessions,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0
+        }
+
+    def _ensure_worker(self):
+        # Threads do not survive fork, so a forked worker starts its own
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="batching-encoder", daemon=True)
+                self._thread.start()
+
+    def _collect_batch(self) -> List:
+        requests = [self._queue.get()]
+        size = len(requests[0][0])
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch_size:
+            # Each session blocks on one encode at a time, so once every open
+            # session has a request in this batch nobody else can add to it
+            if len(requests) >= self._sessions and self._queue.empty():
+                break
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    request = self._queue.get(timeout=remaining)
+                else:
+                    request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            requests.append(request)
+            size += len(request[0])
+
+        return requests
+
+    def _run(self):
+        while True:
+            requests = self._collect_batch()
+            texts = [text for request_texts, _ in requests for text in request_texts]
+
+            try:
+                embeddings = self.encode_fn(texts) if texts else np.zeros((0, 0), dtype=np.float32)
+            except Exception as e:
+                for _, future in requests:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(texts)
+
+            offset = 0
+            for request_texts, future in requests:
+                future.set_result(embeddings[offset:offset + len(request_texts)])
+                offset += len(request_texts)
@@ -4,12 +4,37 @@ from typing import Dict, List, Optional, Tuple
 import nltk
 from nltk.tokenize import sent_tokenize
 
+from app.core.timing import span
+from app.services.nlp_models import load_spacy
+
 # Ensure NLTK data is downloaded
 try:
     nltk.data.find('tokenizers/punkt')
 except LookupError:
     nltk.download('punkt')
 
+def parsed_job_fields(parsed_job: Dict) -> Dict:
+    """Map parse_job output onto JobDescription document fields."""
+    return {
+        "title": parsed_job.get("title") or "Untitled Position",
+        "company": parsed_job.get("company") or "Unknown Company",
+        "location": parsed_job.get("location"),
+        "job_type": parsed_job.get("job_type"),
+        "remote": parsed_job.get("remote", False),
+        "description": parsed_job.get("description", ""),
+        "responsibilities": parsed_job.get("responsibilities", []),
+        "requirements": [
+            req if isinstance(req, dict) else {"description": req, "category": "General"}
+            for req in parsed_job.get("requirements", [])
+        ],
+        "preferred_qualifications": parsed_job.get("preferred_qualifications", []),
+        "skills": parsed_job.get("skills", []),
+        "keywords": parsed_job.get("keywords", []),
+        "min_experience_years": parsed_job.get("min_experience_years"),
+        "education_level": parsed_job.get("education_level"),
+        "salary_range": parsed_job.get("salary_range")
+    }
+
 class JobParser:
     """Service to parse job descriptions and extract structured information."""
     
@@ -19,32 +44,35 @@ class JobParser:
     def _load_spacy_model(self):
         if self.nlp is None:
             # Load the spaCy model
-            self.nlp = spacy.load("en_core_web_md")
+            with span("parse.model_load"):
+                self.nlp = load_spacy("en_core_web_md")
     
     def parse_job(self, text: str) -> Dict:
         """Parse job description text and extract structured information."""
         self._load_spacy_model()
         
         # Process the text with spaCy
-        doc = self.nlp(text)
+        with span("parse.spacy"):
+            doc = self.nlp(text)
         
         # Extract basic information
-        result = {
-            "title": self._extract_title(doc, text),
-            "company": self._extract_company(doc, text),
-            "location": self._extract_location(doc, text),
-            "job_type": self._extract_job_type(text),
-            "remote": self._is_remote(text),
-            "description": self._extract_description(text),
-            "responsibilities": self._extract_responsibilities(text),
-            "requirements": self._extract_requirements(text),
-            "preferred_qualifications": self._extract_preferred_qualifications(text),
-            "skills": self._extract_skills(doc, text),
-            "min_experience_years": self._extract_experience_years(text),
-            "education_level": self._extract_education_level(text),
-            "salary_range": self._extract_salary_range(text),
-            "raw_text": text
-        }
+        with span("parse.fields"):
+            result = {
+                "title": self._extract_title(doc, text),
+                "company": self._extract_company(doc, text),
+                "location": self._extract_location(doc, text),
+                "job_type": self._extract_job_type(text),
+                "remote": self._is_remote(text),
+                "description": self._extract_description(text),
+                "responsibilities": self._extract_responsibilities(text),
+                "requirements": self._extract_requirements(text),
+                "preferred_qualifications": self._extract_preferred_qualifications(text),
+                "skills": self._extract_skills(doc, text),
+                "min_experience_years": self._extract_experience_years(text),
+                "education_level": self._extract_education_level(text),
+                "salary_range": self._extract_salary_range(text),
+                "raw_text": text
+            }
         
         return result
     
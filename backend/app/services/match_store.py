@@ -0,0 +1,133 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.core.timing import span
+from app.models.analysis import ResumeJobMatch
+
+
+# Fields a compact match keeps: IDs, scores, cache key and the small arrays
+# that make up the ranking and filtering surface. Everything else (skill
+# matches, category details, suggestions) is recomputed when a match is read.
+COMPACT_FIELDS = (
+    "resume_id", "job_id", "overall_score", "scores", "missing_skills",
+    "match_mode", "skipped_components", "degraded",
+    "resume_hash", "job_hash", "engine_version", "compact"
+)
+
+
+def _collection():
+    return ResumeJobMatch.get_motor_collection()
+
+
+def compact_storage() -> bool:
+    return settings.MATCH_STORAGE_MODE == "compact"
+
+
+def stored_form(match_results: Dict, compact: Optional[bool] = None) -> Dict:
+    """The document written for a match result: full, or COMPACT_FIELDS only."""
+    compact = compact_storage() if compact is None else compact
+    document = {key: value for key, value in match_results.items() if key not in ("_id", "id", "created_at")}
+    document["scores"] = {
+        category["category"].lower(): category["score"] for category in match_results.get("category_scores", [])
+    } or match_results.get("scores", {})
+    document["compact"] = compact
+    if compact:
+        document = {key: value for key, value in document.items() if key in COMPACT_FIELDS}
+    return document
+
+
+def _upsert_args(match_results: Dict, now: datetime, compact: Optional[bool] = None) -> Tuple[Dict, Dict]:
+    """Filter and update that write one match, keyed on the unique (resume_id, job_id) pair."""
+    document = stored_form(match_results, compact)
+    document["updated_at"] = now
+    update = {"$set": document, "$setOnInsert": {"created_at": now}}
+    if document["compact"]:
+        # Drop the detail a previous full write left behind
+        dropped = [name for name in ResumeJobMatch.model_fields
+                   if name not in COMPACT_FIELDS and name not in ("id", "revision_id", "created_at", "updated_at")]
+        update["$unset"] = {name: "" for name in dropped}
+    return (
+        {"resume_id": match_results["resume_id"], "job_id": match_results["job_id"]},
+        update
+    )
+
+
+async def upsert_match(match_results: Dict) -> Dict:
+    """
+    Insert or replace the stored match for a pair in one round trip and return
+    the stored document. The unique (resume_id, job_id) index makes concurrent
+    writers for the same pair converge on one document.
+    """
+    query, update = _upsert_args(match_results, datetime.now())
+    with span("db.save"):
+        try:
+            return await _collection().find_one_and_update(
+                query, update, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Lost an insert race for the same pair; the document exists now, so update it
+            return await _collection().find_one_and_update(
+                query, update, return_document=ReturnDocument.AFTER
+            )
+
+
+async def bulk_upsert_matches(results: List[Dict], batch_size: Optional[int] = None,
+                              compact: Optional[bool] = None) -> Dict[str, int]:
+    """
+    Write many match results with unordered bulk writes of MATCH_WRITE_BATCH_SIZE
+    upserts each, for batch ranking and rematch jobs. Returns upserted/modified counts.
+    compact overrides MATCH_STORAGE_MODE.
+    """
+    counts = {"upserted": 0, "modified": 0}
+    if not results:
+        return counts
+
+    batch_size = max(1, batch_size or settings.MATCH_WRITE_BATCH_SIZE)
+    now = datetime.now()
+    with span("db.bulk_write"):
+        for start in range(0, len(results), batch_size):
+            operations = [
+                UpdateOne(*_upsert_args(match_results, now, compact), upsert=True)
+                for match_results in results[start:start + batch_size]
+            ]
+            result = await _collection().bulk_write(operations, ordered=False)
+            counts["upserted"] += result.upserted_count
+            counts["modified"] += result.modified_count
+    return counts
+
+
+async def ranked_scores(query: Dict, limit: int) -> List[Dict]:
+    """
+    Top matches for one job or resume (query on job_id or resume_id, optionally
+    filtering the other ID) as resume_id/job_id/overall_score only. The covering
+    (job_id|resume_id, overall_score, other ID) index answers it without
+    reading any documents.
+    """
+    projection = {"_id": 0, "resume_id": 1, "job_id": 1, "overall_score": 1}
+    with span("db.rank"):
+        return await _collection().find(query, projection) \
+            .sort("overall_score", -1).limit(limit).to_list(length=limit)
+
+
+async def find_matches(query: Dict, limit: Optional[int] = None, ranked: bool = False) -> List[Dict]:
+    """
+    Stored matches for query as raw documents, for list and ranking responses
+    that serialize them without building models. ranked sorts best first.
+    """
+    cursor = _collection().find(query)
+    if ranked:
+        cursor = cursor.sort("overall_score", -1)
+    if limit:
+        cursor = cursor.limit(limit)
+    with span("db.fetch_matches"):
+        return await cursor.to_list(length=limit)
+
+
+async def find_match(resume_id: str, job_id: str) -> Optional[Dict]:
+    """The stored match for a pair, served by the unique (resume_id, job_id) index."""
+    with span("db.fetch_match"):
+        return await _collection().find_one({"resume_id": resume_id, "job_id": job_id})
@@ -1,38 +1,111 @@
 import os
 import re
+import math
+import time
+import threading
 import spacy
 import numpy as np
+from collections import Counter
+from contextlib import nullcontext
 from typing import Dict, List, Optional, Tuple
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import TfidfVectorizer, ENGLISH_STOP_WORDS
 from sklearn.metrics.pairwise import cosine_similarity
 from sentence_transformers import SentenceTransformer
 
+from app.core.config import settings
+from app.core.timing import span
+from app.services.nlp_models import load_spacy
+from app.services.embedding_store import QuantizedEmbeddingStore, quantization_report
+from app.services.inference_worker import BatchingEncoder
+
+# Matching tiers, cheapest first:
+#   lexical - exact skill matches and bag-of-words text overlap, no models
+#   static  - spaCy static word vectors for skills and texts
+#   full    - static vectors for skills, sentence-transformer for texts
+MATCH_MODES = ("lexical", "static", "full")
+
+
+class MatchContext:
+    """Per-call matching mode and latency budget."""
+    
+    def __init__(self, mode: str = "full", deadline_ms: Optional[float] = None):
+        if mode not in MATCH_MODES:
+            raise ValueError(f"Unknown match mode: {mode}")
+        self.mode = mode
+        self.deadline = time.monotonic() + deadline_ms / 1000.0 if deadline_ms is not None else None
+        self.degraded = False
+    
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+    
+    def current_mode(self) -> str:
+        """The mode to use right now: drop to lexical once the deadline has passed."""
+        if self.mode != "lexical" and self.expired():
+            self.degraded = True
+            return "lexical"
+        return self.mode
+
+
 class MatchingEngine:
     """Service for matching resumes with job descriptions."""
     
+    # Bump whenever a change to the scoring logic should invalidate stored matches
+    ENGINE_VERSION = "2"
+    
     def __init__(self):
         self.nlp = None
         self.sentence_transformer = None
-        self.tfidf_vectorizer = TfidfVectorizer(stop_words='english')
+        self._model_lock = threading.Lock()
+        
+        # Quantized caches for spaCy static vectors and transformer sentence embeddings
+        self.static_vectors = QuantizedEmbeddingStore(settings.EMBEDDING_DTYPE, settings.EMBEDDING_CACHE_SIZE)
+        self.text_embeddings = QuantizedEmbeddingStore(settings.EMBEDDING_DTYPE, settings.EMBEDDING_CACHE_SIZE)
+        
+        # Sentence-transformer encodes from concurrent requests are batched together
+        self.encoder = BatchingEncoder(
+            self._encode_batch,
+            max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+            max_wait_ms=settings.INFERENCE_MAX_WAIT_MS
+        )
     
     def _load_models(self):
         """Load NLP models when needed."""
-        if self.nlp is None:
-            # Load spaCy model
-            self.nlp = spacy.load("en_core_web_md")
-        
-        if self.sentence_transformer is None:
-            # Load Sentence Transformer model
-            self.sentence_transformer = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+        if self.nlp is not None and self.sentence_transformer is not None:
+            return
+        
+        # Requests run in worker threads, so only let one of them load the models
+        with self._model_lock:
+            if self.nlp is None:
+                # Load spaCy model
+                with span("match.model_load.spacy"):
+                    self.nlp = load_spacy("en_core_web_md")
+            
+            if self.sentence_transformer is None:
+                # Load Sentence Transformer model
+                with span("match.model_load.transformer"):
+                    self.sentence_transformer = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
     
-    def match_resume_to_job(self, resume_data: Dict, job_data: Dict) -> Dict:
-        """Match a resume against a job description and return match scores."""
-        self._load_models()
-        
-        # Calculate overall and category scores
-        skill_match_results = self._match_skills(resume_data.get('skills', []), job_data.get('skills', []))
-        experience_match_results = self._match_experience(resume_data, job_data)
-        education_match_results = self._match_education(resume_data, job_data)
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Run one batch through the sentence transformer (called by the batching worker)."""
+        return self.sentence_transformer.encode(texts, batch_size=len(texts))
+    
+    def match_resume_to_job(self, resume_data: Dict, job_data: Dict, mode: str = "full",
+                            deadline_ms: Optional[float] = None) -> Dict:
+        """
+        Match a resume against a job description and return match scores.
+        
+        mode selects the matching tier (lexical, static or full). With a
+        deadline, components that have not started when it passes are skipped,
+        similarity calls after it fall back to lexical, and the overall score is
+        the weighted average of the components that were computed.
+        """
+        context = MatchContext(mode, deadline_ms)
+        if mode != "lexical":
+            self._load_models()
+        
+        # Resume documents store skills as {"name": ...} objects
+        resume_skills = [skill.get('name', '') if isinstance(skill, dict) else skill
+                         for skill in resume_data.get('skills', [])]
         
         # Calculate weighted overall score
         weights = {
@@ -41,35 +114,41 @@ class MatchingEngine:
             "education": 0.25
         }
         
-        overall_score = (
-            weights["skills"] * skill_match_results["score"] +
-            weights["experience"] * experience_match_results["score"] +
-            weights["education"] * education_match_results["score"]
-        )
+        components = [
+            ("skills", "Skills", lambda: self._match_skills(resume_skills, job_data.get('skills', []), context)),
+            ("experience", "Experience", lambda: self._match_experience(resume_data, job_data, context)),
+            ("education", "Education", lambda: self._match_education(resume_data, job_data, context))
+        ]
+        
+        # Calculate overall and category scores; the first component always runs.
+        # A full match is one encoder session, so other matches' encodes wait for its texts
+        results = {}
+        skipped_components = []
+        with self.encoder.session() if mode == "full" else nullcontext():
+            for i, (name, _, run) in enumerate(components):
+                if i > 0 and context.expired():
+                    skipped_components.append(name)
+                else:
+                    with span(f"match.{name}"):
+                        results[name] = run()
+        
+        skill_match_results = results.get("skills")
+        experience_match_results = results.get("experience", {})
+        education_match_results = results.get("education", {})
+        
+        computed_weight = sum(weights[name] for name in results)
+        overall_score = sum(weights[name] * result["score"] for name, result in results.items()) / computed_weight
         
         # Format the category scores
         category_scores = [
             {
-                "category": "Skills",
-                "score": skill_match_results["score"],
-                "max_score": 1.0,
-                "weight": weights["skills"],
-                "details": skill_match_results["details"]
-            },
-            {
-                "category": "Experience",
-                "score": experience_match_results["score"],
-                "max_score": 1.0,
-                "weight": weights["experience"],
-                "details": experience_match_results["details"]
-            },
-            {
-                "category": "Education",
-                "score": education_match_results["score"],
+                "category": category,
+                "score": results[name]["score"],
                 "max_score": 1.0,
-                "weight": weights["education"],
-                "details": education_match_results["details"]
+                "weight": weights[name],
+                "details": results[name]["details"]
             }
+            for name, category, _ in components if name in results
         ]
         
         # Identify missing requirements
@@ -84,24 +163,28 @@ class MatchingEngine:
         
         # Construct match results
         match_results = {
-            "resume_id": str(resume_data.get('_id', '')),
-            "job_id": str(job_data.get('_id', '')),
+            "resume_id": str(resume_data.get('_id') or resume_data.get('id') or ''),
+            "job_id": str(job_data.get('_id') or job_data.get('id') or ''),
             "candidate_name": resume_data.get('candidate_name', ''),
             "job_title": job_data.get('title', ''),
             "company": job_data.get('company', ''),
             "overall_score": round(overall_score, 2),
             "category_scores": category_scores,
             "skill_matches": skill_match_results["skill_matches"],
-            "experience_relevance": experience_match_results["experience_relevance"],
+            "experience_relevance": experience_match_results.get("experience_relevance", {}),
             "missing_skills": missing_skills,
             "missing_experience": experience_match_results.get("missing_experience", []),
             "missing_education": education_match_results.get("missing_education", []),
-            "improvement_suggestions": improvement_suggestions
+            "improvement_suggestions": improvement_suggestions,
+            "match_mode": mode,
+            "skipped_components": skipped_components,
+            "degraded": context.degraded
         }
         
         return match_results
     
-    def _match_skills(self, resume_skills: List[str], job_skills: List[str]) -> Dict:
+    def _match_skills(self, resume_skills: List[str], job_skills: List[str],
+                      context: Optional[MatchContext] = None) -> Dict:
         """Match skills from resume with job skills."""
         if not resume_skills or not job_skills:
             return {
@@ -136,10 +219,12 @@ class MatchingEngine:
         # For non-exact matches, use NLP to find similar skills
         remaining_resume_skills = [skill for skill in resume_skills if skill.lower() not in exact_matches]
         
-        if remaining_resume_skills and job_skills:
-            # Get embeddings for remaining skills
-            resume_skill_embeddings = [self.nlp(skill).vector for skill in remaining_resume_skills]
-            job_skill_embeddings = [self.nlp(skill).vector for skill in job_skills]
+        context = context or MatchContext()
+        if remaining_resume_skills and job_skills and context.current_mode() != "lexical":
+            # Get embeddings for remaining skills (unit vectors, so dot products are cosines)
+            resume_skill_vectors = np.array([self._static_vector(skill) for skill in remaining_resume_skills])
+            job_skill_vectors = np.array([self._static_vector(skill) for skill in job_skills])
+            similarities = resume_skill_vectors @ job_skill_vectors.T
             
             # Calculate similarity between each remaining resume skill and job skills
             for i, resume_skill in enumerate(remaining_resume_skills):
@@ -147,10 +232,7 @@ class MatchingEngine:
                 best_match_score = 0
                 
                 for j, job_skill in enumerate(job_skills):
-                    similarity = cosine_similarity(
-                        [resume_skill_embeddings[i]], 
-                        [job_skill_embeddings[j]]
-                    )[0][0]
+                    similarity = float(similarities[i, j])
                     
                     if similarity > best_match_score and similarity > 0.5:  # Only consider matches above threshold
                         best_match_score = similarity
@@ -186,7 +268,8 @@ class MatchingEngine:
             "skill_matches": skill_matches
         }
     
-    def _match_experience(self, resume_data: Dict, job_data: Dict) -> Dict:
+    def _match_experience(self, resume_data: Dict, job_data: Dict,
+                          context: Optional[MatchContext] = None) -> Dict:
         """Match experience from resume with job requirements."""
         # Get years of experience from resume
         resume_experience = resume_data.get('experience', [])
@@ -209,7 +292,8 @@ class MatchingEngine:
                 relevance_score = self._calculate_relevance_score(
                     position, 
                     job_data.get('title', ''), 
-                    job_data.get('description', '')
+                    job_data.get('description', ''),
+                    context
                 )
                 experience_relevance[position] = relevance_score
             
@@ -246,7 +330,7 @@ class MatchingEngine:
             # Check each responsibility
             for resp in job_responsibilities:
                 # Calculate semantic similarity
-                similarity = self._calculate_text_similarity(combined_exp_text, resp)
+                similarity = self._calculate_text_similarity(combined_exp_text, resp, context)
                 
                 # If similarity is below threshold, add to missing experience
                 if similarity < 0.5:
@@ -264,7 +348,8 @@ class MatchingEngine:
             "missing_experience": missing_experience
         }
     
-    def _match_education(self, resume_data: Dict, job_data: Dict) -> Dict:
+    def _match_education(self, resume_data: Dict, job_data: Dict,
+                         context: Optional[MatchContext] = None) -> Dict:
         """Match education from resume with job requirements."""
         resume_education = resume_data.get('education', [])
         required_education = job_data.get('education_level', '')
@@ -346,7 +431,7 @@ class MatchingEngine:
                 max_similarity = 0
                 for degree in degree_names:
                     for field in relevant_fields:
-                        similarity = self._calculate_text_similarity(degree, field)
+                        similarity = self._calculate_text_similarity(degree, field, context)
                         max_similarity = max(max_similarity, similarity)
                 
                 field_relevance = max_similarity
@@ -390,7 +475,8 @@ class MatchingEngine:
         
         return end_year - start_year
     
-    def _calculate_relevance_score(self, resume_text: str, job_title: str, job_description: str) -> float:
+    def _calculate_relevance_score(self, resume_text: str, job_title: str, job_description: str,
+                                   context: Optional[MatchContext] = None) -> float:
         """Calculate relevance score between resume experience and job requirements."""
         if not resume_text or (not job_title and not job_description):
             return 0
@@ -399,30 +485,115 @@ class MatchingEngine:
         job_text = f"{job_title} {job_description}"
         
         # Calculate semantic similarity
-        similarity = self._calculate_text_similarity(resume_text, job_text)
+        similarity = self._calculate_text_similarity(resume_text, job_text, context)
         
         return similarity
     
-    def _calculate_text_similarity(self, text1: str, text2: str) -> float:
+    def _calculate_text_similarity(self, text1: str, text2: str,
+                                   context: Optional[MatchContext] = None) -> float:
         """Calculate semantic similarity between two texts."""
         if not text1 or not text2:
             return 0
         
+        mode = context.current_mode() if context else "full"
+        if mode == "lexical":
+            return self._lexical_similarity(text1, text2)
+        if mode == "static":
+            return float(np.dot(self._static_vector(text1), self._static_vector(text2)))
+        
         # For short texts, use Sentence Transformers
         if len(text1) < 1000 and len(text2) < 1000:
-            embed1 = self.sentence_transformer.encode([text1])[0]
-            embed2 = self.sentence_transformer.encode([text2])[0]
+            embedding1 = self._text_embedding(text1)
+            embedding2 = self._text_embedding(text2)
             
-            # Calculate cosine similarity
-            similarity = np.dot(embed1, embed2) / (np.linalg.norm(embed1) * np.linalg.norm(embed2))
-            return float(similarity)
+            # Calculate cosine similarity on the stored (quantized) embeddings
+            return float(np.dot(embedding1, embedding2))
         
         # For longer texts, use TF-IDF vectorization
         else:
-            tfidf_matrix = self.tfidf_vectorizer.fit_transform([text1, text2])
+            # A fresh vectorizer per pair keeps concurrent requests from sharing fitted state
+            tfidf_matrix = TfidfVectorizer(stop_words='english').fit_transform([text1, text2])
             similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
             return float(similarity)
     
+    def _lexical_similarity(self, text1: str, text2: str) -> float:
+        """Cosine similarity of bag-of-words counts; needs no models."""
+        counts1 = Counter(t for t in re.findall(r'[a-z0-9+#]+', text1.lower()) if t not in ENGLISH_STOP_WORDS)
+        counts2 = Counter(t for t in re.findall(r'[a-z0-9+#]+', text2.lower()) if t not in ENGLISH_STOP_WORDS)
+        if not counts1 or not counts2:
+            return 0.0
+        
+        dot = sum(count * counts2[token] for token, count in counts1.items())
+        norm1 = math.sqrt(sum(count * count for count in counts1.values()))
+        norm2 = math.sqrt(sum(count * count for count in counts2.values()))
+        return dot / (norm1 * norm2)
+    
+    def _static_vector(self, text: str) -> np.ndarray:
+        """Return the cached spaCy vector for a text as a unit vector, computing it on a miss."""
+        # Doc.vector is the mean of the token vectors, so the tokenizer alone is enough
+        return self.static_vectors.get_or_compute(text, lambda t: self.nlp.make_doc(t).vector)
+    
+    def _text_embedding(self, text: str) -> np.ndarray:
+        """Return the cached sentence embedding for a text as a unit vector, computing it on a miss."""
+        return self.text_embeddings.get_or_compute(text, self._encode_one)
+    
+    def _encode_one(self, text: str) -> np.ndarray:
+        # Includes time spent waiting for the batching worker to fill a batch
+        with span("match.encode"):
+            return self.encoder.encode([text])[0]
+    
+    def encode_texts(self, texts: List[str]) -> np.ndarray:
+        """Encode texts with the sentence transformer via the batching worker."""
+        self._load_models()
+        return self.encoder.encode(texts)
+    
+    async def encode_texts_async(self, texts: List[str]) -> np.ndarray:
+        """Awaitable variant of encode_texts for use on the event loop."""
+        self._load_models()
+        return await self.encoder.encode_async(texts)
+    
+    def resume_profile_text(self, resume_data: Dict) -> str:
+        """Build the text used for a resume's corpus-level embedding."""
+        skills = [skill.get('name', '') if isinstance(skill, dict) else str(skill)
+                  for skill in resume_data.get('skills', [])]
+        titles = [exp.get('title') or exp.get('position') or '' for exp in resume_data.get('experience', [])]
+        parts = [resume_data.get('summary') or '', ", ".join(skills), ", ".join(t for t in titles if t)]
+        return "\n".join(part for part in parts if part)
+    
+    def job_profile_text(self, job_data: Dict) -> str:
+        """Build the text used for a job's corpus-level embedding."""
+        parts = [job_data.get('title') or '', ", ".join(job_data.get('skills', [])), job_data.get('description') or '']
+        return "\n".join(part for part in parts if part)
+    
+    def embedding_stats(self) -> Dict:
+        """Memory and hit-rate statistics for the embedding caches."""
+        return {
+            "static_vectors": self.static_vectors.stats(),
+            "text_embeddings": self.text_embeddings.stats(),
+            "encoder": self.encoder.stats()
+        }
+    
+    def embedding_accuracy_report(self, sample_size: int = 200) -> Dict:
+        """
+        Compare the configured embedding dtype against float32 on cached entries.
+        Re-embeds a sample of cached keys at full precision to measure the loss.
+        """
+        self._load_models()
+        
+        static_texts = self.static_vectors.keys()[:sample_size]
+        texts = self.text_embeddings.keys()[:sample_size]
+        
+        report = {}
+        if static_texts:
+            report["static_vectors"] = quantization_report(
+                [self.nlp.make_doc(text).vector for text in static_texts], settings.EMBEDDING_DTYPE
+            )
+        if texts:
+            report["text_embeddings"] = quantization_report(
+                self.sentence_transformer.encode(texts), settings.EMBEDDING_DTYPE
+            )
+        return report
+    
     def _generate_improvement_suggestions(self, missing_skills: List[str], 
                                         experience_results: Dict, 
                                         education_results: Dict) -> List[str]:
@@ -446,4 +617,15 @@ class MatchingEngine:
             for edu in education_results["missing_education"]:
                 suggestions.append(edu)
         
-        return suggestions 
\ No newline at end of file
+        return suggestions 
+
+
+# Engine shared by the API routes of a process (caches and encoder batches are per process)
+_matching_engine: Optional[MatchingEngine] = None
+
+
+def get_matching_engine() -> MatchingEngine:
+    global _matching_engine
+    if _matching_engine is None:
+        _matching_engine = MatchingEngine()
+    return _matching_engine
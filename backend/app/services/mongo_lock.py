@@ -0,0 +1,73 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+from pymongo.errors import DuplicateKeyError
+
+from app.core.timing import span
+from app.models.lock import Lock
+
+
+class MongoLock:
+    """
+    Advisory lock shared by every API and worker process through the locks
+    collection. A holder's lock lapses after ttl_seconds, so a crashed process
+    cannot block others for longer than that. Waiters poll until the lock is
+    free or wait_seconds pass, then go ahead without it; callers must stay
+    correct without the lock (it only avoids duplicate work). A disabled lock
+    never touches Mongo.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0, wait_seconds: float = 30.0, poll_ms: float = 100.0,
+                 enabled: bool = True):
+        self.enabled = enabled
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.wait_seconds = wait_seconds
+        self.poll = max(0.01, poll_ms / 1000.0)
+
+    def _collection(self):
+        return Lock.get_motor_collection()
+
+    async def try_acquire(self, name: str, owner: str) -> bool:
+        # UTC: the TTL index compares expires_at with the server's UTC clock
+        now = datetime.utcnow()
+        try:
+            await self._collection().insert_one({"_id": name, "owner": owner, "expires_at": now + self.ttl,
+                                                 "created_at": now})
+            return True
+        except DuplicateKeyError:
+            # Take over a lock whose holder let it expire
+            taken = await self._collection().find_one_and_update(
+                {"_id": name, "expires_at": {"$lt": now}},
+                {"$set": {"owner": owner, "expires_at": now + self.ttl, "created_at": now}}
+            )
+            return taken is not None
+
+    async def release(self, name: str, owner: str):
+        await self._collection().delete_one({"_id": name, "owner": owner})
+
+    @asynccontextmanager
+    async def hold(self, name: str):
+        """
+        Hold the named lock for the enclosed block. Yields True when the lock
+        was acquired and False when waiting timed out (or the lock is disabled).
+        """
+        if not self.enabled:
+            yield False
+            return
+        owner = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        deadline = time.monotonic() + self.wait_seconds
+        with span("lock.wait"):
+            acquired = await self.try_acquire(name, owner)
+            while not acquired and time.monotonic() < deadline:
+                await asyncio.sleep(self.poll)
+                acquired = await self.try_acquire(name, owner)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await self.release(name, owner)
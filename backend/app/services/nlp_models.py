@@ -0,0 +1,13 @@
+from functools import lru_cache
+
+import spacy
+
+
+@lru_cache(maxsize=None)
+def load_spacy(name: str = "en_core_web_md"):
+    """
+    One spaCy pipeline per process, shared by the parsers and the matching
+    engine (none of them modify it). Loaded before fork by app.server, the
+    weights are then shared copy-on-write by every worker.
+    """
+    return spacy.load(name)
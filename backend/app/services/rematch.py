@@ -0,0 +1,66 @@
+from typing import Dict, List, Tuple
+
+from beanie import PydanticObjectId
+
+from app.models.resume import Resume
+from app.models.job import JobDescription
+from app.services.content_hash import resume_content_hash, job_content_hash
+
+
+def _object_ids(ids) -> List[PydanticObjectId]:
+    # Malformed IDs can't match a document; dropping them reports the pair as missing
+    return [PydanticObjectId(value) for value in set(ids) if PydanticObjectId.is_valid(value)]
+
+
+async def load_documents(resume_ids, job_ids) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+    """
+    Fetch resumes and jobs by ID as dicts keyed by their string IDs.
+    IDs that are malformed or no longer exist are simply absent from the result.
+    """
+    resumes = {
+        str(resume.id): resume.dict()
+        for resume in await Resume.find({"_id": {"$in": _object_ids(resume_ids)}}).to_list()
+    }
+    jobs = {
+        str(job.id): job.dict()
+        for job in await JobDescription.find({"_id": {"$in": _object_ids(job_ids)}}).to_list()
+    }
+    return resumes, jobs
+
+
+def score_pairs(matching_engine, pairs: List[Tuple[str, str]], resumes: Dict, jobs: Dict,
+                mode: str = "full") -> List[Dict]:
+    """Score (resume_id, job_id) pairs synchronously; run it in a worker thread."""
+    results = []
+    for resume_id, job_id in pairs:
+        resume_data = resumes[resume_id]
+        job_data = jobs[job_id]
+        match_results = matching_engine.match_resume_to_job(resume_data, job_data, mode)
+        match_results.update({
+            "resume_id": resume_id,
+            "job_id": job_id,
+            "resume_hash": resume_content_hash(resume_data),
+            "job_hash": job_content_hash(job_data),
+            "engine_version": matching_engine.ENGINE_VERSION
+        })
+        results.append(match_results)
+    return results
+
+
+async def stale_match_query(kind: str, target_id: str, engine_version: str, force: bool = False) -> Dict:
+    """Query for the stored matches of a job or resume that are out of date."""
+    field = "job_id" if kind == "job" else "resume_id"
+    query = {field: target_id}
+    if force or not PydanticObjectId.is_valid(target_id):
+        return query
+
+    if kind == "job":
+        document = await JobDescription.get(target_id)
+        current_hash = {"job_hash": {"$ne": job_content_hash(document.dict())}} if document else None
+    else:
+        document = await Resume.get(target_id)
+        current_hash = {"resume_hash": {"$ne": resume_content_hash(document.dict())}} if document else None
+
+    if current_hash:
+        query["$or"] = [current_hash, {"engine_version": {"$ne": engine_version}}]
+    return query
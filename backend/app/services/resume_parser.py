@@ -6,9 +6,29 @@ import PyPDF2
 import docx
 from pdfminer.high_level import extract_text as pdfminer_extract_text
 
+from app.core.timing import span
+from app.services.nlp_models import load_spacy
+
 # We'll load spaCy model when needed to save memory
 # nlp = spacy.load("en_core_web_md")
 
+def parsed_resume_fields(parsed_resume: Dict) -> Dict:
+    """Map parse_resume output onto Resume document fields."""
+    links = parsed_resume.get("links", {})
+    return {
+        "candidate_name": parsed_resume.get("candidate_name", ""),
+        "email": parsed_resume.get("email"),
+        "phone": parsed_resume.get("phone"),
+        "location": parsed_resume.get("location"),
+        "linkedin": links.get("linkedin"),
+        "github": links.get("github"),
+        "website": links.get("website"),
+        "summary": parsed_resume.get("summary"),
+        "education": parsed_resume.get("education", []),
+        "experience": parsed_resume.get("experience", []),
+        "skills": [{"name": skill} for skill in parsed_resume.get("skills", [])]
+    }
+
 class ResumeParser:
     """Service to parse resume documents and extract structured information."""
     
@@ -18,7 +38,8 @@ class ResumeParser:
     def _load_spacy_model(self):
         if self.nlp is None:
             # Load the spaCy model
-            self.nlp = spacy.load("en_core_web_md")
+            with span("parse.model_load"):
+                self.nlp = load_spacy("en_core_web_md")
     
     def extract_text(self, file_path: str) -> str:
         """Extract text from a resume file (PDF or DOCX)."""
@@ -35,17 +56,18 @@ class ResumeParser:
         """Extract text from a PDF file."""
         try:
             # Try with PyPDF2 first
-            with open(file_path, 'rb') as file:
+            with span("extract.pypdf2"), open(file_path, 'rb') as file:
                 reader = PyPDF2.PdfReader(file)
                 text = ""
                 for page in reader.pages:
                     text += page.extract_text() + "\n"
                 
-                if text.strip():
-                    return text
+            if text.strip():
+                return text
                 
             # If PyPDF2 fails or returns empty text, try with pdfminer
-            return pdfminer_extract_text(file_path)
+            with span("extract.pdfminer"):
+                return pdfminer_extract_text(file_path)
         except Exception as e:
             print(f"Error extracting text from PDF: {e}")
             raise
@@ -53,8 +75,9 @@ class ResumeParser:
     def _extract_text_from_docx(self, file_path: str) -> str:
         """Extract text from a DOCX file."""
         try:
-            doc = docx.Document(file_path)
-            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+            with span("extract.docx"):
+                doc = docx.Document(file_path)
+                text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
             return text
         except Exception as e:
             print(f"Error extracting text from DOCX: {e}")
@@ -65,21 +88,23 @@ class ResumeParser:
         self._load_spacy_model()
         
         # Process the text with spaCy
-        doc = self.nlp(text)
+        with span("parse.spacy"):
+            doc = self.nlp(text)
         
         # Extract basic information
-        result = {
-            "candidate_name": self._extract_name(doc, text),
-            "email": self._extract_email(text),
-            "phone": self._extract_phone(text),
-            "location": self._extract_location(doc, text),
-            "links": self._extract_links(text),
-            "skills": self._extract_skills(doc, text),
-            "education": self._extract_education(doc, text),
-            "experience": self._extract_experience(doc, text),
-            "summary": self._extract_summary(doc, text),
-            "raw_text": text
-        }
+        with span("parse.fields"):
+            result = {
+                "candidate_name": self._extract_name(doc, text),
+                "email": self._extract_email(text),
+                "phone": self._extract_phone(text),
+                "location": self._extract_location(doc, text),
+                "links": self._extract_links(text),
+                "skills": self._extract_skills(doc, text),
+                "education": self._extract_education(doc, text),
+                "experience": self._extract_experience(doc, text),
+                "summary": self._extract_summary(doc, text),
+                "raw_text": text
+            }
         
         return result
     
@@ -0,0 +1,93 @@
+import re
+from typing import Dict, List, Optional, Type
+
+from beanie import Document
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.core.timing import span
+from app.models.resume import Resume
+from app.models.job import JobDescription
+from app.services.search_keys import SearchKeys, lookup_keys, normalize, rank, search_keys
+
+# Searchable text field -> field holding its SearchKeys, per model
+SEARCH_FIELDS = {
+    Resume: {"candidate_name": "name_search"},
+    JobDescription: {"title": "title_search", "company": "company_search"},
+}
+
+
+async def search_documents(model: Type[Document], keys_field: str, query: str,
+                           limit: Optional[int] = None) -> List[Document]:
+    """
+    Best matches for query on one searchable field, best first.
+
+    Two indexed lookups gather candidates: a prefix range on the normalized
+    string ("jane do" finds "Jane Doe") and the edge n-grams of each query
+    token ("doe jan" finds "Jane Doe"). Each is capped at SEARCH_CANDIDATE_LIMIT,
+    so the work per query does not grow with the collection. Candidates are
+    ranked by search_keys.rank and only the top documents are fetched in full.
+    """
+    limit = limit or settings.SEARCH_RESULT_LIMIT
+    normalized = normalize(query)
+    keys = lookup_keys(query)
+    if not keys:
+        return []
+
+    collection = model.get_motor_collection()
+    projection = {keys_field: 1}
+    candidates: Dict = {}
+    with span("search.lookup"):
+        lookups = [
+            # Anchored, escaped prefix: an index range scan, not a regex over every document
+            {f"{keys_field}.normalized": {"$regex": f"^{re.escape(normalized)}"}},
+            {f"{keys_field}.prefixes": {"$all": keys}},
+        ]
+        for lookup in lookups:
+            cursor = collection.find(lookup, projection).limit(settings.SEARCH_CANDIDATE_LIMIT)
+            async for doc in cursor:
+                candidates[doc["_id"]] = doc.get(keys_field)
+
+    scored = []
+    for doc_id, stored in candidates.items():
+        score = rank(query, SearchKeys(**stored)) if stored else 0.0
+        if score > 0:
+            scored.append((score, doc_id))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    top_ids = [doc_id for _, doc_id in scored[:limit]]
+    if not top_ids:
+        return []
+
+    with span("search.fetch"):
+        documents = {doc.id: doc for doc in await model.find({"_id": {"$in": top_ids}}).to_list()}
+    return [documents[doc_id] for doc_id in top_ids if doc_id in documents]
+
+
+async def backfill_search_keys(batch_size: int = 500) -> int:
+    """
+    Store search keys on documents saved before search keys existed (or whose
+    keys were cleared). New and updated documents get them on save.
+    """
+    updated = 0
+    for model, fields in SEARCH_FIELDS.items():
+        collection = model.get_motor_collection()
+        query = {"$or": [{f"{keys_field}.prefixes": None} for keys_field in fields.values()]}
+        cursor = collection.find(query, {source: 1 for source in fields}, batch_size=batch_size)
+
+        operations = []
+        async for doc in cursor:
+            keys = {
+                keys_field: search_keys(doc.get(source) or "").model_dump()
+                for source, keys_field in fields.items()
+            }
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": keys}))
+            if len(operations) >= batch_size:
+                await collection.bulk_write(operations, ordered=False)
+                updated += len(operations)
+                operations = []
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+            updated += len(operations)
+    if updated:
+        print(f"Backfilled search keys on {updated} documents")
+    return updated
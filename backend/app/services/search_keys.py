@@ -0,0 +1,91 @@
+import re
+import unicodedata
+from typing import List
+
+from pydantic import BaseModel
+
+# Edge n-grams are stored for token prefixes of MIN_PREFIX..MAX_PREFIX characters;
+# longer query tokens are looked up by their first MAX_PREFIX characters and
+# checked against the full tokens afterwards.
+MIN_PREFIX = 1
+MAX_PREFIX = 12
+
+_NON_WORD = re.compile(r"[^\w]+", re.UNICODE)
+# Apostrophes join rather than split words: "O'Brien" -> "obrien"
+_APOSTROPHES = re.compile(r"['\u2019\u02bc]")
+
+
+class SearchKeys(BaseModel):
+    """Normalized forms of a name, title or company, stored next to it for indexed lookups."""
+    normalized: str = ""
+    tokens: List[str] = []
+    prefixes: List[str] = []
+
+
+def normalize(text: str) -> str:
+    """Case-fold, strip accents and collapse punctuation: "José  O'Brien-Díaz" -> "jose obrien diaz"."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = _APOSTROPHES.sub("", "".join(char for char in decomposed if not unicodedata.combining(char)))
+    return " ".join(_NON_WORD.sub(" ", stripped.casefold()).replace("_", " ").split())
+
+
+def tokenize(text: str) -> List[str]:
+    return normalize(text).split()
+
+
+def edge_ngrams(tokens: List[str]) -> List[str]:
+    """Every prefix of every token, up to MAX_PREFIX characters, without duplicates."""
+    prefixes = []
+    seen = set()
+    for token in tokens:
+        for length in range(MIN_PREFIX, min(len(token), MAX_PREFIX) + 1):
+            prefix = token[:length]
+            if prefix not in seen:
+                seen.add(prefix)
+                prefixes.append(prefix)
+    return prefixes
+
+
+def search_keys(text: str) -> SearchKeys:
+    tokens = tokenize(text)
+    return SearchKeys(normalized=" ".join(tokens), tokens=tokens, prefixes=edge_ngrams(tokens))
+
+
+def lookup_keys(query: str) -> List[str]:
+    """Index keys a query must all hit: each query token, cut to MAX_PREFIX."""
+    keys = []
+    for token in tokenize(query):
+        key = token[:MAX_PREFIX]
+        if key not in keys:
+            keys.append(key)
+    return keys
+
+
+def rank(query: str, keys: SearchKeys) -> float:
+    """
+    Score how well stored keys match a query, 0 if they do not match at all.
+    Exact matches beat whole-string prefixes, which beat every token matching
+    exactly, which beat token prefixes; shorter names win ties.
+    """
+    query_tokens = tokenize(query)
+    if not query_tokens:
+        return 0.0
+    normalized = " ".join(query_tokens)
+
+    exact_tokens = 0
+    for query_token in query_tokens:
+        if query_token in keys.tokens:
+            exact_tokens += 1
+        elif not any(token.startswith(query_token) for token in keys.tokens):
+            return 0.0
+
+    if keys.normalized == normalized:
+        score = 4.0
+    elif keys.normalized.startswith(normalized):
+        score = 3.0
+    elif exact_tokens == len(query_tokens):
+        score = 2.0
+    else:
+        score = 1.0 + exact_tokens / len(query_tokens) * 0.5
+    # Tie-break: the closer the name's length to the query's, the better
+    return score + len(normalized) / max(len(keys.normalized), 1) * 0.1
@@ -0,0 +1,48 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+from app.core import metrics
+
+T = TypeVar("T")
+
+SINGLE_FLIGHT_CALLS = metrics.registry.counter(
+    "single_flight_calls_total",
+    "Calls through a single-flight group; result=coalesced joined a call already in flight",
+    ("group", "result")
+)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key in one process: the first
+    caller starts the work as its own task, and callers arriving while it is
+    in flight await that same task instead of repeating it. The task is
+    shielded, so a caller that disconnects does not cancel the work the others
+    are waiting for. Keys are forgotten as soon as the work finishes; later
+    calls start afresh.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+            SINGLE_FLIGHT_CALLS.inc(group=self.name, result="leader")
+        else:
+            SINGLE_FLIGHT_CALLS.inc(group=self.name, result="coalesced")
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the outcome as retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,285 @@
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+class SkillQueryError(ValueError):
+    """Raised when a boolean skill query cannot be parsed."""
+
+
+class SkillIndex:
+    """
+    In-process inverted index from skill to the resumes that list it.
+
+    Each resume is assigned an integer slot and every posting list is stored
+    as a bitmap (a Python int with one bit per slot), so AND/OR/NOT are single
+    bitwise operations regardless of how many resumes match.
+    """
+
+    def __init__(self):
+        self._slots: Dict[str, int] = {}  # resume id -> slot
+        self._ids: List[Optional[str]] = []  # slot -> resume id
+        self._free_slots: List[int] = []
+        self._resume_skills: List[Set[str]] = []
+        self._experience_years: List[float] = []
+        self._postings: Dict[str, int] = {}  # skill -> bitmap of slots
+        self._live = 0  # bitmap of occupied slots
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def add_resume(self, resume_id: str, skills: Iterable[str], experience_years: float = 0.0):
+        """Index a resume, replacing any previous entry with the same ID."""
+        resume_id = str(resume_id)
+        self.remove_resume(resume_id)
+
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._ids[slot] = resume_id
+            self._experience_years[slot] = experience_years
+        else:
+            slot = len(self._ids)
+            self._ids.append(resume_id)
+            self._resume_skills.append(set())
+            self._experience_years.append(experience_years)
+
+        normalized = {self.normalize_skill(skill) for skill in skills if skill}
+        normalized.discard("")
+        self._resume_skills[slot] = normalized
+
+        bit = 1 << slot
+        for skill in normalized:
+            self._postings[skill] = self._postings.get(skill, 0) | bit
+
+        self._slots[resume_id] = slot
+        self._live |= bit
+
+    def remove_resume(self, resume_id: str) -> bool:
+        """Drop a resume from the index. Returns False if it was not indexed."""
+        slot = self._slots.pop(str(resume_id), None)
+        if slot is None:
+            return False
+
+        mask = ~(1 << slot)
+        for skill in self._resume_skills[slot]:
+            posting = self._postings[skill] & mask
+            if posting:
+                self._postings[skill] = posting
+            else:
+                del self._postings[skill]
+
+        self._resume_skills[slot] = set()
+        self._ids[slot] = None
+        self._live &= mask
+        self._free_slots.append(slot)
+        return True
+
+    def rebuild(self, resumes: Iterable[Dict]):
+        """Rebuild the index from resume documents and swap it in at once."""
+        fresh = SkillIndex()
+        for resume_data in resumes:
+            _add_resume_data(fresh, resume_data)
+        self.__dict__.update(fresh.__dict__)
+
+    def skills(self) -> List[Tuple[str, int]]:
+        """Return every indexed skill with its document frequency."""
+        return sorted(
+            ((skill, bin(posting).count("1")) for skill, posting in self._postings.items()),
+            key=lambda item: (-item[1], item[0])
+        )
+
+    def search(self, query: str, min_years: Optional[float] = None,
+               max_years: Optional[float] = None) -> List[str]:
+        """
+        Return the IDs of resumes matching a boolean skill query.
+
+        Supports AND, OR, NOT, parentheses and quoted multi-word skills, e.g.
+        'python AND (kubernetes OR docker) AND NOT php'. Numeric filters can be
+        passed as arguments or written inline as 'min 5 years' / 'max 10 years'.
+        """
+        expression, inline_min, inline_max = self._split_numeric_filters(query)
+        if min_years is None:
+            min_years = inline_min
+        if max_years is None:
+            max_years = inline_max
+
+        if expression.strip():
+            bitmap = _QueryParser(expression, self).parse()
+        else:
+            bitmap = self._live
+
+        slots = self._bitmap_to_slots(bitmap & self._live)
+
+        if min_years is not None:
+            slots = [slot for slot in slots if self._experience_years[slot] >= min_years]
+        if max_years is not None:
+            slots = [slot for slot in slots if self._experience_years[slot] <= max_years]
+
+        return [self._ids[slot] for slot in slots]
+
+    def posting(self, skill: str) -> int:
+        """Return the bitmap of slots for a single skill."""
+        return self._postings.get(self.normalize_skill(skill), 0)
+
+    @property
+    def live(self) -> int:
+        return self._live
+
+    @staticmethod
+    def normalize_skill(skill: str) -> str:
+        return " ".join(skill.lower().split())
+
+    @staticmethod
+    def _bitmap_to_slots(bitmap: int) -> List[int]:
+        """Expand a bitmap into the list of set bit positions."""
+        if not bitmap:
+            return []
+
+        # Scanning the binary string keeps the work in C instead of
+        # repeatedly shifting a large int in Python.
+        bits = bin(bitmap)[:1:-1]
+        slots = []
+        position = bits.find("1")
+        while position != -1:
+            slots.append(position)
+            position = bits.find("1", position + 1)
+        return slots
+
+    @staticmethod
+    def _split_numeric_filters(query: str) -> Tuple[str, Optional[float], Optional[float]]:
+        """Pull 'min N years' / 'max N years' clauses out of a query string."""
+        min_years = None
+        max_years = None
+
+        pattern = r'(?i)[,\s]*\b(min|max)(?:imum)?\s+(\d+(?:\.\d+)?)\s*(?:\+\s*)?(?:years?|yrs?)\b'
+        for match in re.finditer(pattern, query):
+            value = float(match.group(2))
+            if match.group(1).lower() == "min":
+                min_years = value
+            else:
+                max_years = value
+
+        expression = re.sub(pattern, " ", query)
+        # Drop a dangling operator left behind by e.g. 'python AND min 5 years'
+        expression = re.sub(r'(?i)(?:\s|,)*\b(?:and|or)\s*$', "", expression.strip().rstrip(","))
+        return expression, min_years, max_years
+
+
+class _QueryParser:
+    """Recursive-descent parser that evaluates a boolean skill query to a bitmap."""
+
+    OPERATORS = {"AND", "OR", "NOT"}
+
+    def __init__(self, query: str, index: SkillIndex):
+        self.tokens = self._tokenize(query)
+        self.position = 0
+        self.index = index
+
+    def parse(self) -> int:
+        result = self._parse_or()
+        if self.position != len(self.tokens):
+            raise SkillQueryError(f"Unexpected token '{self.tokens[self.position][1]}' in query")
+        return result
+
+    def _tokenize(self, query: str) -> List[Tuple[str, str]]:
+        tokens = []
+        for match in re.finditer(r'"([^"]*)"|(\()|(\))|([^\s()"]+)', query):
+            quoted, lparen, rparen, word = match.groups()
+            if quoted is not None:
+                tokens.append(("SKILL", quoted))
+            elif lparen:
+                tokens.append(("LPAREN", lparen))
+            elif rparen:
+                tokens.append(("RPAREN", rparen))
+            elif word.upper() in self.OPERATORS:
+                tokens.append((word.upper(), word))
+            elif tokens and tokens[-1][0] == "WORD":
+                # Consecutive plain words form one multi-word skill
+                tokens[-1] = ("WORD", f"{tokens[-1][1]} {word}")
+            else:
+                tokens.append(("WORD", word))
+        return [("SKILL", value) if kind == "WORD" else (kind, value) for kind, value in tokens]
+
+    def _peek(self) -> Optional[str]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position][0]
+        return None
+
+    def _parse_or(self) -> int:
+        result = self._parse_and()
+        while self._peek() == "OR":
+            self.position += 1
+            result |= self._parse_and()
+        return result
+
+    def _parse_and(self) -> int:
+        result = self._parse_not()
+        while self._peek() in ("AND", "NOT", "SKILL", "LPAREN"):
+            # 'python NOT php' is read as 'python AND NOT php'
+            if self._peek() == "AND":
+                self.position += 1
+            result &= self._parse_not()
+        return result
+
+    def _parse_not(self) -> int:
+        if self._peek() == "NOT":
+            self.position += 1
+            return self.index.live & ~self._parse_not()
+        return self._parse_atom()
+
+    def _parse_atom(self) -> int:
+        kind = self._peek()
+        if kind == "LPAREN":
+            self.position += 1
+            result = self._parse_or()
+            if self._peek() != "RPAREN":
+                raise SkillQueryError("Missing closing parenthesis in query")
+            self.position += 1
+            return result
+        if kind == "SKILL":
+            value = self.tokens[self.position][1]
+            self.position += 1
+            return self.index.posting(value)
+        if kind is None:
+            raise SkillQueryError("Query ended unexpectedly")
+        raise SkillQueryError(f"Unexpected token '{self.tokens[self.position][1]}' in query")
+
+
+def resume_experience_years(experience: List[Dict]) -> float:
+    """Estimate total years of experience from a resume's experience entries."""
+    total_years = 0.0
+    now = datetime.now()
+
+    for exp in experience:
+        start_date = exp.get('start_date')
+        end_date = exp.get('end_date') or now
+
+        if isinstance(start_date, datetime) and isinstance(end_date, datetime):
+            total_years += max(0.0, (end_date - start_date).days / 365.25)
+            continue
+
+        # Parsed-but-unstructured entries only carry a 'dates' string
+        match = re.search(r'(\d{4})\s*-\s*((?:\d{4})|(?:Present|Current))', exp.get('dates') or '', re.IGNORECASE)
+        if match:
+            end_year = int(match.group(2)) if match.group(2).isdigit() else now.year
+            total_years += max(0, end_year - int(match.group(1)))
+
+    return total_years
+
+
+def _add_resume_data(index: SkillIndex, resume_data: Dict):
+    index.add_resume(
+        str(resume_data.get('_id') or resume_data.get('id')),
+        [skill.get('name', '') if isinstance(skill, dict) else str(skill)
+         for skill in resume_data.get('skills', [])],
+        resume_experience_years(resume_data.get('experience', []))
+    )
+
+
+def index_resume(resume_data: Dict):
+    """Add or refresh a resume document (as a dict) in the shared skill index."""
+    _add_resume_data(skill_index, resume_data)
+
+
+# Shared index instance used by the routers
+skill_index = SkillIndex()
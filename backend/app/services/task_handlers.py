@@ -0,0 +1,157 @@
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List
+
+from app.models.resume import Resume
+from app.models.job import JobDescription, Requirement
+from app.models.analysis import ResumeJobMatch
+from app.core.config import settings
+from app.core.resources import match_pool, parse_pool, run_in_pool
+from app.services.resume_parser import parsed_resume_fields
+from app.services.job_parser import parsed_job_fields
+from app.services.blob_store import OWNER_RESUME, OWNER_JOB, put_text, get_text
+from app.services.rematch import load_documents, score_pairs, stale_match_query
+from app.services.match_store import bulk_upsert_matches
+from app.services.vector_store import store_resume_vectors
+
+
+class TaskHandlers:
+    """Implementations of the task types run by the worker process."""
+
+    def __init__(self, matching_engine, resume_parser, job_parser, task_queue, batch_size: int = 32):
+        self.matching_engine = matching_engine
+        self.resume_parser = resume_parser
+        self.job_parser = job_parser
+        self.task_queue = task_queue
+        self.batch_size = max(1, batch_size)
+
+    def handlers(self) -> Dict[str, Callable[[Dict], Awaitable[Dict]]]:
+        return {
+            "match": self.match,
+            "rank": self.rank,
+            "rematch": self.rematch,
+            "parse_resume": self.parse_resume,
+            "parse_job": self.parse_job
+        }
+
+    async def run(self, task: Dict) -> Dict:
+        handler = self.handlers().get(task["task_type"])
+        if handler is None:
+            raise ValueError(f"Unknown task type: {task['task_type']}")
+        return await handler(task["payload"])
+
+    async def match(self, payload: Dict) -> Dict:
+        """Score one pair. Payload: resume_id, job_id, optional mode."""
+        results = await self._score_and_store(
+            [(payload["resume_id"], payload["job_id"])], payload.get("mode", "full")
+        )
+        if not results:
+            raise ValueError(f"Resume {payload['resume_id']} or job {payload['job_id']} not found")
+        return {"overall_score": results[0]["overall_score"]}
+
+    async def rank(self, payload: Dict) -> Dict:
+        """
+        Score a job against many resumes. Payload: job_id, optional resume_ids
+        (defaults to every resume), optional mode and limit for the returned top list.
+        """
+        job_id = payload["job_id"]
+        resume_ids = payload.get("resume_ids")
+        if resume_ids is None:
+            cursor = Resume.get_motor_collection().find({}, {"_id": 1})
+            resume_ids = [str(doc["_id"]) async for doc in cursor]
+
+        scored = []
+        pending: List[Dict] = []
+        for start in range(0, len(resume_ids), self.batch_size):
+            batch = [(resume_id, job_id) for resume_id in resume_ids[start:start + self.batch_size]]
+            results = await self._score(batch, payload.get("mode", "full"))
+            scored.extend((result["resume_id"], result["overall_score"]) for result in results)
+            pending = await self._flush_when_full(pending + results)
+        await bulk_upsert_matches(pending)
+
+        scored.sort(key=lambda item: item[1], reverse=True)
+        limit = payload.get("limit", 10)
+        return {
+            "scored": len(scored),
+            "top_candidates": [{"resume_id": rid, "overall_score": score} for rid, score in scored[:limit]]
+        }
+
+    async def rematch(self, payload: Dict) -> Dict:
+        """Recompute stale stored matches. Payload: job_id or resume_id, optional force and mode (REMATCH_MODE)."""
+        kind = "job" if payload.get("job_id") else "resume"
+        target_id = payload.get("job_id") or payload["resume_id"]
+        query = await stale_match_query(kind, target_id, self.matching_engine.ENGINE_VERSION, payload.get("force", False))
+
+        cursor = ResumeJobMatch.get_motor_collection().find(query, {"resume_id": 1, "job_id": 1})
+        pairs = [(doc["resume_id"], doc["job_id"]) async for doc in cursor]
+
+        rescored = 0
+        pending: List[Dict] = []
+        for start in range(0, len(pairs), self.batch_size):
+            results = await self._score(pairs[start:start + self.batch_size], payload.get("mode", settings.REMATCH_MODE))
+            rescored += len(results)
+            pending = await self._flush_when_full(pending + results)
+        await bulk_upsert_matches(pending)
+        return {"stale": len(pairs), "rescored": rescored}
+
+    async def parse_resume(self, payload: Dict) -> Dict:
+        """Re-extract and re-parse a stored resume file. Payload: resume_id."""
+        resume = await Resume.get(payload["resume_id"])
+        if not resume:
+            raise ValueError(f"Resume {payload['resume_id']} not found")
+
+        resume_text = await run_in_pool(parse_pool(), self.resume_parser.extract_text, resume.file_path)
+        parsed_resume = await run_in_pool(parse_pool(), self.resume_parser.parse_resume, resume_text)
+
+        for key, value in parsed_resume_fields(parsed_resume).items():
+            setattr(resume, key, value)
+        resume.updated_at = datetime.now()
+        await resume.save()
+        await put_text(OWNER_RESUME, payload["resume_id"], resume_text)
+        # Replace the resume's now stale vector for /analysis/similar-candidates
+        await store_resume_vectors(self.matching_engine, [resume.dict()])
+
+        # Stored matches for this resume may now be stale
+        follow_up = await self.task_queue.enqueue("rematch", {"resume_id": payload["resume_id"]})
+        return {"skills": len(resume.skills), "rematch_task_id": follow_up["id"]}
+
+    async def parse_job(self, payload: Dict) -> Dict:
+        """Re-parse a stored job description's raw text. Payload: job_id."""
+        job = await JobDescription.get(payload["job_id"])
+        if not job:
+            raise ValueError(f"Job description {payload['job_id']} not found")
+
+        raw_text = await get_text(OWNER_JOB, payload["job_id"])
+        if raw_text is None:
+            raise ValueError(f"Raw text for job description {payload['job_id']} not found")
+        parsed_job = await run_in_pool(parse_pool(), self.job_parser.parse_job, raw_text)
+
+        # Keep the title and company the job was created with
+        fields = parsed_job_fields(parsed_job)
+        fields.pop("title")
+        fields.pop("company")
+        fields["requirements"] = [Requirement(**req) for req in fields["requirements"]]
+        for key, value in fields.items():
+            setattr(job, key, value)
+        job.updated_at = datetime.now()
+        await job.save()
+
+        follow_up = await self.task_queue.enqueue("rematch", {"job_id": payload["job_id"]})
+        return {"skills": len(job.skills), "rematch_task_id": follow_up["id"]}
+
+    async def _score(self, pairs: List, mode: str) -> List[Dict]:
+        resumes, jobs = await load_documents([rid for rid, _ in pairs], [jid for _, jid in pairs])
+        pairs = [(rid, jid) for rid, jid in pairs if rid in resumes and jid in jobs]
+        return await run_in_pool(match_pool(), score_pairs, self.matching_engine, pairs, resumes, jobs, mode)
+
+    async def _score_and_store(self, pairs: List, mode: str) -> List[Dict]:
+        results = await self._score(pairs, mode)
+        await bulk_upsert_matches(results)
+        return results
+
+    @staticmethod
+    async def _flush_when_full(pending: List[Dict]) -> List[Dict]:
+        """Scoring runs in small batches; writes wait for a full MATCH_WRITE_BATCH_SIZE."""
+        if len(pending) < settings.MATCH_WRITE_BATCH_SIZE:
+            return pending
+        await bulk_upsert_matches(pending)
+        return []
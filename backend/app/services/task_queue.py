@@ -0,0 +1,311 @@
+import abc
+import asyncio
+import copy
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.core.config import settings
+
+TASK_STATUSES = ("queued", "running", "succeeded", "failed")
+
+
+class TaskQueue(abc.ABC):
+    """
+    Durable work queue for analysis jobs that outlive a request.
+
+    Tasks are leased by workers for a visibility timeout. A worker that dies
+    mid-task simply lets the lease expire and the task becomes leasable again;
+    failures are retried with backoff until max_attempts is reached.
+    Task records are plain dicts with an "id" key.
+    """
+
+    def __init__(self, visibility_timeout: float = 300, retry_backoff: float = 30, max_attempts: int = 3):
+        self.visibility_timeout = visibility_timeout
+        self.retry_backoff = retry_backoff
+        self.max_attempts = max_attempts
+
+    @abc.abstractmethod
+    async def enqueue(self, task_type: str, payload: Dict[str, Any], max_attempts: Optional[int] = None) -> Dict:
+        """Add a queued task and return its record."""
+
+    @abc.abstractmethod
+    async def lease(self, worker_id: str, task_types: Optional[List[str]] = None) -> Optional[Dict]:
+        """Claim the oldest available task, or None if there is nothing to do."""
+
+    @abc.abstractmethod
+    async def extend_lease(self, task_id: str, worker_id: str) -> bool:
+        """Push the lease deadline out again; False if the lease was lost."""
+
+    @abc.abstractmethod
+    async def complete(self, task_id: str, worker_id: str, result: Optional[Dict] = None):
+        """Mark a leased task as succeeded with its result."""
+
+    @abc.abstractmethod
+    async def fail(self, task_id: str, worker_id: str, error: str):
+        """Record a failed attempt; the task is retried until max_attempts."""
+
+    @abc.abstractmethod
+    async def get(self, task_id: str) -> Optional[Dict]:
+        """The task record, or None if there is no such task."""
+
+    @abc.abstractmethod
+    async def list(self, status: Optional[str] = None, limit: int = 50,
+                   task_type: Optional[str] = None) -> List[Dict]:
+        """Most recent tasks first, optionally only those with a status or task type."""
+
+    @abc.abstractmethod
+    async def counts(self) -> Dict[str, int]:
+        """Number of tasks per status (queue depth is counts()["queued"])."""
+
+    def _new_task(self, task_type: str, payload: Dict[str, Any], max_attempts: Optional[int]) -> Dict:
+        now = datetime.now()
+        return {
+            "task_type": task_type,
+            "payload": payload,
+            "status": "queued",
+            "attempts": 0,
+            "max_attempts": max_attempts or self.max_attempts,
+            "available_at": now,
+            "lease_expires_at": None,
+            "leased_by": None,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "finished_at": None
+        }
+
+
+class MongoTaskQueue(TaskQueue):
+    """Task queue stored in the Task collection; leases use find_one_and_update."""
+
+    def __init__(self, collection=None, **kwargs):
+        super().__init__(**kwargs)
+        self._collection = collection
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            from app.models.task import Task
+            self._collection = Task.get_motor_collection()
+        return self._collection
+
+    async def enqueue(self, task_type: str, payload: Dict[str, Any], max_attempts: Optional[int] = None) -> Dict:
+        task = self._new_task(task_type, payload, max_attempts)
+        result = await self.collection.insert_one(task)
+        task["_id"] = result.inserted_id
+        return self._to_dict(task)
+
+    async def lease(self, worker_id: str, task_types: Optional[List[str]] = None) -> Optional[Dict]:
+        now = datetime.now()
+        await self._fail_exhausted_leases(now)
+
+        query = {
+            "$or": [
+                {"status": "queued", "available_at": {"$lte": now}},
+                {"status": "running", "lease_expires_at": {"$lt": now}}
+            ],
+            "$expr": {"$lt": ["$attempts", "$max_attempts"]}
+        }
+        if task_types:
+            query["task_type"] = {"$in": task_types}
+
+        task = await self.collection.find_one_and_update(
+            query,
+            {
+                "$set": {
+                    "status": "running",
+                    "leased_by": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=self.visibility_timeout),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("available_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+        return self._to_dict(task) if task else None
+
+    async def extend_lease(self, task_id: str, worker_id: str) -> bool:
+        now = datetime.now()
+        result = await self.collection.update_one(
+            {"_id": ObjectId(task_id), "status": "running", "leased_by": worker_id},
+            {"$set": {"lease_expires_at": now + timedelta(seconds=self.visibility_timeout), "updated_at": now}}
+        )
+        return result.modified_count == 1
+
+    async def complete(self, task_id: str, worker_id: str, result: Optional[Dict] = None):
+        now = datetime.now()
+        await self.collection.update_one(
+            {"_id": ObjectId(task_id), "leased_by": worker_id},
+            {"$set": {
+                "status": "succeeded", "result": result, "error": None,
+                "lease_expires_at": None, "updated_at": now, "finished_at": now
+            }}
+        )
+
+    async def fail(self, task_id: str, worker_id: str, error: str):
+        task = await self.collection.find_one({"_id": ObjectId(task_id), "leased_by": worker_id})
+        if not task:
+            return
+
+        now = datetime.now()
+        if task["attempts"] >= task["max_attempts"]:
+            update = {"status": "failed", "finished_at": now}
+        else:
+            # Back off linearly with the number of attempts so far
+            update = {"status": "queued", "available_at": now + timedelta(seconds=self.retry_backoff * task["attempts"])}
+        update.update({"error": error, "lease_expires_at": None, "leased_by": None, "updated_at": now})
+        await self.collection.update_one({"_id": task["_id"], "leased_by": worker_id}, {"$set": update})
+
+    async def get(self, task_id: str) -> Optional[Dict]:
+        if not ObjectId.is_valid(task_id):
+            return None
+        task = await self.collection.find_one({"_id": ObjectId(task_id)})
+        return self._to_dict(task) if task else None
+
+    async def list(self, status: Optional[str] = None, limit: int = 50,
+                   task_type: Optional[str] = None) -> List[Dict]:
+        query = {"status": status} if status else {}
+        if task_type:
+            query["task_type"] = task_type
+        cursor = self.collection.find(query).sort("created_at", -1).limit(limit)
+        return [self._to_dict(task) async for task in cursor]
+
+    async def counts(self) -> Dict[str, int]:
+        counts = {status: 0 for status in TASK_STATUSES}
+        async for row in self.collection.aggregate([{"$group": {"_id": "$status", "count": {"$sum": 1}}}]):
+            counts[row["_id"]] = row["count"]
+        return counts
+
+    async def _fail_exhausted_leases(self, now: datetime):
+        """Tasks whose last allowed attempt timed out will never be leased again."""
+        await self.collection.update_many(
+            {
+                "status": "running",
+                "lease_expires_at": {"$lt": now},
+                "$expr": {"$gte": ["$attempts", "$max_attempts"]}
+            },
+            {"$set": {"status": "failed", "error": "Lease expired on final attempt",
+                      "leased_by": None, "updated_at": now, "finished_at": now}}
+        )
+
+    @staticmethod
+    def _to_dict(task: Dict) -> Dict:
+        task = dict(task)
+        task["id"] = str(task.pop("_id"))
+        return task
+
+
+class InMemoryTaskQueue(TaskQueue):
+    """
+    Process-local stand-in with the same semantics, for tests and single-process
+    runs: only the process that enqueued a task can lease it, so with this
+    backend the API consumes its own tasks (app.worker refuses it).
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._tasks: Dict[str, Dict] = {}
+        self._lock = asyncio.Lock()
+
+    async def enqueue(self, task_type: str, payload: Dict[str, Any], max_attempts: Optional[int] = None) -> Dict:
+        task = self._new_task(task_type, payload, max_attempts)
+        task["id"] = uuid.uuid4().hex
+        self._tasks[task["id"]] = task
+        return copy.deepcopy(task)
+
+    async def lease(self, worker_id: str, task_types: Optional[List[str]] = None) -> Optional[Dict]:
+        async with self._lock:
+            now = datetime.now()
+            candidates = []
+            for task in self._tasks.values():
+                if task_types and task["task_type"] not in task_types:
+                    continue
+                expired = task["status"] == "running" and task["lease_expires_at"] < now
+                if expired and task["attempts"] >= task["max_attempts"]:
+                    task.update({"status": "failed", "error": "Lease expired on final attempt",
+                                 "leased_by": None, "updated_at": now, "finished_at": now})
+                    continue
+                available = task["status"] == "queued" and task["available_at"] <= now
+                if (available or expired) and task["attempts"] < task["max_attempts"]:
+                    candidates.append(task)
+
+            if not candidates:
+                return None
+
+            task = min(candidates, key=lambda t: t["available_at"])
+            task.update({
+                "status": "running",
+                "leased_by": worker_id,
+                "lease_expires_at": now + timedelta(seconds=self.visibility_timeout),
+                "attempts": task["attempts"] + 1,
+                "updated_at": now
+            })
+            return copy.deepcopy(task)
+
+    async def extend_lease(self, task_id: str, worker_id: str) -> bool:
+        task = self._tasks.get(task_id)
+        if not task or task["status"] != "running" or task["leased_by"] != worker_id:
+            return False
+        now = datetime.now()
+        task.update({"lease_expires_at": now + timedelta(seconds=self.visibility_timeout), "updated_at": now})
+        return True
+
+    async def complete(self, task_id: str, worker_id: str, result: Optional[Dict] = None):
+        task = self._tasks.get(task_id)
+        if not task or task["leased_by"] != worker_id:
+            return
+        now = datetime.now()
+        task.update({"status": "succeeded", "result": result, "error": None,
+                     "lease_expires_at": None, "updated_at": now, "finished_at": now})
+
+    async def fail(self, task_id: str, worker_id: str, error: str):
+        task = self._tasks.get(task_id)
+        if not task or task["leased_by"] != worker_id:
+            return
+        now = datetime.now()
+        if task["attempts"] >= task["max_attempts"]:
+            task.update({"status": "failed", "finished_at": now})
+        else:
+            task.update({"status": "queued", "available_at": now + timedelta(seconds=self.retry_backoff * task["attempts"])})
+        task.update({"error": error, "lease_expires_at": None, "leased_by": None, "updated_at": now})
+
+    async def get(self, task_id: str) -> Optional[Dict]:
+        task = self._tasks.get(task_id)
+        return copy.deepcopy(task) if task else None
+
+    async def list(self, status: Optional[str] = None, limit: int = 50,
+                   task_type: Optional[str] = None) -> List[Dict]:
+        tasks = [
+            task for task in self._tasks.values()
+            if (not status or task["status"] == status) and (not task_type or task["task_type"] == task_type)
+        ]
+        tasks.sort(key=lambda t: t["created_at"], reverse=True)
+        return copy.deepcopy(tasks[:limit])
+
+    async def counts(self) -> Dict[str, int]:
+        counts = {status: 0 for status in TASK_STATUSES}
+        for task in self._tasks.values():
+            counts[task["status"]] += 1
+        return counts
+
+
+def create_task_queue() -> TaskQueue:
+    """Build the task queue configured in Settings."""
+    options = {
+        "visibility_timeout": settings.TASK_VISIBILITY_TIMEOUT_SECONDS,
+        "retry_backoff": settings.TASK_RETRY_BACKOFF_SECONDS,
+        "max_attempts": settings.TASK_MAX_ATTEMPTS
+    }
+    if settings.TASK_QUEUE_BACKEND == "memory":
+        return InMemoryTaskQueue(**options)
+    return MongoTaskQueue(**options)
+
+
+# Shared queue instance used by the API and the worker process
+task_queue = create_task_queue()
@@ -0,0 +1,396 @@
+import json
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+from app.core.config import settings
+from app.models.resume import Resume
+from app.services.embedding_store import SUPPORTED_DTYPES, quantize, quantized_dot
+
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = "store.lock"
+BACKFILL_LOCK_FILE = "backfill.lock"
+COLUMNS = ("vectors", "scales", "ids", "tombstones")
+
+
+class MmapVectorStore:
+    """
+    File-backed columnar vector store shared by every worker on a host.
+
+    Layout of a generation N in the store directory:
+      vectors-N.bin     rows of quantized vectors (append-only)
+      scales-N.bin      one float32 scale per row (append-only)
+      ids-N.txt         one ID per line, row order (append-only)
+      tombstones-N.bin  one bit per row, set when the row is deleted
+      manifest.json     current generation, row count, dim and dtype
+
+    Readers map the column files read-only with np.memmap, so the vectors live
+    once in the page cache no matter how many processes open the store.
+    Writers append under an exclusive file lock and publish new rows by
+    rewriting the manifest; compaction writes generation N+1 without the
+    tombstoned rows and swaps the manifest atomically. The replaced generation
+    stays on disk until the next compaction, for readers that read the old
+    manifest but have not opened its files yet.
+    """
+
+    def __init__(self, directory: str, dim: Optional[int] = None, dtype: str = "float32"):
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported embedding dtype: {dtype}")
+
+        self.directory = directory
+        self.dim = dim
+        self.dtype = dtype
+
+        self._generation = None
+        self._count = 0
+        self._manifest_version = None
+        self._vectors = None
+        self._scales = None
+        self._tombstones = None
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._ids_offset = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self.refresh()
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._rows)
+
+    def __contains__(self, vector_id: str) -> bool:
+        # As of the last refresh(): call it once before checking many IDs
+        return vector_id in self._rows
+
+    # Read path
+
+    def refresh(self):
+        """Pick up rows appended, deleted or compacted by other processes."""
+        manifest_path = os.path.join(self.directory, MANIFEST_FILE)
+        try:
+            stat = os.stat(manifest_path)
+        except FileNotFoundError:
+            return
+        # The manifest is replaced atomically, so a new inode means a new version
+        version = (stat.st_ino, stat.st_mtime_ns)
+        if version == self._manifest_version:
+            return
+
+        manifest = self._read_manifest()
+        self._manifest_version = version
+        self.dim = manifest["dim"]
+        self.dtype = manifest["dtype"]
+
+        if manifest["generation"] != self._generation:
+            self._generation = manifest["generation"]
+            self._ids = []
+            self._rows = {}
+            self._ids_offset = 0
+            self._count = 0
+
+        self._map_columns(manifest["count"])
+
+    def similarities(self, query_vector) -> Tuple[List[str], np.ndarray]:
+        """Cosine similarity of a query against every live vector."""
+        self.refresh()
+        if not self._count:
+            return [], np.zeros(0, dtype=np.float32)
+
+        query, query_scales = quantize(query_vector, self.dtype)
+        scores = quantized_dot(self._vectors, self._scales, query[0], query_scales[0])
+
+        live = ~self._deleted_mask()
+        rows = np.nonzero(live)[0]
+        return [self._ids[row] for row in rows], scores[rows]
+
+    def top_k(self, query_vector, k: int = 10, ids: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """Return the k most similar live IDs, optionally restricted to a candidate set."""
+        vector_ids, scores = self.similarities(query_vector)
+        if ids is not None:
+            allowed = set(ids)
+            keep = [i for i, vector_id in enumerate(vector_ids) if vector_id in allowed]
+            vector_ids = [vector_ids[i] for i in keep]
+            scores = scores[keep]
+
+        if not vector_ids:
+            return []
+
+        k = min(k, len(vector_ids))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(vector_ids[i], float(scores[i])) for i in best]
+
+    def stats(self) -> Dict:
+        self.refresh()
+        return {
+            "generation": self._generation,
+            "rows": self._count,
+            "live": len(self._rows),
+            "dim": self.dim,
+            "dtype": self.dtype,
+            "bytes": int(self._vectors.nbytes + self._scales.nbytes) if self._vectors is not None else 0
+        }
+
+    # Write path
+
+    def append(self, items: Iterable[Tuple[str, np.ndarray]], skip_existing: bool = False) -> int:
+        """
+        Append vectors; an ID that already exists has its old row tombstoned,
+        or is left alone with skip_existing. Returns the number of rows written.
+        """
+        items = list(items)
+        if not items:
+            return 0
+
+        with self._locked():
+            self.refresh()
+            if skip_existing:
+                items = [(vector_id, vector) for vector_id, vector in items if str(vector_id) not in self._rows]
+                if not items:
+                    return 0
+            ids = [str(vector_id) for vector_id, _ in items]
+            vectors = np.vstack([np.asarray(vector, dtype=np.float32).ravel() for _, vector in items])
+
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+            if vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}")
+
+            if self._generation is None:
+                self._write_manifest(0, 0)
+                self.refresh()
+
+            data, scales = quantize(vectors, self.dtype)
+            replaced = [self._rows[vector_id] for vector_id in ids if vector_id in self._rows]
+
+            with open(self._path("vectors"), "ab") as f:
+                f.write(data.tobytes())
+            with open(self._path("scales"), "ab") as f:
+                f.write(scales.astype(np.float32).tobytes())
+            with open(self._path("ids"), "a", encoding="utf-8") as f:
+                f.write("".join(f"{vector_id}\n" for vector_id in ids))
+
+            new_count = self._count + len(ids)
+            self._grow_tombstones(new_count)
+            self._set_tombstones(replaced)
+            self._write_manifest(new_count)
+            self.refresh()
+            return len(ids)
+
+    def delete(self, ids: Iterable[str]) -> int:
+        """Tombstone the rows for the given IDs. Returns how many were live."""
+        with self._locked():
+            self.refresh()
+            rows = [self._rows[str(vector_id)] for vector_id in ids if str(vector_id) in self._rows]
+            if rows:
+                self._set_tombstones(rows)
+                self._write_manifest(self._count)
+                self.refresh()
+            return len(rows)
+
+    def deleted_ratio(self) -> float:
+        self.refresh()
+        if not self._count:
+            return 0.0
+        return 1.0 - len(self._rows) / self._count
+
+    def compact(self) -> bool:
+        """Rewrite the live rows into a new generation, dropping tombstoned ones."""
+        with self._locked():
+            self.refresh()
+            if self._generation is None or len(self._rows) == self._count:
+                return False
+
+            old_generation = self._generation
+            new_generation = old_generation + 1
+            live = np.nonzero(~self._deleted_mask())[0]
+
+            with open(self._path("vectors", new_generation), "wb") as f:
+                for start in range(0, len(live), 65536):
+                    f.write(np.ascontiguousarray(self._vectors[live[start:start + 65536]]).tobytes())
+            with open(self._path("scales", new_generation), "wb") as f:
+                f.write(np.ascontiguousarray(self._scales[live]).tobytes())
+            with open(self._path("ids", new_generation), "w", encoding="utf-8") as f:
+                f.write("".join(f"{self._ids[row]}\n" for row in live))
+            with open(self._path("tombstones", new_generation), "wb") as f:
+                f.write(bytes(self._tombstone_bytes(len(live))))
+
+            self._write_manifest(len(live), new_generation)
+            self.refresh()
+
+            # A reader may still be about to open the generation just replaced, so only
+            # the ones before it go. Processes still mapping them keep them alive anyway.
+            self._remove_generations(below=old_generation)
+            return True
+
+    def compact_if_needed(self, max_deleted_ratio: float = 0.2) -> bool:
+        if self.deleted_ratio() > max_deleted_ratio:
+            return self.compact()
+        return False
+
+    # Internals
+
+    def _path(self, column: str, generation: Optional[int] = None) -> str:
+        generation = self._generation if generation is None else generation
+        extension = "txt" if column == "ids" else "bin"
+        return os.path.join(self.directory, f"{column}-{generation}.{extension}")
+
+    def _remove_generations(self, below: int):
+        for name in os.listdir(self.directory):
+            column, _, rest = name.partition("-")
+            generation = rest.split(".", 1)[0]
+            if column in COLUMNS and generation.isdigit() and int(generation) < below:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+
+    def _read_manifest(self) -> Optional[Dict]:
+        try:
+            with open(os.path.join(self.directory, MANIFEST_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_manifest(self, count: int, generation: Optional[int] = None):
+        generation = self._generation if generation is None else generation
+        manifest = {"generation": generation, "count": count, "dim": self.dim, "dtype": self.dtype}
+        manifest_path = os.path.join(self.directory, MANIFEST_FILE)
+        tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, manifest_path)
+
+    def _map_columns(self, count: int):
+        if count == 0:
+            self._vectors = np.zeros((0, self.dim or 0), dtype=np.dtype(self.dtype))
+            self._scales = np.zeros(0, dtype=np.float32)
+            self._tombstones = np.zeros(0, dtype=np.uint8)
+        else:
+            self._vectors = np.memmap(self._path("vectors"), dtype=np.dtype(self.dtype), mode="r", shape=(count, self.dim))
+            self._scales = np.memmap(self._path("scales"), dtype=np.float32, mode="r", shape=(count,))
+            self._tombstones = np.memmap(self._path("tombstones"), dtype=np.uint8, mode="r", shape=((count + 7) // 8,))
+
+        # Read only the ID lines appended since the last refresh
+        if count > self._count:
+            with open(self._path("ids"), "rb") as f:
+                f.seek(self._ids_offset)
+                for _ in range(count - self._count):
+                    line = f.readline()
+                    self._ids.append(line.decode("utf-8").rstrip("\n"))
+                self._ids_offset = f.tell()
+        self._count = count
+
+        deleted = self._deleted_mask()
+        self._rows = {vector_id: row for row, vector_id in enumerate(self._ids) if not deleted[row]}
+
+    def _deleted_mask(self) -> np.ndarray:
+        return np.unpackbits(np.asarray(self._tombstones), bitorder="little")[:self._count].astype(bool)
+
+    @staticmethod
+    def _tombstone_bytes(count: int) -> bytearray:
+        return bytearray((count + 7) // 8)
+
+    def _grow_tombstones(self, count: int):
+        path = self._path("tombstones")
+        needed = (count + 7) // 8
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if needed > size:
+            with open(path, "ab") as f:
+                f.write(bytes(needed - size))
+
+    def _set_tombstones(self, rows: List[int]):
+        if not rows:
+            return
+        with open(self._path("tombstones"), "r+b") as f:
+            for row in rows:
+                f.seek(row // 8)
+                current = f.read(1)[0]
+                f.seek(row // 8)
+                f.write(bytes([current | (1 << (row % 8))]))
+
+    @contextmanager
+    def try_locked(self, name: str = BACKFILL_LOCK_FILE):
+        """Yield True if this process got the named lock, False if another holds it."""
+        with open(os.path.join(self.directory, name), "a") as lock_file:
+            if fcntl is None:
+                yield True
+                return
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _locked(self):
+        with open(os.path.join(self.directory, LOCK_FILE), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# Shared store of resume profile embeddings, opened on first use
+_resume_vectors: Optional[MmapVectorStore] = None
+
+
+def get_resume_vectors() -> MmapVectorStore:
+    global _resume_vectors
+    if _resume_vectors is None:
+        _resume_vectors = MmapVectorStore(
+            os.path.join(settings.VECTOR_STORE_DIR, "resumes"),
+            dtype=settings.EMBEDDING_DTYPE
+        )
+    return _resume_vectors
+
+
+async def store_resume_vectors(matching_engine, resumes: List[Dict], skip_existing: bool = False) -> int:
+    """
+    Embed resume profiles and write them to the shared store, replacing the
+    vector a resume had before (e.g. from before a re-parse).
+    """
+    if not resumes:
+        return 0
+    embeddings = await matching_engine.encode_texts_async(
+        [matching_engine.resume_profile_text(resume) for resume in resumes]
+    )
+    ids = [str(resume.get("_id") or resume.get("id")) for resume in resumes]
+    return get_resume_vectors().append(zip(ids, embeddings), skip_existing=skip_existing)
+
+
+async def backfill_resume_vectors(matching_engine, batch_size: int = 256) -> int:
+    """
+    Embed the resumes that have no stored vector (older data, failed writes).
+    Only one process on the host runs it at a time; the others return 0.
+    """
+    store = get_resume_vectors()
+    with store.try_locked() as acquired:
+        if not acquired:
+            return 0
+
+        store.refresh()
+        added = 0
+        batch = []
+        cursor = Resume.get_motor_collection().find({}, {"summary": 1, "skills": 1, "experience": 1})
+        async for doc in cursor:
+            if str(doc["_id"]) not in store:
+                batch.append(doc)
+            if len(batch) >= batch_size:
+                added += await store_resume_vectors(matching_engine, batch, skip_existing=True)
+                batch = []
+        added += await store_resume_vectors(matching_engine, batch, skip_existing=True)
+        return added
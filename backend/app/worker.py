@@ -0,0 +1,114 @@
+"""
+Task worker process: python -m app.worker
+
+Leases tasks from the shared task queue and runs them with its own
+MatchingEngine and parsers, so the number of workers scales independently
+of the API replicas. Each process runs WORKER_CONCURRENCY consumer loops.
+"""
+import asyncio
+import os
+import signal
+import socket
+import traceback
+
+from app.core.config import settings
+from app.core.timing import trace, add_span_listener
+from app.core import metrics
+from app.core import resources
+from app.config.database import init_db
+from app.services.matching_engine import MatchingEngine
+from app.services.resume_parser import ResumeParser
+from app.services.job_parser import JobParser
+from app.services.task_queue import task_queue
+from app.services.task_handlers import TaskHandlers
+
+
+async def heartbeat(task_id: str, worker_id: str):
+    # Renew the lease well before it runs out while a long task is running
+    interval = max(1.0, task_queue.visibility_timeout / 3)
+    while True:
+        await asyncio.sleep(interval)
+        if not await task_queue.extend_lease(task_id, worker_id):
+            print(f"{worker_id}: lost lease on task {task_id}")
+            return
+
+
+async def record(worker_id: str, task_id: str, outcome):
+    # If the result cannot be stored, the lease runs out and the task is retried
+    try:
+        await outcome
+    except Exception as e:
+        print(f"{worker_id}: error recording result of task {task_id}: {e}")
+
+
+async def consume(worker_id: str, handlers: TaskHandlers, stopping: asyncio.Event):
+    while not stopping.is_set():
+        try:
+            task = await task_queue.lease(worker_id)
+        except Exception as e:
+            print(f"{worker_id}: error leasing task: {e}")
+            task = None
+
+        if task is None:
+            try:
+                await asyncio.wait_for(stopping.wait(), timeout=settings.WORKER_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        keep_alive = asyncio.create_task(heartbeat(task["id"], worker_id))
+        try:
+            with trace(f"task {task['task_type']}", task_id=task["id"], attempt=task["attempts"]):
+                result = await handlers.run(task)
+        except Exception as e:
+            traceback.print_exc()
+            await record(worker_id, task["id"], task_queue.fail(task["id"], worker_id, str(e)))
+        else:
+            await record(worker_id, task["id"], task_queue.complete(task["id"], worker_id, result))
+        finally:
+            keep_alive.cancel()
+
+
+def consumers(handlers: TaskHandlers, stopping: asyncio.Event):
+    """WORKER_CONCURRENCY consumer loops, named after this host and process."""
+    prefix = f"{socket.gethostname()}-{os.getpid()}"
+    return [
+        consume(f"{prefix}-{n}", handlers, stopping)
+        for n in range(max(1, settings.WORKER_CONCURRENCY))
+    ]
+
+
+async def main():
+    if settings.TASK_QUEUE_BACKEND == "memory":
+        raise SystemExit("app.worker needs a shared task queue; with TASK_QUEUE_BACKEND=memory "
+                         "the API process runs its own tasks")
+    resources.configure_process()
+    await init_db()
+
+    handlers = TaskHandlers(
+        MatchingEngine(),
+        ResumeParser(),
+        JobParser(),
+        task_queue,
+        batch_size=settings.REMATCH_BATCH_SIZE
+    )
+
+    # Stage durations of worker tasks show up in the API's /metrics via the shared METRICS_DIR
+    if settings.METRICS_ENABLED and settings.METRICS_DIR:
+        add_span_listener(metrics.observe_span)
+        asyncio.create_task(metrics.flush_snapshots())
+
+    # Finish the task in hand on SIGTERM/SIGINT instead of abandoning its lease
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stopping.set)
+
+    loops = consumers(handlers, stopping)
+    print(f"Task worker {os.getpid()} started with {len(loops)} consumer(s)")
+    await asyncio.gather(*loops)
+    print(f"Task worker {os.getpid()} stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+"""
+Deterministic synthetic resumes and job descriptions for benchmarks.
+
+The same seed and size always produce the same documents, so timings from
+different runs are measured on identical inputs. Documents have the shape of
+Resume.dict() / JobDescription.dict() as the matching engine sees them.
+"""
+import random
+from typing import Dict, List, Tuple
+
+SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "Go", "Rust", "C++", "C#", "Ruby", "PHP",
+    "SQL", "PostgreSQL", "MySQL", "MongoDB", "Redis", "Elasticsearch", "Kafka", "RabbitMQ",
+    "Docker", "Kubernetes", "Terraform", "AWS", "Azure", "GCP", "Linux", "Git", "CI/CD",
+    "React", "Angular", "Vue", "Node.js", "Django", "Flask", "FastAPI", "Spring", "GraphQL",
+    "REST APIs", "Microservices", "Machine Learning", "Deep Learning", "NLP", "Computer Vision",
+    "TensorFlow", "PyTorch", "scikit-learn", "Pandas", "NumPy", "Spark", "Hadoop", "Airflow",
+    "Data Analysis", "Data Visualization", "Tableau", "Power BI", "Statistics", "Excel",
+    "Project Management", "Agile", "Scrum", "Leadership", "Communication", "Problem Solving"
+]
+
+TITLES = [
+    "Software Engineer", "Senior Software Engineer", "Backend Developer", "Frontend Developer",
+    "Full Stack Developer", "Data Scientist", "Data Analyst", "Machine Learning Engineer",
+    "DevOps Engineer", "Site Reliability Engineer", "Data Engineer", "Engineering Manager"
+]
+
+COMPANIES = [
+    "Acme Corp", "Globex", "Initech", "Umbrella Analytics", "Stark Industries", "Wayne Systems",
+    "Hooli", "Vandelay Logistics", "Soylent Labs", "Cyberdyne", "Tyrell Data", "Oscorp"
+]
+
+DEGREES = [
+    "Bachelor's in Computer Science", "Master's in Computer Science", "Bachelor's in Statistics",
+    "Master's in Data Science", "PhD in Machine Learning", "Bachelor's in Mathematics",
+    "Associate's in Information Technology", "MBA", "Bachelor's in Software Engineering"
+]
+
+EDUCATION_LEVELS = ["", "Associate's", "Bachelor's", "Master's", "PhD"]
+
+INSTITUTIONS = [
+    "State University", "Institute of Technology", "City College", "Polytechnic University",
+    "National University", "Technical University"
+]
+
+WORDS = (
+    "design build maintain scalable reliable services data pipelines customers teams deliver "
+    "features improve performance latency throughput architecture cloud platform automate testing "
+    "deployment monitoring analytics models production quality review mentor collaborate product "
+    "stakeholders requirements migrate legacy systems optimize queries dashboards reporting "
+    "experiments research prototype integrate partners security compliance documentation"
+).split()
+
+# Named corpus sizes: skills per document, experience entries, words of free text
+SIZES = {
+    "small": {"skills": 5, "experience": 1, "words": 30},
+    "medium": {"skills": 15, "experience": 3, "words": 120},
+    "large": {"skills": 40, "experience": 6, "words": 400}
+}
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(max(1, words)))
+    return text[0].upper() + text[1:] + "."
+
+
+def generate_resume(rng: random.Random, size: Dict, index: int) -> Dict:
+    experience = []
+    year = 2024
+    for _ in range(size["experience"]):
+        start = year - rng.randint(1, 4)
+        experience.append({
+            "title": rng.choice(TITLES),
+            "position": rng.choice(TITLES),
+            "company": rng.choice(COMPANIES),
+            "dates": f"{start} - {year}",
+            "description": _sentence(rng, size["words"] // max(1, size["experience"]))
+        })
+        year = start
+
+    skills = rng.sample(SKILLS, min(size["skills"], len(SKILLS)))
+    return {
+        "id": f"resume-{index}",
+        "candidate_name": f"Candidate {index}",
+        "email": f"candidate{index}@example.com",
+        "summary": _sentence(rng, size["words"] // 4),
+        "skills": [{"name": skill} for skill in skills],
+        "experience": experience,
+        "education": [{"degree": rng.choice(DEGREES), "institution": rng.choice(INSTITUTIONS)}]
+    }
+
+
+def generate_job(rng: random.Random, size: Dict, index: int) -> Dict:
+    return {
+        "id": f"job-{index}",
+        "title": rng.choice(TITLES),
+        "company": rng.choice(COMPANIES),
+        "description": _sentence(rng, size["words"]),
+        "responsibilities": [_sentence(rng, 12) for _ in range(max(1, size["experience"]))],
+        "skills": rng.sample(SKILLS, min(size["skills"], len(SKILLS))),
+        "min_experience_years": rng.randint(0, 8),
+        "education_level": rng.choice(EDUCATION_LEVELS)
+    }
+
+
+def generate_corpus(size_name: str, count: int, seed: int = 0) -> Tuple[List[Dict], List[Dict]]:
+    """count resumes and count jobs of the named size."""
+    size = SIZES[size_name]
+    # Seed per size so adding a size does not change the documents of the others
+    rng = random.Random(f"{seed}-{size_name}")
+    resumes = [generate_resume(rng, size, i) for i in range(count)]
+    jobs = [generate_job(rng, size, i) for i in range(count)]
+    return resumes, jobs
@@ -0,0 +1,127 @@
+"""
+Offline generation of resume files (PDF, DOCX) and job description text.
+
+Text comes from the synthetic corpus in benchmarks.corpus, laid out the way
+real resumes are (contact line, SUMMARY / EXPERIENCE / EDUCATION / SKILLS
+headings) so the parsers' section and entity heuristics do real work.
+PDFs are written directly (single-font text pages) so no PDF library is needed.
+"""
+import os
+import random
+import textwrap
+from typing import Dict, List, Tuple
+
+import docx
+
+from benchmarks.corpus import SIZES, generate_resume, generate_job
+
+LINE_WIDTH = 90
+LINES_PER_PAGE = 60
+
+
+def resume_lines(resume: Dict, index: int) -> List[str]:
+    lines = [
+        resume["candidate_name"],
+        f"{resume['email']} | (555) 010-{index % 10000:04d} | San Francisco, CA",
+        f"linkedin.com/in/candidate{index} | github.com/candidate{index}",
+        "",
+        "SUMMARY"
+    ]
+    lines += textwrap.wrap(resume["summary"], LINE_WIDTH)
+    lines += ["", "EXPERIENCE"]
+    for exp in resume["experience"]:
+        lines.append(f"{exp['position']} at {exp['company']}, {exp['dates']}")
+        lines += textwrap.wrap(exp["description"], LINE_WIDTH)
+    lines += ["", "EDUCATION"]
+    for edu in resume["education"]:
+        lines.append(f"{edu['degree']}, University of {edu['institution'].split()[0]}, 2010 - 2014")
+    lines += ["", "SKILLS"]
+    lines += textwrap.wrap(", ".join(skill["name"] for skill in resume["skills"]), LINE_WIDTH)
+    return lines
+
+
+def job_text(job: Dict) -> str:
+    lines = [job["title"], f"{job['company']} - New York, NY (Hybrid, Full-time)", "", "About the role"]
+    lines += textwrap.wrap(job["description"], LINE_WIDTH)
+    lines += ["", "Responsibilities:"]
+    lines += [f"- {resp}" for resp in job["responsibilities"]]
+    lines += ["", "Requirements:"]
+    lines.append(f"- {job['min_experience_years']}+ years of experience")
+    if job["education_level"]:
+        lines.append(f"- {job['education_level']} degree in Computer Science or related field")
+    lines += [f"- Experience with {skill}" for skill in job["skills"]]
+    lines += ["", "Salary: $120,000 - $160,000"]
+    return "\n".join(lines)
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, lines: List[str]):
+    """Write text lines as a minimal multi-page PDF with a Helvetica text layer."""
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+
+    # Objects 1-3 are the catalog, page tree and font; each page adds a page and a content stream
+    objects = {}
+    page_ids = []
+    for n, page_lines in enumerate(pages):
+        page_id, content_id = 4 + 2 * n, 5 + 2 * n
+        page_ids.append(page_id)
+        stream = "BT /F1 10 Tf 12 TL 50 780 Td\n" + "".join(
+            f"({_pdf_escape(line)}) Tj T*\n" for line in page_lines
+        ) + "ET"
+        stream_bytes = stream.encode("latin-1", errors="replace")
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(stream_bytes) + stream_bytes + b"\nendstream"
+        objects[page_id] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids).encode()
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[2] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+    objects[3] = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += b"%d 0 obj\n" % obj_id + objects[obj_id] + b"\nendobj\n"
+
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for obj_id in sorted(objects):
+        out += b"%010d 00000 n \n" % offsets[obj_id]
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def write_docx(path: str, lines: List[str]):
+    document = docx.Document()
+    for line in lines:
+        document.add_paragraph(line)
+    document.save(path)
+
+
+def generate_documents(directory: str, size_name: str, count: int, seed: int = 0) -> Tuple[List[str], List[str]]:
+    """
+    Write count resumes in each of PDF and DOCX plus count job descriptions.
+    Returns (resume file paths, job description texts).
+    """
+    size = SIZES[size_name]
+    rng = random.Random(f"{seed}-{size_name}-documents")
+    os.makedirs(directory, exist_ok=True)
+
+    resume_paths = []
+    for i in range(count):
+        lines = resume_lines(generate_resume(rng, size, i), i)
+        for ext, writer in ((".pdf", write_pdf), (".docx", write_docx)):
+            path = os.path.join(directory, f"{size_name}-resume-{i}{ext}")
+            writer(path, lines)
+            resume_paths.append(path)
+
+    job_texts = [job_text(generate_job(rng, size, i)) for i in range(count)]
+    return resume_paths, job_texts
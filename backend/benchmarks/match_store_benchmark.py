@@ -0,0 +1,127 @@
+"""
+Match persistence benchmark (needs a running MongoDB).
+
+    python -m benchmarks.match_store_benchmark run --count 5000 --batch-size 1000 --output results.json
+    python -m benchmarks.match_store_benchmark compare baseline.json results.json --threshold 0.1
+
+Writes synthetic match results into a scratch database (<DATABASE_NAME>_benchmark,
+dropped afterwards) three ways: Beanie save() per document, one atomic upsert
+per pair (/analysis/match) and unordered bulk upserts (rank and rematch jobs),
+then reports the average stored size per pair in full and compact storage mode.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from typing import Dict, List
+
+import motor.motor_asyncio
+from beanie import init_beanie
+
+from app.core.config import settings
+from app.models.analysis import ResumeJobMatch
+from app.services.match_store import bulk_upsert_matches, upsert_match
+from benchmarks.corpus import SKILLS
+from benchmarks import report
+from benchmarks.report import summarize, environment, save_results
+
+
+def generate_matches(count: int, seed: int) -> List[Dict]:
+    """Match results shaped like MatchingEngine output, for count distinct pairs."""
+    rng = random.Random(f"{seed}-matches")
+    matches = []
+    for index in range(count):
+        skills = rng.sample(SKILLS, 8)
+        matches.append({
+            "resume_id": f"resume-{index // 50}",
+            "job_id": f"job-{index % 50}",
+            "candidate_name": f"Candidate {index}",
+            "job_title": "Software Engineer",
+            "company": "Acme",
+            "overall_score": round(rng.random(), 2),
+            "category_scores": [
+                {"category": category, "score": round(rng.random(), 2), "max_score": 1.0, "weight": weight,
+                 "details": {"matched": rng.randint(0, 10)}}
+                for category, weight in (("Skills", 0.4), ("Experience", 0.35), ("Education", 0.25))
+            ],
+            "skill_matches": [
+                {"resume_skill": skill, "job_skill": skill, "score": round(rng.random(), 2), "is_exact_match": True}
+                for skill in skills
+            ],
+            "experience_relevance": {f"Engineer at Company {n}": round(rng.random(), 2) for n in range(3)},
+            "missing_skills": rng.sample(SKILLS, 3),
+            "improvement_suggestions": [f"Consider gaining experience with {skill}" for skill in rng.sample(SKILLS, 3)],
+            "match_mode": "full",
+            "engine_version": "benchmark"
+        })
+    return matches
+
+
+async def timed_writes(label: str, matches: List[Dict], write) -> Dict:
+    await ResumeJobMatch.get_motor_collection().delete_many({})
+    latencies = []
+    start = time.perf_counter()
+    for item in matches:
+        call_start = time.perf_counter()
+        await write(item)
+        latencies.append(time.perf_counter() - call_start)
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {len(matches) / elapsed:.0f} writes/s")
+    return {"writes_per_sec": round(len(matches) / elapsed, 3), "latency": summarize(latencies)}
+
+
+async def bench(args) -> Dict:
+    client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGODB_URL)
+    database_name = f"{settings.DATABASE_NAME}_benchmark"
+    await init_beanie(database=client[database_name], document_models=[ResumeJobMatch])
+    matches = generate_matches(args.count, args.seed)
+
+    try:
+        results = {
+            "save_one": await timed_writes("save() per document", matches,
+                                           lambda item: ResumeJobMatch(**item).save()),
+            "upsert_one": await timed_writes("upsert per pair", matches, upsert_match)
+        }
+
+        await ResumeJobMatch.get_motor_collection().delete_many({})
+        start = time.perf_counter()
+        await bulk_upsert_matches(matches, args.batch_size)
+        elapsed = time.perf_counter() - start
+        results["bulk"] = {"writes_per_sec": round(len(matches) / elapsed, 3), "batch_size": args.batch_size}
+        print(f"bulk upserts: {len(matches) / elapsed:.0f} writes/s")
+
+        results["storage"] = {}
+        for label, compact in (("full", False), ("compact", True)):
+            await ResumeJobMatch.get_motor_collection().delete_many({})
+            await bulk_upsert_matches(matches, args.batch_size, compact=compact)
+            stats = await client[database_name].command("collStats", ResumeJobMatch.Settings.name)
+            results["storage"][label] = {"avg_bytes": stats["avgObjSize"], "size_bytes": stats["size"]}
+            print(f"{label} storage: {stats['avgObjSize']} bytes per pair")
+    finally:
+        await client.drop_database(database_name)
+    return results
+
+
+def run(args) -> int:
+    results = asyncio.run(bench(args))
+    output = {
+        "benchmark": "match_store",
+        "environment": environment(),
+        "config": {"count": args.count, "batch_size": args.batch_size, "seed": args.seed},
+        "results": results
+    }
+    save_results(output, args.output)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+def add_run_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--count", type=int, default=2000, help="Match results written per method")
+    parser.add_argument("--batch-size", type=int, default=settings.MATCH_WRITE_BATCH_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results/match_store.json")
+
+
+if __name__ == "__main__":
+    sys.exit(report.main("Benchmark writing match results to MongoDB", add_run_arguments, run))
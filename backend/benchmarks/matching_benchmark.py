@@ -0,0 +1,139 @@
+"""
+Matching engine benchmark.
+
+    python -m benchmarks.matching_benchmark run --sizes small,medium,large --output results.json
+    python -m benchmarks.matching_benchmark compare baseline.json results.json --threshold 0.1
+
+Times each matching stage (_match_skills, _match_experience, _match_education)
+cold (embedding caches cleared before every call) and warm (same inputs again),
+plus end-to-end pair throughput scored one at a time and concurrently, where
+concurrent callers share micro-batched transformer encodes. Model loading is
+timed once and excluded from everything else.
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from app.services.matching_engine import MatchingEngine, MatchContext, MATCH_MODES
+from benchmarks.corpus import SIZES, generate_corpus
+from benchmarks import report
+from benchmarks.report import summarize, environment, save_results, comma_list
+
+
+def resume_skill_names(resume: Dict) -> List[str]:
+    return [skill.get("name", "") if isinstance(skill, dict) else skill for skill in resume.get("skills", [])]
+
+
+def clear_caches(engine: MatchingEngine):
+    engine.static_vectors.clear()
+    engine.text_embeddings.clear()
+
+
+def stage_calls(engine: MatchingEngine, mode: str) -> Dict[str, Callable[[Dict, Dict], Dict]]:
+    return {
+        "skills": lambda r, j: engine._match_skills(resume_skill_names(r), j.get("skills", []), MatchContext(mode)),
+        "experience": lambda r, j: engine._match_experience(r, j, MatchContext(mode)),
+        "education": lambda r, j: engine._match_education(r, j, MatchContext(mode))
+    }
+
+
+def bench_stages(engine: MatchingEngine, pairs: List, mode: str) -> Dict:
+    results = {}
+    for stage, call in stage_calls(engine, mode).items():
+        cold, warm = [], []
+        for resume, job in pairs:
+            clear_caches(engine)
+            start = time.perf_counter()
+            call(resume, job)
+            cold.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            call(resume, job)
+            warm.append(time.perf_counter() - start)
+        results[stage] = {"cold": summarize(cold), "warm": summarize(warm)}
+    return results
+
+
+def bench_throughput(engine: MatchingEngine, pairs: List, mode: str, concurrency: int) -> Dict:
+    clear_caches(engine)
+    latencies = []
+    start = time.perf_counter()
+    for resume, job in pairs:
+        call_start = time.perf_counter()
+        engine.match_resume_to_job(resume, job, mode)
+        latencies.append(time.perf_counter() - call_start)
+    single_elapsed = time.perf_counter() - start
+
+    clear_caches(engine)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda pair: engine.match_resume_to_job(pair[0], pair[1], mode), pairs))
+    batched_elapsed = time.perf_counter() - start
+
+    return {
+        "single": {
+            "pairs_per_sec": round(len(pairs) / single_elapsed, 3),
+            "latency": summarize(latencies)
+        },
+        "batched": {
+            "pairs_per_sec": round(len(pairs) / batched_elapsed, 3),
+            "concurrency": concurrency,
+            "encoder": engine.encoder.stats()
+        }
+    }
+
+
+def run(args) -> int:
+    engine = MatchingEngine()
+    start = time.perf_counter()
+    if args.mode != "lexical":
+        engine._load_models()
+    model_load_seconds = time.perf_counter() - start
+
+    results = {}
+    for size_name in args.sizes:
+        resumes, jobs = generate_corpus(size_name, args.pairs, args.seed)
+        pairs = list(zip(resumes, jobs))
+
+        # One untimed pass so lazy imports and first-call setup do not land in the samples
+        engine.match_resume_to_job(pairs[0][0], pairs[0][1], args.mode)
+
+        results[size_name] = {
+            "stages": bench_stages(engine, pairs, args.mode),
+            "throughput": bench_throughput(engine, pairs, args.mode, args.concurrency)
+        }
+        print(f"{size_name}: done ({args.pairs} pairs)")
+
+    output = {
+        "benchmark": "matching",
+        "environment": environment(),
+        "config": {
+            "mode": args.mode,
+            "pairs": args.pairs,
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            "sizes": {name: SIZES[name] for name in args.sizes},
+            "engine_version": engine.ENGINE_VERSION,
+            "model_load_seconds": round(model_load_seconds, 3)
+        },
+        "results": results
+    }
+    save_results(output, args.output)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+def add_run_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--sizes", type=comma_list(SIZES), default="small,medium,large",
+                        help=f"Comma-separated corpus sizes from: {', '.join(SIZES)}")
+    parser.add_argument("--pairs", type=int, default=50, help="Resume/job pairs per size")
+    parser.add_argument("--mode", default="full", choices=MATCH_MODES)
+    parser.add_argument("--concurrency", type=int, default=8, help="Threads for batched scoring")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results/matching.json")
+
+
+if __name__ == "__main__":
+    sys.exit(report.main("Benchmark the resume/job matching engine", add_run_arguments, run))
@@ -0,0 +1,253 @@
+"""
+Resume/job parsing benchmark.
+
+    python -m benchmarks.parsing_benchmark run --sizes small,large --count 50 --workers 4
+    python -m benchmarks.parsing_benchmark compare baseline.json results.json
+
+Generates PDF and DOCX resumes and job description texts offline, then times
+ResumeParser.extract_text, parse_resume and JobParser.parse_job. Single mode
+runs in this process and also breaks the work down per extractor (PyPDF2,
+pdfminer, python-docx for text; the spaCy pipeline and each _extract_* step
+for parsing). Pool mode runs extract + parse across worker processes the way
+an ingestion pool would and reports wall-clock docs/sec. Each size and mode
+runs in a freshly spawned process, so peak RSS is that run's own resident
+high-water mark: of the process itself (single) or its largest worker (pool).
+"""
+import argparse
+import inspect
+import multiprocessing
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+import docx
+import PyPDF2
+from pdfminer.high_level import extract_text as pdfminer_extract_text
+
+from app.services.resume_parser import ResumeParser
+from app.services.job_parser import JobParser
+from benchmarks.corpus import SIZES
+from benchmarks.documents import generate_documents
+from benchmarks import report
+from benchmarks.report import summarize, environment, save_results, comma_list
+
+# Parsers of the current worker process (pool mode)
+_resume_parser = None
+_job_parser = None
+
+
+def peak_rss_mb(who: int = resource.RUSAGE_SELF) -> float:
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def in_fresh_process(fn, *args):
+    """Run fn in a newly spawned process, whose rusage covers only this call."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as runner:
+        return runner.submit(fn, *args).result()
+
+
+def extractor_steps(parser) -> Dict:
+    """The parser's field extractors: _extract_* / _is_* methods taking (doc, text) or (text)."""
+    steps = {}
+    for name, method in inspect.getmembers(parser, inspect.ismethod):
+        if not name.startswith(("_extract_", "_is_")) or name.startswith("_extract_text_from"):
+            continue
+        required = {
+            param.name for param in inspect.signature(method).parameters.values()
+            if param.default is inspect.Parameter.empty
+        }
+        if "text" in required and required <= {"doc", "text"}:
+            steps[name] = method
+    return steps
+
+
+def time_extractors(parser, text: str, timings: Dict[str, List[float]]):
+    start = time.perf_counter()
+    doc = parser.nlp(text)
+    timings.setdefault("spacy_pipeline", []).append(time.perf_counter() - start)
+
+    for name, method in extractor_steps(parser).items():
+        args = (doc, text) if "doc" in inspect.signature(method).parameters else (text,)
+        start = time.perf_counter()
+        method(*args)
+        timings.setdefault(name, []).append(time.perf_counter() - start)
+
+
+def time_text_backends(path: str, timings: Dict[str, List[float]]):
+    """Time each text extraction library on its own, bypassing the fallback chain."""
+    def pypdf2(p):
+        with open(p, "rb") as f:
+            return "\n".join(page.extract_text() for page in PyPDF2.PdfReader(f).pages)
+
+    backends = {
+        ".pdf": {"pypdf2": pypdf2, "pdfminer": pdfminer_extract_text},
+        ".docx": {"python_docx": lambda p: "\n".join(par.text for par in docx.Document(p).paragraphs)}
+    }
+    for name, extract in backends[os.path.splitext(path)[1]].items():
+        start = time.perf_counter()
+        extract(path)
+        timings.setdefault(name, []).append(time.perf_counter() - start)
+
+
+def process_resume(path: str) -> Dict:
+    """Extract and parse one resume in a pool worker; returns its timings."""
+    global _resume_parser
+    if _resume_parser is None:
+        _resume_parser = ResumeParser()
+    start = time.perf_counter()
+    text = _resume_parser.extract_text(path)
+    extracted = time.perf_counter()
+    _resume_parser.parse_resume(text)
+    return {"extract_text": extracted - start, "parse_resume": time.perf_counter() - extracted}
+
+
+def process_job(text: str) -> float:
+    global _job_parser
+    if _job_parser is None:
+        _job_parser = JobParser()
+    start = time.perf_counter()
+    _job_parser.parse_job(text)
+    return time.perf_counter() - start
+
+
+def warm_worker(_):
+    process_job("Software Engineer\nAcme Corp\nRequirements:\n- Python")
+    return os.getpid()
+
+
+def run_single(resume_paths: List[str], job_texts: List[str]) -> Dict:
+    resume_parser = ResumeParser()
+    job_parser = JobParser()
+    resume_parser._load_spacy_model()
+    job_parser._load_spacy_model()
+
+    extract = {".pdf": [], ".docx": []}
+    parse = {".pdf": [], ".docx": []}
+    text_backends: Dict[str, List[float]] = {}
+    resume_extractors: Dict[str, List[float]] = {}
+    for path in resume_paths:
+        ext = os.path.splitext(path)[1]
+        start = time.perf_counter()
+        text = resume_parser.extract_text(path)
+        extracted = time.perf_counter()
+        resume_parser.parse_resume(text)
+        extract[ext].append(extracted - start)
+        parse[ext].append(time.perf_counter() - extracted)
+
+        time_text_backends(path, text_backends)
+        time_extractors(resume_parser, text, resume_extractors)
+
+    job_times = []
+    job_extractors: Dict[str, List[float]] = {}
+    for text in job_texts:
+        start = time.perf_counter()
+        job_parser.parse_job(text)
+        job_times.append(time.perf_counter() - start)
+        time_extractors(job_parser, text, job_extractors)
+
+    results = {"resumes": {}, "jobs": {}}
+    for ext in (".pdf", ".docx"):
+        total = [e + p for e, p in zip(extract[ext], parse[ext])]
+        results["resumes"][ext.lstrip(".")] = {
+            "docs_per_sec": round(len(total) / sum(total), 3) if total else 0.0,
+            "extract_text": summarize(extract[ext]),
+            "parse_resume": summarize(parse[ext]),
+            "total": summarize(total)
+        }
+    results["resumes"]["text_backends"] = {name: summarize(t) for name, t in text_backends.items()}
+    results["resumes"]["extractors"] = {name: summarize(t) for name, t in resume_extractors.items()}
+    results["jobs"] = {
+        "docs_per_sec": round(len(job_times) / sum(job_times), 3) if job_times else 0.0,
+        "parse_job": summarize(job_times),
+        "extractors": {name: summarize(t) for name, t in job_extractors.items()}
+    }
+    results["peak_rss_mb"] = peak_rss_mb()
+    return results
+
+
+def run_pool(resume_paths: List[str], job_texts: List[str], workers: int) -> Dict:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Load the spaCy model in every worker before the clock starts
+        list(pool.map(warm_worker, range(workers * 4)))
+
+        start = time.perf_counter()
+        resume_timings = list(pool.map(process_resume, resume_paths))
+        resume_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        job_times = list(pool.map(process_job, job_texts))
+        job_elapsed = time.perf_counter() - start
+
+    totals = [t["extract_text"] + t["parse_resume"] for t in resume_timings]
+    return {
+        "workers": workers,
+        "resumes": {
+            "docs_per_sec": round(len(totals) / resume_elapsed, 3),
+            "extract_text": summarize([t["extract_text"] for t in resume_timings]),
+            "parse_resume": summarize([t["parse_resume"] for t in resume_timings]),
+            "total": summarize(totals)
+        },
+        "jobs": {
+            "docs_per_sec": round(len(job_times) / job_elapsed, 3),
+            "parse_job": summarize(job_times)
+        },
+        "peak_rss_mb": peak_rss_mb(resource.RUSAGE_CHILDREN)
+    }
+
+
+def run(args) -> int:
+    sizes = args.sizes
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix="parsing-benchmark-")
+    results = {}
+    try:
+        for size_name in sizes:
+            resume_paths, job_texts = generate_documents(
+                os.path.join(corpus_dir, size_name), size_name, args.count, args.seed
+            )
+            results[size_name] = {}
+            if args.mode in ("single", "both"):
+                results[size_name]["single"] = in_fresh_process(run_single, resume_paths, job_texts)
+            if args.mode in ("pool", "both"):
+                results[size_name]["pool"] = in_fresh_process(run_pool, resume_paths, job_texts, args.workers)
+            print(f"{size_name}: done ({len(resume_paths)} resume files, {len(job_texts)} job descriptions)")
+    finally:
+        if not args.corpus_dir:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    output = {
+        "benchmark": "parsing",
+        "environment": environment(),
+        "config": {
+            "mode": args.mode,
+            "count": args.count,
+            "workers": args.workers,
+            "seed": args.seed,
+            "sizes": {name: SIZES[name] for name in sizes}
+        },
+        "results": results
+    }
+    save_results(output, args.output)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+def add_run_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--sizes", type=comma_list(SIZES), default="small,medium,large",
+                        help=f"Comma-separated document sizes from: {', '.join(SIZES)}")
+    parser.add_argument("--count", type=int, default=25, help="Resumes per format and jobs per size")
+    parser.add_argument("--mode", default="both", choices=("single", "pool", "both"))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Pool size")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus-dir", help="Keep generated files here instead of a temp directory")
+    parser.add_argument("--output", default="benchmark_results/parsing.json")
+
+
+if __name__ == "__main__":
+    sys.exit(report.main("Benchmark resume extraction and resume/job parsing", add_run_arguments, run))
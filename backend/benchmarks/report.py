@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples_seconds: List[float]) -> Dict:
+    """Latency summary in milliseconds."""
+    samples = [s * 1000.0 for s in samples_seconds]
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "mean_ms": round(sum(samples) / len(samples), 4),
+        "min_ms": round(min(samples), 4),
+        "p50_ms": round(percentile(samples, 50), 4),
+        "p95_ms": round(percentile(samples, 95), 4),
+        "p99_ms": round(percentile(samples, 99), 4),
+        "max_ms": round(max(samples), 4)
+    }
+
+
+def environment() -> Dict:
+    """Where the numbers came from, so runs on different machines are not compared blindly."""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+
+
+def save_results(results: Dict, path: str):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load_results(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = float(value)
+    return flat
+
+
+# Metrics compared between runs, by suffix; True means higher is better
+COMPARED_METRICS = {
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "mean_ms": False,
+    "pairs_per_sec": True,
+    "docs_per_sec": True,
+    "writes_per_sec": True,
+    "avg_bytes": False,
+    "peak_rss_mb": False
+}
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 0.1) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Compare two result files metric by metric.
+    Returns (all compared rows, regressions), where a regression is a change
+    for the worse by more than threshold (a fraction of the baseline value).
+    """
+    base = _flatten(baseline.get("results", {}))
+    cur = _flatten(current.get("results", {}))
+
+    rows = []
+    for path in sorted(set(base) & set(cur)):
+        metric = path.rsplit(".", 1)[-1]
+        if metric not in COMPARED_METRICS or base[path] == 0:
+            continue
+        higher_is_better = COMPARED_METRICS[metric]
+        change = (cur[path] - base[path]) / base[path]
+        worse = -change if higher_is_better else change
+        rows.append({
+            "metric": path,
+            "baseline": base[path],
+            "current": cur[path],
+            "change": round(change, 4),
+            "regression": worse > threshold
+        })
+
+    return rows, [row for row in rows if row["regression"]]
+
+
+def print_comparison(rows: List[Dict], threshold: float):
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['metric']:<60} {row['baseline']:>12.3f} {row['current']:>12.3f} {row['change']:>+8.1%} {flag}")
+    regressions = sum(1 for row in rows if row["regression"])
+    print(f"\n{len(rows)} metrics compared, {regressions} regressed by more than {threshold:.0%}")
+
+
+def compare(args) -> int:
+    rows, regressions = compare_results(load_results(args.baseline), load_results(args.current), args.threshold)
+    print_comparison(rows, args.threshold)
+    return 1 if regressions else 0
+
+
+def comma_list(choices: Iterable[str]) -> Callable[[str], List[str]]:
+    """argparse type for a comma-separated list of names from choices."""
+    choices = list(choices)
+
+    def parse(value: str) -> List[str]:
+        names = [name for name in value.split(",") if name]
+        unknown = [name for name in names if name not in choices]
+        if unknown:
+            raise argparse.ArgumentTypeError(f"unknown {', '.join(unknown)} (choose from {', '.join(choices)})")
+        return names
+
+    return parse
+
+
+ArgumentsHook = Callable[[argparse.ArgumentParser], None]
+Command = Callable[[argparse.Namespace], int]
+
+
+def main(description: str, add_run_arguments: ArgumentsHook, run: Command,
+         argv: Optional[Sequence[str]] = None,
+         hidden_commands: Optional[Dict[str, Tuple[ArgumentsHook, Command]]] = None) -> int:
+    """
+    Command line shared by every benchmark: `run` takes the arguments the
+    benchmark registers and saves results as JSON, `compare` flags
+    regressions between two result files. hidden_commands maps extra
+    subcommand names (left out of --help) to (add_arguments, handler).
+    """
+    parser = argparse.ArgumentParser(description=description)
+    commands = parser.add_subparsers(dest="command", required=True)
+    handlers = {"run": run, "compare": compare}
+
+    run_parser = commands.add_parser("run", help="Run the benchmark and save results as JSON")
+    add_run_arguments(run_parser)
+
+    for name, (add_arguments, handler) in (hidden_commands or {}).items():
+        add_arguments(commands.add_parser(name))
+        handlers[name] = handler
+
+    compare_parser = commands.add_parser("compare", help="Flag regressions between two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="Relative change counted as a regression (0.1 = 10%%)")
+
+    args = parser.parse_args(argv)
+    return handlers[args.command](args)
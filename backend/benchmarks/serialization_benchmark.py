@@ -0,0 +1,131 @@
+"""
+List and ranking response serialization benchmark (needs a running MongoDB).
+
+    python -m benchmarks.serialization_benchmark run --count 10000 --repeat 5 --output results.json
+    python -m benchmarks.serialization_benchmark compare baseline.json results.json --threshold 0.1
+
+Stores --count synthetic resumes, jobs and matches in a scratch database
+(<DATABASE_NAME>_benchmark, dropped afterwards) and builds one list response
+of all of them per collection two ways:
+
+  before  Beanie documents (validated on load) through jsonable_encoder and JSONResponse,
+          as FastAPI does for a returned list of models
+  after   raw documents through trusted_documents and FastJSONResponse (orjson)
+
+Each is timed end to end (fetch + encode) and for the encoding alone.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Type
+
+import motor.motor_asyncio
+from beanie import Document, init_beanie
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.api.responses import FastJSONResponse, trusted_documents
+from app.models.resume import Resume
+from app.models.job import JobDescription
+from app.models.analysis import ResumeJobMatch
+from benchmarks.corpus import generate_corpus
+from benchmarks.match_store_benchmark import generate_matches
+from benchmarks import report
+from benchmarks.report import summarize, environment, save_results
+
+
+def stored_documents(count: int, size: str, seed: int) -> Dict[Type[Document], List[Dict]]:
+    """Documents shaped like the ones the API stores, with timestamps."""
+    resumes, jobs = generate_corpus(size, count, seed)
+    now = datetime(2024, 1, 1)
+    rng = random.Random(f"{seed}-timestamps")
+
+    def stored(document: Dict) -> Dict:
+        document = {key: value for key, value in document.items() if key != "id"}
+        document["created_at"] = document["updated_at"] = now + timedelta(seconds=rng.randint(0, 10 ** 7))
+        return document
+
+    for resume in resumes:
+        resume.update(file_name="resume.pdf", file_path="uploads/resume.pdf", file_type="PDF")
+    for job in jobs:
+        job["requirements"] = []
+    return {
+        Resume: [stored(resume) for resume in resumes],
+        JobDescription: [stored(job) for job in jobs],
+        ResumeJobMatch: [stored(match) for match in generate_matches(count, seed)]
+    }
+
+
+async def encode_before(model: Type[Document], count: int) -> Dict[str, float]:
+    start = time.perf_counter()
+    documents = await model.find({}).limit(count).to_list()
+    encode_start = time.perf_counter()
+    body = JSONResponse(content=jsonable_encoder(documents)).body
+    end = time.perf_counter()
+    return {"total": end - start, "encode": end - encode_start, "bytes": len(body)}
+
+
+async def encode_after(model: Type[Document], count: int) -> Dict[str, float]:
+    start = time.perf_counter()
+    documents = await model.get_motor_collection().find({}).limit(count).to_list(length=count)
+    encode_start = time.perf_counter()
+    body = FastJSONResponse(trusted_documents(model, documents)).body
+    end = time.perf_counter()
+    return {"total": end - start, "encode": end - encode_start, "bytes": len(body)}
+
+
+async def bench(args) -> Dict:
+    client = motor.motor_asyncio.AsyncIOMotorClient(settings.MONGODB_URL)
+    database_name = f"{settings.DATABASE_NAME}_benchmark"
+    await init_beanie(database=client[database_name], document_models=[Resume, JobDescription, ResumeJobMatch])
+
+    results = {}
+    try:
+        for model, documents in stored_documents(args.count, args.size, args.seed).items():
+            await model.get_motor_collection().insert_many(documents)
+            name = model.Settings.name
+            results[name] = {}
+            for label, encode in (("before", encode_before), ("after", encode_after)):
+                await encode(model, args.count)  # warm up
+                runs = [await encode(model, args.count) for _ in range(args.repeat)]
+                results[name][label] = {
+                    "docs_per_sec": round(args.count * len(runs) / sum(run["total"] for run in runs), 3),
+                    "latency": summarize([run["total"] for run in runs]),
+                    "encode": summarize([run["encode"] for run in runs]),
+                    "payload_bytes": runs[0]["bytes"]
+                }
+            before, after = results[name]["before"], results[name]["after"]
+            print(f"{name}: {before['latency']['p50_ms']:.0f} ms -> {after['latency']['p50_ms']:.0f} ms "
+                  f"for {args.count} documents")
+    finally:
+        await client.drop_database(database_name)
+    return results
+
+
+def run(args) -> int:
+    results = asyncio.run(bench(args))
+    output = {
+        "benchmark": "serialization",
+        "environment": environment(),
+        "config": {"count": args.count, "size": args.size, "repeat": args.repeat, "seed": args.seed},
+        "results": results
+    }
+    save_results(output, args.output)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+def add_run_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--count", type=int, default=10000, help="Documents per list response")
+    parser.add_argument("--size", default="small", help="Resume/job size (see benchmarks.corpus.SIZES)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results/serialization.json")
+
+
+if __name__ == "__main__":
+    sys.exit(report.main("Benchmark list and ranking response serialization", add_run_arguments, run))
@@ -0,0 +1,164 @@
+"""
+CPU thread budget benchmark.
+
+    python -m benchmarks.thread_budget_benchmark run --processes 4 --pairs 40 --size medium --output results.json
+    python -m benchmarks.thread_budget_benchmark compare baseline.json results.json --threshold 0.1
+
+Starts --processes matching processes side by side, like server workers on
+one host, and measures the host's combined pair throughput twice:
+
+  unbounded  library defaults: torch and BLAS size their pools to every core
+             in every process, matches run on a --concurrency thread pool
+  budgeted   each process applies its share of the thread budget
+             (app.core.resources) and matches on the budgeted match pool
+
+Each process loads its models first; scoring starts in all of them at once
+and only the scoring is timed.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from app.core import resources
+from app.core.resources import THREAD_ENV_VARS
+from benchmarks import report
+from benchmarks.report import summarize, environment, save_results, comma_list
+
+CONFIGS = ("unbounded", "budgeted")
+
+
+def wait_for(path: str, timeout: float = 600.0):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Timed out waiting for {path}")
+        time.sleep(0.05)
+
+
+def worker(args) -> int:
+    """One matching process; prints its timings as a JSON line."""
+    if args.config == "budgeted":
+        budget = resources.configure_process(args.processes)
+        pool = resources.match_pool()
+        threads = budget.as_dict()
+    else:
+        pool = ThreadPoolExecutor(max_workers=args.concurrency)
+        threads = {"match_threads": args.concurrency}
+
+    from app.services.matching_engine import MatchingEngine
+    from benchmarks.corpus import generate_corpus
+
+    engine = MatchingEngine()
+    if args.mode != "lexical":
+        engine._load_models()
+    resumes, jobs = generate_corpus(args.size, args.pairs, args.seed + args.index)
+    pairs = list(zip(resumes, jobs))
+    engine.match_resume_to_job(pairs[0][0], pairs[0][1], args.mode)
+    engine.static_vectors.clear()
+    engine.text_embeddings.clear()
+
+    open(os.path.join(args.sync_dir, f"ready-{args.index}"), "w").close()
+    wait_for(os.path.join(args.sync_dir, "go"))
+
+    def score(pair):
+        call_start = time.perf_counter()
+        engine.match_resume_to_job(pair[0], pair[1], args.mode)
+        return time.perf_counter() - call_start
+
+    start = time.time()
+    latencies = list(pool.map(score, pairs))
+    end = time.time()
+    print(json.dumps({"start": start, "end": end, "latencies": latencies, "threads": threads}))
+    return 0
+
+
+def bench_config(args, config: str) -> Dict:
+    env = dict(os.environ)
+    if config == "unbounded":
+        for name in THREAD_ENV_VARS:
+            env.pop(name, None)
+
+    with tempfile.TemporaryDirectory() as sync_dir:
+        processes = []
+        for index in range(args.processes):
+            command = [
+                sys.executable, "-m", "benchmarks.thread_budget_benchmark", "worker",
+                "--config", config, "--index", str(index), "--processes", str(args.processes),
+                "--pairs", str(args.pairs), "--size", args.size, "--mode", args.mode,
+                "--seed", str(args.seed), "--concurrency", str(args.concurrency), "--sync-dir", sync_dir
+            ]
+            processes.append(subprocess.Popen(command, env=env, stdout=subprocess.PIPE, text=True))
+
+        for index in range(args.processes):
+            wait_for(os.path.join(sync_dir, f"ready-{index}"))
+        open(os.path.join(sync_dir, "go"), "w").close()
+
+        reports: List[Dict] = []
+        for process in processes:
+            output, _ = process.communicate()
+            if process.returncode != 0:
+                raise RuntimeError(f"{config} worker exited with status {process.returncode}")
+            reports.append(json.loads(output.strip().splitlines()[-1]))
+
+    elapsed = max(r["end"] for r in reports) - min(r["start"] for r in reports)
+    total_pairs = args.processes * args.pairs
+    print(f"{config}: {total_pairs / elapsed:.1f} pairs/s across {args.processes} process(es)")
+    return {
+        "pairs_per_sec": round(total_pairs / elapsed, 3),
+        "latency": summarize([latency for r in reports for latency in r["latencies"]]),
+        "threads_per_process": reports[0]["threads"]
+    }
+
+
+def run(args) -> int:
+    results = {config: bench_config(args, config) for config in args.configs}
+    output = {
+        "benchmark": "thread_budget",
+        "environment": environment(),
+        "config": {
+            "processes": args.processes,
+            "pairs": args.pairs,
+            "size": args.size,
+            "mode": args.mode,
+            "seed": args.seed,
+            "concurrency": args.concurrency
+        },
+        "results": results
+    }
+    save_results(output, args.output)
+    print(f"Results written to {args.output}")
+    return 0
+
+
+def add_workload_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--processes", type=int, default=4, help="Matching processes run side by side")
+    parser.add_argument("--pairs", type=int, default=40, help="Pairs scored by each process")
+    parser.add_argument("--size", default="medium", help="Corpus size (see benchmarks.corpus.SIZES)")
+    parser.add_argument("--mode", default="full", choices=("lexical", "static", "full"))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count() or 1,
+                        help="Match threads per process in the unbounded configuration")
+
+
+def add_run_arguments(parser: argparse.ArgumentParser):
+    add_workload_arguments(parser)
+    parser.add_argument("--configs", type=comma_list(CONFIGS), default=",".join(CONFIGS))
+    parser.add_argument("--output", default="benchmark_results/thread_budget.json")
+
+
+def add_worker_arguments(parser: argparse.ArgumentParser):
+    add_workload_arguments(parser)
+    parser.add_argument("--config", choices=CONFIGS, required=True)
+    parser.add_argument("--index", type=int, required=True)
+    parser.add_argument("--sync-dir", required=True)
+
+
+if __name__ == "__main__":
+    sys.exit(report.main("Benchmark matching throughput with and without the CPU thread budget",
+                         add_run_arguments, run, hidden_commands={"worker": (add_worker_arguments, worker)}))
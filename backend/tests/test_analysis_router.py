@@ -0,0 +1,153 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+from bson import ObjectId
+
+from app.api.routes import analysis_router
+from app.services.content_hash import resume_content_hash, job_content_hash
+
+RESUME = {"candidate_name": "Ada Lovelace", "skills": [{"name": "Python"}], "experience": [], "education": []}
+JOB = {"title": "Engineer", "company": "Acme", "skills": ["Python"], "requirements": []}
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def match_results(**overrides) -> dict:
+    results = {
+        "candidate_name": "Ada Lovelace",
+        "job_title": "Engineer",
+        "company": "Acme",
+        "overall_score": 0.75,
+        "scores": {"skills": 0.75},
+        "match_mode": "full"
+    }
+    results.update(overrides)
+    return results
+
+
+def stored_match(**overrides) -> dict:
+    now = datetime.now()
+    stored = {
+        "_id": ObjectId(),
+        "resume_id": "r1",
+        "job_id": "j1",
+        "resume_hash": resume_content_hash(RESUME),
+        "job_hash": job_content_hash(JOB),
+        "engine_version": analysis_router.matching_engine.ENGINE_VERSION,
+        "created_at": now,
+        "updated_at": now,
+        **match_results()
+    }
+    stored.update(overrides)
+    return stored
+
+
+class Match(SimpleNamespace):
+    """Stands in for ResumeJobMatch, which cannot be built before init_beanie."""
+
+    @classmethod
+    def model_validate(cls, data):
+        return cls(**data)
+
+
+def patch_store(monkeypatch, existing=None):
+    """Route the match store and the match pool through in-memory fakes; returns the calls made."""
+    calls = {"computed": 0, "upserted": []}
+
+    async def find_match(resume_id, job_id):
+        return existing
+
+    async def run_in_pool(pool, fn, *args):
+        calls["computed"] += 1
+        return match_results()
+
+    async def upsert_match(results):
+        calls["upserted"].append(dict(results))
+        return stored_match(**results)
+
+    monkeypatch.setattr(analysis_router, "find_match", find_match)
+    monkeypatch.setattr(analysis_router, "run_in_pool", run_in_pool)
+    monkeypatch.setattr(analysis_router, "upsert_match", upsert_match)
+    monkeypatch.setattr(analysis_router, "ResumeJobMatch", Match)
+    return calls
+
+
+def cached_or_computed(mode="full", force=False):
+    return run(analysis_router._cached_or_computed_match(RESUME, JOB, "r1", "j1", mode, None, force))
+
+
+def test_fresh_stored_match_is_reused(monkeypatch):
+    calls = patch_store(monkeypatch, existing=stored_match())
+
+    match = cached_or_computed()
+
+    assert calls["computed"] == 0
+    assert match.overall_score == 0.75
+
+
+def test_missing_match_is_computed_and_stored(monkeypatch):
+    calls = patch_store(monkeypatch)
+
+    match = cached_or_computed()
+
+    assert calls["computed"] == 1
+    assert calls["upserted"][0]["engine_version"] == analysis_router.matching_engine.ENGINE_VERSION
+    assert calls["upserted"][0]["resume_hash"] == resume_content_hash(RESUME)
+    assert match.engine_version == analysis_router.matching_engine.ENGINE_VERSION
+
+
+def test_stale_engine_version_is_recomputed(monkeypatch):
+    calls = patch_store(monkeypatch, existing=stored_match(engine_version="0"))
+
+    cached_or_computed()
+
+    assert calls["computed"] == 1
+
+
+def test_lower_tier_match_is_recomputed_for_full_mode(monkeypatch):
+    calls = patch_store(monkeypatch, existing=stored_match(match_mode="lexical"))
+
+    cached_or_computed(mode="full")
+
+    assert calls["computed"] == 1
+
+
+def test_force_recomputes(monkeypatch):
+    calls = patch_store(monkeypatch, existing=stored_match())
+
+    cached_or_computed(force=True)
+
+    assert calls["computed"] == 1
+
+
+def test_hydrate_match_refreshes_a_compact_match(monkeypatch):
+    calls = patch_store(monkeypatch)
+
+    class Stored:
+        def __init__(self, data):
+            self.data = data
+
+        def dict(self):
+            return dict(self.data)
+
+    class Resumes:
+        @staticmethod
+        async def get(id):
+            return Stored(RESUME)
+
+    class Jobs:
+        @staticmethod
+        async def get(id):
+            return Stored(JOB)
+
+    monkeypatch.setattr(analysis_router, "Resume", Resumes)
+    monkeypatch.setattr(analysis_router, "JobDescription", Jobs)
+
+    match = run(analysis_router.hydrate_match(stored_match(compact=True, engine_version="0")))
+
+    assert calls["computed"] == 1
+    assert calls["upserted"][0]["engine_version"] == analysis_router.matching_engine.ENGINE_VERSION
+    assert match.engine_version == analysis_router.matching_engine.ENGINE_VERSION
@@ -0,0 +1,69 @@
+from app.services.search_keys import MAX_PREFIX, normalize, lookup_keys, rank, search_keys
+
+
+def test_normalize_folds_case_accents_and_punctuation():
+    assert normalize("José  O'Brien-Díaz") == "jose obrien diaz"
+    assert normalize("ÉCOLE Polytechnique") == "ecole polytechnique"
+    assert normalize("Straße") == "strasse"
+    assert normalize("snake_case, dotted.name") == "snake case dotted name"
+
+
+def test_normalize_joins_apostrophes_of_every_kind():
+    assert normalize("O'Brien") == "obrien"
+    assert normalize("O’Brien") == "obrien"
+    assert normalize("OʼBrien") == "obrien"
+
+
+def test_normalize_empty_input():
+    assert normalize("") == ""
+    assert normalize(None) == ""
+    assert normalize(" -- ' ") == ""
+
+
+def test_search_keys_prefixes_are_capped():
+    keys = search_keys("Anne-Marie Vandenberghe-Castellano")
+    assert keys.tokens == ["anne", "marie", "vandenberghe", "castellano"]
+    assert "vandenberghe" in keys.prefixes
+    assert max(len(prefix) for prefix in keys.prefixes) == MAX_PREFIX
+    assert len(keys.prefixes) == len(set(keys.prefixes))
+
+
+def test_lookup_keys_normalizes_and_deduplicates():
+    assert lookup_keys("José  josé O'Brien") == ["jose", "obrien"]
+
+
+def test_lookup_keys_cuts_long_tokens():
+    assert lookup_keys("Vandenberghecastellano") == ["vandenberghecastellano"[:MAX_PREFIX]]
+
+
+def test_lookup_keys_empty_query():
+    assert lookup_keys("") == []
+    assert lookup_keys("  ,.- ") == []
+
+
+def test_rank_orders_exact_prefix_and_token_matches():
+    query = "maria garcia"
+    exact = rank(query, search_keys("María García"))
+    prefix = rank(query, search_keys("Maria Garcia Lopez"))
+    tokens = rank(query, search_keys("Garcia, Maria"))
+    token_prefixes = rank("mar garc", search_keys("Garcia, Maria"))
+    assert exact > prefix > tokens > token_prefixes > 0
+
+
+def test_rank_ignores_accents_and_apostrophes():
+    assert rank("obrien", search_keys("Seán O'Brien")) > 0
+    assert rank("sean o’brien", search_keys("Seán O'Brien")) == rank("sean obrien", search_keys("Seán O'Brien"))
+
+
+def test_rank_requires_every_query_token():
+    assert rank("maria lopez", search_keys("Maria Garcia")) == 0.0
+    assert rank("arcia", search_keys("Maria Garcia")) == 0.0
+
+
+def test_rank_empty_query_matches_nothing():
+    assert rank("", search_keys("Maria Garcia")) == 0.0
+    assert rank(" ' ", search_keys("Maria Garcia")) == 0.0
+
+
+def test_rank_prefers_shorter_names_on_ties():
+    assert rank("ann", search_keys("Ann Lee")) > rank("ann", search_keys("Ann Leeuwenhoek"))
@@ -0,0 +1,93 @@
+import re
+
+import pytest
+
+from app.services.skill_index import SkillIndex, SkillQueryError
+
+
+@pytest.fixture
+def index():
+    index = SkillIndex()
+    index.add_resume("r1", ["Python", "Kubernetes"], experience_years=6)
+    index.add_resume("r2", ["python", "PHP"], experience_years=2)
+    index.add_resume("r3", ["Java", "Docker"], experience_years=10)
+    index.add_resume("r4", ["Machine  Learning", "Python"], experience_years=4)
+    return index
+
+
+def search(index, query, **filters):
+    return set(index.search(query, **filters))
+
+
+def test_single_skill_is_case_insensitive(index):
+    assert search(index, "PYTHON") == {"r1", "r2", "r4"}
+    assert search(index, "Python and Kubernetes") == {"r1"}
+
+
+def test_and_binds_tighter_than_or(index):
+    assert search(index, "java OR python AND php") == {"r2", "r3"}
+    assert search(index, "python AND php OR java") == {"r2", "r3"}
+
+
+def test_parentheses_override_precedence(index):
+    assert search(index, "(java OR python) AND php") == {"r2"}
+    assert search(index, "(java OR python) AND NOT php") == {"r1", "r3", "r4"}
+
+
+def test_not_binds_tightest(index):
+    assert search(index, "NOT php AND python") == {"r1", "r4"}
+    assert search(index, "NOT php OR java") == {"r1", "r3", "r4"}
+    assert search(index, "NOT NOT php") == {"r2"}
+
+
+def test_adjacent_terms_are_anded(index):
+    assert search(index, "python NOT php") == {"r1", "r4"}
+    assert search(index, "python (kubernetes OR docker)") == {"r1"}
+
+
+def test_multi_word_skills(index):
+    assert search(index, '"machine learning"') == {"r4"}
+    assert search(index, "machine learning AND python") == {"r4"}
+    assert search(index, "machine") == set()
+
+
+def test_not_excludes_removed_resumes(index):
+    index.remove_resume("r3")
+    assert search(index, "NOT python") == set()
+    assert search(index, "") == {"r1", "r2", "r4"}
+
+
+def test_years_filters(index):
+    assert search(index, "python, min 5 years") == {"r1"}
+    assert search(index, "python AND max 3 yrs") == {"r2"}
+    assert search(index, "min 3 years") == {"r1", "r3", "r4"}
+    assert search(index, "python", min_years=3, max_years=5) == {"r4"}
+
+
+def test_dangling_operator_before_filter_is_dropped(index):
+    assert search(index, "python AND, min 5 years") == {"r1"}
+    assert search(index, "python OR") == {"r1", "r2", "r4"}
+
+
+def test_unknown_skill_matches_nothing(index):
+    assert search(index, "cobol") == set()
+    assert search(index, "cobol OR java") == {"r3"}
+
+
+@pytest.mark.parametrize("query, message", [
+    ("(python AND php", "Missing closing parenthesis"),
+    ("python OR NOT", "Query ended unexpectedly"),
+    ("python AND (", "Query ended unexpectedly"),
+    ("NOT", "Query ended unexpectedly"),
+    ("python )", "Unexpected token ')'"),
+    ("AND python", "Unexpected token 'AND'"),
+    ("python OR OR java", "Unexpected token 'OR'"),
+    ("()", "Unexpected token ')'"),
+])
+def test_malformed_queries_raise(index, query, message):
+    with pytest.raises(SkillQueryError, match=re.escape(message)):
+        index.search(query)
+
+
+def test_query_errors_are_value_errors():
+    assert issubclass(SkillQueryError, ValueError)
@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+
+from app.services.task_queue import TaskQueue, InMemoryTaskQueue
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_task_queue_is_abstract():
+    with pytest.raises(TypeError):
+        TaskQueue()
+
+
+def test_lease_and_complete():
+    async def scenario():
+        queue = InMemoryTaskQueue()
+        task = await queue.enqueue("rank", {"job_id": "j1"})
+        assert task["status"] == "queued"
+
+        leased = await queue.lease("worker-1")
+        assert leased["id"] == task["id"]
+        assert leased["status"] == "running"
+        assert leased["attempts"] == 1
+        assert await queue.lease("worker-2") is None
+
+        await queue.complete(task["id"], "worker-1", {"scored": 3})
+        return await queue.get(task["id"])
+
+    task = run(scenario())
+    assert task["status"] == "succeeded"
+    assert task["result"] == {"scored": 3}
+    assert task["finished_at"] is not None
+
+
+def test_lease_filters_task_types():
+    async def scenario():
+        queue = InMemoryTaskQueue()
+        await queue.enqueue("rank", {})
+        parse = await queue.enqueue("parse_job", {"job_id": "j1"})
+        leased = await queue.lease("worker-1", ["parse_job"])
+        return parse, leased, await queue.lease("worker-1", ["parse_job"])
+
+    parse, leased, nothing_left = run(scenario())
+    assert leased["id"] == parse["id"]
+    assert nothing_left is None
+
+
+def test_failed_attempts_are_retried_until_max_attempts():
+    async def scenario():
+        queue = InMemoryTaskQueue(retry_backoff=0, max_attempts=2)
+        task = await queue.enqueue("match", {})
+
+        await queue.lease("worker-1")
+        await queue.fail(task["id"], "worker-1", "first")
+        retried = await queue.get(task["id"])
+
+        await queue.lease("worker-1")
+        await queue.fail(task["id"], "worker-1", "second")
+        return retried, await queue.get(task["id"]), await queue.lease("worker-1")
+
+    retried, failed, nothing_left = run(scenario())
+    assert retried["status"] == "queued"
+    assert retried["leased_by"] is None
+    assert failed["status"] == "failed"
+    assert failed["error"] == "second"
+    assert failed["attempts"] == 2
+    assert nothing_left is None
+
+
+def test_retry_waits_for_backoff():
+    async def scenario():
+        queue = InMemoryTaskQueue(retry_backoff=60)
+        task = await queue.enqueue("match", {})
+        await queue.lease("worker-1")
+        await queue.fail(task["id"], "worker-1", "boom")
+        return await queue.lease("worker-1")
+
+    assert run(scenario()) is None
+
+
+def test_expired_lease_is_taken_over():
+    async def scenario():
+        # A negative visibility timeout makes every lease expire at once
+        queue = InMemoryTaskQueue(visibility_timeout=-1)
+        task = await queue.enqueue("rematch", {"job_id": "j1"})
+        await queue.lease("worker-1")
+        taken_over = await queue.lease("worker-2")
+        extended = await queue.extend_lease(task["id"], "worker-1")
+        return taken_over, extended
+
+    taken_over, extended = run(scenario())
+    assert taken_over["leased_by"] == "worker-2"
+    assert taken_over["attempts"] == 2
+    assert extended is False
+
+
+def test_expired_final_attempt_fails_the_task():
+    async def scenario():
+        queue = InMemoryTaskQueue(visibility_timeout=-1, max_attempts=1)
+        task = await queue.enqueue("rank", {})
+        await queue.lease("worker-1")
+        return await queue.lease("worker-2"), await queue.get(task["id"])
+
+    nothing_left, task = run(scenario())
+    assert nothing_left is None
+    assert task["status"] == "failed"
+    assert task["error"] == "Lease expired on final attempt"
+
+
+def test_only_the_lease_holder_can_finish_a_task():
+    async def scenario():
+        queue = InMemoryTaskQueue()
+        task = await queue.enqueue("match", {})
+        await queue.lease("worker-1")
+        await queue.complete(task["id"], "worker-2", {"overall_score": 1.0})
+        await queue.fail(task["id"], "worker-2", "not mine")
+        return await queue.get(task["id"])
+
+    task = run(scenario())
+    assert task["status"] == "running"
+    assert task["leased_by"] == "worker-1"
+
+
+def test_list_and_counts():
+    async def scenario():
+        queue = InMemoryTaskQueue()
+        first = await queue.enqueue("rematch", {"job_id": "j1"})
+        await queue.enqueue("rank", {"job_id": "j1"})
+        second = await queue.enqueue("rematch", {"resume_id": "r1"})
+        await queue.lease("worker-1", ["rank"])
+        return (
+            first, second,
+            await queue.list(task_type="rematch"),
+            await queue.list(status="running"),
+            await queue.counts()
+        )
+
+    first, second, rematches, running, counts = run(scenario())
+    assert {task["id"] for task in rematches} == {first["id"], second["id"]}
+    assert [task["task_type"] for task in running] == ["rank"]
+    assert counts == {"queued": 2, "running": 1, "succeeded": 0, "failed": 0}
+
+
+def test_returned_records_are_copies():
+    async def scenario():
+        queue = InMemoryTaskQueue()
+        task = await queue.enqueue("match", {"resume_id": "r1"})
+        task["payload"]["resume_id"] = "changed"
+        return await queue.get(task["id"])
+
+    assert run(scenario())["payload"] == {"resume_id": "r1"}
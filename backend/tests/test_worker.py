@@ -0,0 +1,50 @@
+import asyncio
+
+from app import worker
+from app.services.task_queue import InMemoryTaskQueue
+
+
+class FlakyQueue(InMemoryTaskQueue):
+    """Fails the first complete() call, like a brief database outage."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.complete_calls = 0
+
+    async def complete(self, task_id, worker_id, result=None):
+        self.complete_calls += 1
+        if self.complete_calls == 1:
+            raise ConnectionError("database unavailable")
+        return await super().complete(task_id, worker_id, result)
+
+
+class Handlers:
+    def __init__(self, stopping: asyncio.Event, stop_after: int):
+        self.stopping = stopping
+        self.stop_after = stop_after
+        self.ran = []
+
+    async def run(self, task):
+        self.ran.append(task["id"])
+        if len(self.ran) == self.stop_after:
+            self.stopping.set()
+        return {"ok": True}
+
+
+def test_consume_survives_a_failed_completion(monkeypatch):
+    async def scenario():
+        queue = FlakyQueue()
+        monkeypatch.setattr(worker, "task_queue", queue)
+        first = await queue.enqueue("rank", {"job_id": "j1"})
+        second = await queue.enqueue("rank", {"job_id": "j2"})
+
+        stopping = asyncio.Event()
+        handlers = Handlers(stopping, stop_after=2)
+        await worker.consume("worker-1", handlers, stopping)
+        return handlers.ran, await queue.get(first["id"]), await queue.get(second["id"])
+
+    ran, first, second = asyncio.run(scenario())
+    assert ran == [first["id"], second["id"]]
+    # Left leased, so it is retried once the lease runs out
+    assert first["status"] == "running"
+    assert second["status"] == "succeeded"
@@ -24,32 +24,22 @@ function Dashboard() {
       try {
         setLoading(true);
         
-        // Fetch stats
+        // The 5 most recent resumes and jobs, with collection totals in X-Total-Count
+        const recent = { limit: 5, newest_first: true, include_total: true };
         const [resumesRes, jobsRes, matchesRes] = await Promise.all([
-          resumeApi.getAllResumes(),
-          jobApi.getAllJobs(),
-          analysisApi.getAllMatches()
+          resumeApi.getAllResumes(recent),
+          jobApi.getAllJobs(recent),
+          analysisApi.getAllMatches({ limit: 1, include_total: true })
         ]);
         
         setStats({
-          resumes: resumesRes.data.length,
-          jobs: jobsRes.data.length,
-          matches: matchesRes.data.length
+          resumes: Number(resumesRes.headers['x-total-count']),
+          jobs: Number(jobsRes.headers['x-total-count']),
+          matches: Number(matchesRes.headers['x-total-count'])
         });
         
-        // Get 5 most recent resumes
-        setRecentResumes(
-          resumesRes.data
-            .sort((a, b) => new Date(b.created_at) - new Date(a.created_at))
-            .slice(0, 5)
-        );
-        
-        // Get 5 most recent jobs
-        setRecentJobs(
-          jobsRes.data
-            .sort((a, b) => new Date(b.created_at) - new Date(a.created_at))
-            .slice(0, 5)
-        );
+        setRecentResumes(resumesRes.data);
+        setRecentJobs(jobsRes.data);
       } catch (error) {
         console.error('Error fetching dashboard data:', error);
       } finally {
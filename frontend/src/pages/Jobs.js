@@ -16,12 +16,15 @@ function Jobs() {
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
   const [deleting, setDeleting] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const fetchJobs = async () => {
     try {
       setLoading(true);
-      const response = await jobApi.getAllJobs();
+      const response = await jobApi.getAllJobs({ newest_first: true });
       setJobs(response.data);
+      setNextCursor(response.headers['x-next-cursor'] || null);
     } catch (error) {
       console.error('Error fetching jobs:', error);
       toast.error('Failed to load jobs');
@@ -34,6 +37,20 @@ function Jobs() {
     fetchJobs();
   }, []);
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await jobApi.getAllJobs({ newest_first: true, cursor: nextCursor });
+      setJobs((current) => [...current, ...response.data]);
+      setNextCursor(response.headers['x-next-cursor'] || null);
+    } catch (error) {
+      console.error('Error fetching jobs:', error);
+      toast.error('Failed to load jobs');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleSearch = async (e) => {
     e.preventDefault();
     
@@ -47,6 +64,7 @@ function Jobs() {
       setLoading(true);
       const response = await jobApi.searchJobsByTitle(searchTerm);
       setJobs(response.data);
+      setNextCursor(null);
     } catch (error) {
       console.error('Error searching jobs:', error);
       toast.error('Failed to search jobs');
@@ -266,6 +284,20 @@ function Jobs() {
                 ))}
               </tbody>
             </table>
+            {nextCursor && (
+              <div className="border-t border-gray-200 px-6 py-4 text-center">
+                <button
+                  type="button"
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                  className={`inline-flex items-center rounded-md bg-white px-3 py-2 text-sm font-semibold text-gray-900 shadow-sm ring-1 ring-inset ring-gray-300 hover:bg-gray-50 ${
+                    loadingMore ? 'opacity-50 cursor-not-allowed' : ''
+                  }`}
+                >
+                  {loadingMore ? 'Loading...' : 'Load more'}
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>
@@ -16,12 +16,15 @@ function Resumes() {
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
   const [deleting, setDeleting] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const fetchResumes = async () => {
     try {
       setLoading(true);
-      const response = await resumeApi.getAllResumes();
+      const response = await resumeApi.getAllResumes({ newest_first: true });
       setResumes(response.data);
+      setNextCursor(response.headers['x-next-cursor'] || null);
     } catch (error) {
       console.error('Error fetching resumes:', error);
       toast.error('Failed to load resumes');
@@ -34,6 +37,20 @@ function Resumes() {
     fetchResumes();
   }, []);
 
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const response = await resumeApi.getAllResumes({ newest_first: true, cursor: nextCursor });
+      setResumes((current) => [...current, ...response.data]);
+      setNextCursor(response.headers['x-next-cursor'] || null);
+    } catch (error) {
+      console.error('Error fetching resumes:', error);
+      toast.error('Failed to load resumes');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleSearch = async (e) => {
     e.preventDefault();
     
@@ -47,6 +64,7 @@ function Resumes() {
       setLoading(true);
       const response = await resumeApi.searchResumesByName(searchTerm);
       setResumes(response.data);
+      setNextCursor(null);
     } catch (error) {
       console.error('Error searching resumes:', error);
       toast.error('Failed to search resumes');
@@ -272,6 +290,20 @@ function Resumes() {
                 ))}
               </tbody>
             </table>
+            {nextCursor && (
+              <div className="border-t border-gray-200 px-6 py-4 text-center">
+                <button
+                  type="button"
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                  className={`inline-flex items-center rounded-md bg-white px-3 py-2 text-sm font-semibold text-gray-900 shadow-sm ring-1 ring-inset ring-gray-300 hover:bg-gray-50 ${
+                    loadingMore ? 'opacity-50 cursor-not-allowed' : ''
+                  }`}
+                >
+                  {loadingMore ? 'Loading...' : 'Load more'}
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>
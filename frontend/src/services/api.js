@@ -22,12 +22,16 @@ export const resumeApi = {
     });
   },
   
-  // Get all resumes
-  getAllResumes: () => api.get('/resumes'),
+  // Get a page of resumes; pass the X-Next-Cursor response header back as params.cursor
+  // (params.newest_first for latest first, params.include_total for an X-Total-Count header)
+  getAllResumes: (params) => api.get('/resumes', { params }),
   
   // Get resume by ID
   getResumeById: (id) => api.get(`/resumes/${id}`),
   
+  // Get the extracted text of a resume (not included in the resume itself)
+  getResumeRawText: (id) => api.get(`/resumes/${id}/raw-text`),
+  
   // Delete resume
   deleteResume: (id) => api.delete(`/resumes/${id}`),
   
@@ -40,12 +44,16 @@ export const jobApi = {
   // Create a new job description
   createJob: (jobData) => api.post('/jobs', jobData),
   
-  // Get all jobs
-  getAllJobs: () => api.get('/jobs'),
+  // Get a page of jobs; pass the X-Next-Cursor response header back as params.cursor
+  // (params.newest_first for latest first, params.include_total for an X-Total-Count header)
+  getAllJobs: (params) => api.get('/jobs', { params }),
   
   // Get job by ID
   getJobById: (id) => api.get(`/jobs/${id}`),
   
+  // Get the original text of a job description (not included in the job itself)
+  getJobRawText: (id) => api.get(`/jobs/${id}/raw-text`),
+  
   // Update job
   updateJob: (id, jobData) => api.put(`/jobs/${id}`, jobData),
   
@@ -64,8 +72,9 @@ export const analysisApi = {
   // Match a resume with a job
   matchResumeToJob: (resumeId, jobId) => api.post('/analysis/match', { resume_id: resumeId, job_id: jobId }),
   
-  // Get all matches
-  getAllMatches: () => api.get('/analysis'),
+  // Get a page of matches; pass the X-Next-Cursor response header back as params.cursor
+  // (params.newest_first for latest first, params.include_total for an X-Total-Count header)
+  getAllMatches: (params) => api.get('/analysis', { params }),
   
   // Get match by ID
   getMatchById: (id) => api.get(`/analysis/${id}`),